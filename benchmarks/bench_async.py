@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_concurrency import free_port, start_server
+from benchmarks.data import write_accounts, write_table
+from dbcsv import dbapi2
+
+USER, PASSWORD = "bench", "bench"
+SQL = "SELECT id, price, category FROM bench WHERE qty > {}"
+
+
+def queries(count: int) -> list:
+    # Distinct filters, so the engine's result cache does not answer them
+    return [SQL.format(i % 100) for i in range(count)]
+
+
+def run_sync(dsn: str, count: int) -> int:
+    rows = 0
+    with dbapi2.connect(dsn, user=USER, password=PASSWORD) as connection:
+        cursor = connection.cursor()
+        cursor.use_cache = False
+        for query in queries(count):
+            cursor.execute(query)
+            rows += len(cursor.fetchall())
+        cursor.close()
+    return rows
+
+
+async def run_pool(dsn: str, count: int, size: int) -> int:
+    async with await dbapi2.create_pool(dsn, USER, PASSWORD, size=size) as pool:
+
+        async def run(query: str) -> int:
+            async with pool.cursor() as cursor:
+                cursor.use_cache = False
+                await cursor.execute(query)
+                return len(await cursor.fetchall())
+
+        counts = await asyncio.gather(*(run(query) for query in queries(count)))
+    return sum(counts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent queries over dbapi2")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=32)
+    parser.add_argument("--pool-sizes", default="1,4,8,16")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as storage:
+        write_table(Path(storage, "bench"), "bench", args.rows)
+        write_accounts(Path(storage), USER, PASSWORD)
+        port = free_port()
+        server = start_server(storage, port, queue_depth=8)
+        dsn = f"http://127.0.0.1:{port}/bench"
+        try:
+            runs = [("sync connection", lambda: run_sync(dsn, args.queries))]
+            for size in map(int, args.pool_sizes.split(",")):
+                runs.append(
+                    (
+                        f"async pool of {size}",
+                        lambda size=size: asyncio.run(
+                            run_pool(dsn, args.queries, size)
+                        ),
+                    )
+                )
+            for label, run in runs:
+                start = time.perf_counter()
+                rows = run()
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{label:<18} {args.queries} queries in {elapsed:6.2f} s  "
+                    f"{args.queries / elapsed:6.1f} queries/s  "
+                    f"{rows / elapsed:>12,.0f} rows/s"
+                )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
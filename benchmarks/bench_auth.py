@@ -0,0 +1,81 @@
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import jwt
+
+from benchmarks.data import write_accounts
+
+USER, PASSWORD = "bench", "bench"
+
+
+def per_call(function: Callable[[], Any], calls: int) -> float:
+    # Microseconds per call, best of three runs
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Authentication cost per request")
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as storage:
+        write_accounts(Path(storage), USER, PASSWORD)
+        os.environ["STORAGE_PATH"] = storage
+
+        # Imported here: settings are read at import time, after STORAGE_PATH
+        from dbcsv.engine.schemas.auth import TokenData, UserInDB
+        from dbcsv.engine.security.auth import AuthManager
+        from dbcsv.engine.setting import ALGORITHM, SECRET_KEY
+
+        cached = AuthManager(SECRET_KEY, ALGORITHM, 30)
+        uncached = AuthManager(SECRET_KEY, ALGORITHM, 30, token_cache_size=0)
+        token = cached.create_access_token({"username": USER}, timedelta(minutes=30))
+        accounts: Dict[str, Any] = cached.accounts_json
+
+        def verify_and_build() -> UserInDB:
+            # What every request did before: check the signature, then build
+            # the user from accounts.json
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            token_data = TokenData(username=payload.get("username"))
+            return UserInDB(**accounts[token_data.username])
+
+        server = {
+            "verify + build user": verify_and_build,
+            "verify, prebuilt user": lambda: uncached.get_current_user(token),
+            "cached token": lambda: cached.get_current_user(token),
+        }
+
+        # The client checks the token's expiry before every query
+        expires = jwt.decode(token, options={"verify_signature": False})["exp"]
+        client = {
+            "decode token": lambda: (
+                jwt.decode(token, options={"verify_signature": False})["exp"]
+                - time.time()
+            ),
+            "cached expiry": lambda: expires - time.time(),
+        }
+
+        for side, runs in (("server", server), ("client", client)):
+            baseline = None
+            for label, run in runs.items():
+                micros = per_call(run, args.calls)
+                baseline = baseline or micros
+                print(
+                    f"{side:<7}{label:<24}{micros:>9.2f} us/request"
+                    f"{baseline / micros:>8.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
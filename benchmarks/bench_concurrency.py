@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.data import write_accounts, write_table
+
+USER, PASSWORD = "bench", "bench"
+SQL = "SELECT id, price, category FROM bench WHERE qty > 20"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(storage: str, port: int, queue_depth: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        STORAGE_PATH=storage,
+        RESULT_QUEUE_DEPTH=str(queue_depth),
+        PARALLEL_SCAN_WORKERS="1",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "dbcsv.engine.main:app"]
+        + ["--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit("server did not start")
+
+
+async def run_load(base_url: str, concurrency: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        response = await client.post(
+            "/auth/connect", data={"username": USER, "password": PASSWORD}
+        )
+        headers = {
+            "Authorization": f"Bearer {response.json()['access_token']}",
+            "Accept-Encoding": "identity",
+        }
+
+        async def query() -> tuple[float, float]:
+            start = time.perf_counter()
+            first_byte = None
+            async with client.stream(
+                "POST",
+                "/query/sql",
+                json={"sql_statement": SQL, "schema": "bench"},
+                headers=headers,
+            ) as response:
+                async for _ in response.aiter_raw():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - start
+            return first_byte or 0.0, time.perf_counter() - start
+
+        async def probe(done: asyncio.Event) -> list:
+            # Latency of a trivial endpoint while the queries run shows
+            # whether the event loop stays responsive
+            latencies = []
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.05)
+            return latencies
+
+        done = asyncio.Event()
+        probe_task = asyncio.create_task(probe(done))
+        start = time.perf_counter()
+        results = await asyncio.gather(*(query() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        return {
+            "elapsed": elapsed,
+            "first_byte": [first for first, _ in results],
+            "total": [total for _, total in results],
+            "probe": await probe_task,
+        }
+
+
+def percentiles(values: list) -> str:
+    if len(values) < 2:
+        return f"p50 {values[0] * 1000 if values else 0:8.1f} ms"
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return "  ".join(f"p{p} {cuts[p - 1] * 1000:8.1f} ms" for p in (50, 95, 99))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent /query/sql latency")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--queue-depth", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as storage:
+        write_table(Path(storage, "bench"), "bench", args.rows)
+        write_accounts(Path(storage), USER, PASSWORD)
+
+        # Depth 0 is the threadpool-iterated generator used before
+        for label, depth in (("threadpool", 0), ("async queue", args.queue_depth)):
+            port = free_port()
+            server = start_server(storage, port, depth)
+            try:
+                result = asyncio.run(
+                    run_load(f"http://127.0.0.1:{port}", args.concurrency)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+
+            print(f"{label}: {args.concurrency} queries in {result['elapsed']:.2f} s")
+            print(f"  first byte  {percentiles(result['first_byte'])}")
+            print(f"  complete    {percentiles(result['total'])}")
+            print(f"  GET /       {percentiles(result['probe'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import random
+import time
+from typing import Any, Callable, List, Tuple
+
+from benchmarks.data import COLUMNS, GENERATORS
+from dbcsv.engine.relational.table import Table
+
+
+def make_rows(
+    columns: List[Tuple[str, str]], count: int, seed: int, null_fraction: float
+) -> List[List[str]]:
+    # CSV fields as the reader yields them: the row number, then random
+    # cells of each type, empty for NULL
+    rnd = random.Random(seed)
+    generators = [GENERATORS[dtype] for _, dtype in columns[1:]]
+    return [
+        [str(i)]
+        + [
+            "" if rnd.random() < null_fraction else str(generate(rnd))
+            for generate in generators
+        ]
+        for i in range(count)
+    ]
+
+
+def per_cell(
+    convert_row: Callable[[List[str]], Any], rows: List[List[str]], width: int
+) -> float:
+    # Nanoseconds per converted cell, best of three runs
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for fields in rows:
+            convert_row(fields)
+        best = min(best, time.perf_counter() - start)
+    return best / (len(rows) * width) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CSV cell conversion cost")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--null-fraction", type=float, default=0.01)
+    args = parser.parse_args()
+
+    columns = COLUMNS + [("moment", "DATETIME")]
+    rows = make_rows(columns, args.rows, args.seed, args.null_fraction)
+    table = Table(
+        "bench", [name for name, _ in columns], [dtype for _, dtype in columns]
+    )
+
+    print(f"rows: {args.rows:,}")
+    # Each column alone, then whole rows as a full scan converts them
+    for i, (name, dtype) in enumerate(columns):
+        nanos = per_cell(table._row_converter([i]), rows, 1)
+        print(f"{name + ' ' + dtype:<20}{nanos:>9.0f} ns/cell")
+    width = len(columns)
+    nanos = per_cell(table._row_converter(list(range(width))), rows, width)
+    print(f"{'all columns':<20}{nanos:>9.0f} ns/cell")
+
+
+if __name__ == "__main__":
+    main()
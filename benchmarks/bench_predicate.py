@@ -0,0 +1,134 @@
+import argparse
+import itertools
+import random
+import re
+import time
+
+from dbcsv.engine.query.lexical_analysis import SQLLexer
+from dbcsv.engine.query.predicate import compile_condition
+from dbcsv.engine.query.syntactic_analysis import SQLParser
+from dbcsv.engine.relational.datatype import DBTypeObject
+
+COLUMNS = {"col_0": "INT", "col_1": "FLOAT", "col_2": "VARCHAR"}
+WHERE = "SELECT * FROM t WHERE (col_0 > 50 AND col_1 < 50) OR col_2 = 'beta'"
+
+RE_NUMERIC_LITERAL = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+# The row interpreter SelectExecutor used before WHERE clauses were compiled,
+# kept as the baseline: it walks the AST and re-parses literals for every row
+def evaluate_condition(expr: dict, row: dict, columns: dict) -> bool:
+    try:
+        op = expr["op"]
+        if op == "AND":
+            return evaluate_condition(
+                expr["left"], row, columns
+            ) and evaluate_condition(expr["right"], row, columns)
+        elif op == "OR":
+            return evaluate_condition(expr["left"], row, columns) or evaluate_condition(
+                expr["right"], row, columns
+            )
+
+        # Leaf condition
+        left_val, left_type = resolve_operand(expr["left"], row, columns)
+        right_val, right_type = resolve_operand(expr["right"], row, columns)
+
+        if left_val is None or right_val is None:
+            return False  # Skip row if operand not resolvable
+
+        if left_type and not isinstance(left_val, DBTypeObject):
+            try:
+                left_val = DBTypeObject.convert_datatype(left_val, left_type)
+            except Exception:
+                pass
+
+        if right_type and not isinstance(right_val, DBTypeObject):
+            try:
+                right_val = DBTypeObject.convert_datatype(right_val, right_type)
+            except Exception:
+                pass
+
+        return compare(left_val, op, right_val)
+
+    except Exception:
+        return False  # Skip row on any error
+
+
+def resolve_operand(operand: str, row: dict, columns: dict) -> tuple:
+    operand_uc = operand.upper()
+    if operand.startswith("'") and operand.endswith("'"):
+        return operand[1:-1], None
+    elif RE_NUMERIC_LITERAL.match(operand) is not None:
+        return int(operand) if "." not in operand else float(operand), None
+    elif operand_uc == "TRUE":
+        return 1, None
+    elif operand_uc == "FALSE":
+        return 0, None
+    elif operand in row:
+        return row[operand], columns.get(operand)
+    else:
+        return None, None  # Unknown column or invalid operand
+
+
+def compare(left, op: str, right) -> bool:
+    if op == "=":
+        return left == right
+    elif op in ("!=", "<>"):
+        return left != right
+    elif op == "<":
+        return left < right
+    elif op == ">":
+        return left > right
+    elif op == "<=":
+        return left <= right
+    elif op == ">=":
+        return left >= right
+    else:
+        raise ValueError(f"Unknown operator: {op}")
+
+
+def make_rows(count: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    return [
+        {
+            "col_0": rnd.randint(0, 100),
+            "col_1": rnd.uniform(0, 100),
+            "col_2": rnd.choice(["alpha", "beta", "gamma"]),
+        }
+        for _ in range(count)
+    ]
+
+
+def measure(predicate, rows, total: int) -> tuple[float, int]:
+    matched = 0
+    start = time.perf_counter()
+    for row in itertools.islice(itertools.cycle(rows), total):
+        if predicate(row):
+            matched += 1
+    return total / (time.perf_counter() - start), matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Interpreted vs compiled WHERE")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--distinct", type=int, default=100_000)
+    args = parser.parse_args()
+
+    where = SQLParser(SQLLexer().tokenize(WHERE)).parse()["WHERE"]
+    rows = make_rows(min(args.distinct, args.rows))
+
+    interpreted = measure(
+        lambda row: evaluate_condition(where, row, COLUMNS), rows, args.rows
+    )
+    compiled = measure(
+        compile_condition(where, {name: name for name in COLUMNS}), rows, args.rows
+    )
+
+    print(f"rows evaluated: {args.rows:,}")
+    print(f"interpreted: {interpreted[0]:>14,.0f} rows/s  ({interpreted[1]:,} matched)")
+    print(f"compiled:    {compiled[0]:>14,.0f} rows/s  ({compiled[1]:,} matched)")
+    print(f"speedup:     {compiled[0] / interpreted[0]:>14.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.data import COLUMNS, write_table
+from dbcsv.engine.query.lexical_analysis import SQLLexer
+from dbcsv.engine.query.predicate import compile_condition
+from dbcsv.engine.query.syntactic_analysis import SQLParser
+from dbcsv.engine.relational.csvio import iter_rows
+from dbcsv.engine.relational.readahead import open_read_ahead
+
+WHERE = "SELECT * FROM bench WHERE (qty > 50 AND price < 250) OR category = 'beta'"
+
+
+def drop_cache(path: Path) -> None:
+    # Evict the file from the page cache so the next scan reads from disk
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def scan(file, predicate) -> int:
+    types = [int, float, int, str]
+    matched = 0
+    rows = iter_rows(file)
+    next(rows, None)  # header
+    for _, fields in rows:
+        try:
+            row = [parse(cell) for parse, cell in zip(types, fields)]
+        except ValueError:
+            continue
+        if predicate(row):
+            matched += 1
+    return matched
+
+
+def measure(path: Path, open_file, predicate, cold: bool) -> tuple[float, int]:
+    if cold:
+        drop_cache(path)
+    start = time.perf_counter()
+    with open_file() as file:
+        matched = scan(file, predicate)
+    return time.perf_counter() - start, matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scan with and without read-ahead")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--path", type=Path, help="existing benchmark table CSV")
+    parser.add_argument("--buffer-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--warm", action="store_true", help="keep the page cache")
+    args = parser.parse_args()
+
+    where = SQLParser(SQLLexer().tokenize(WHERE)).parse()["WHERE"]
+    predicate = compile_condition(
+        where, {name: i for i, (name, _) in enumerate(COLUMNS)}
+    )
+
+    with tempfile.TemporaryDirectory() as storage:
+        path = args.path or write_table(Path(storage), "bench", args.rows)
+        size = path.stat().st_size
+        direct = measure(path, lambda: open(path, "rb"), predicate, not args.warm)
+        ahead = measure(
+            path,
+            lambda: open_read_ahead(path, args.buffer_bytes, args.depth),
+            predicate,
+            not args.warm,
+        )
+        if direct[1] != ahead[1]:
+            raise SystemExit("read-ahead scan matched a different number of rows")
+
+    print(f"file: {size / 2**20:,.1f} MiB, {'warm' if args.warm else 'cold'} cache")
+    print(f"direct:     {direct[0]:>8.2f} s  {size / 2**20 / direct[0]:>8.1f} MiB/s")
+    print(f"read-ahead: {ahead[0]:>8.2f} s  {size / 2**20 / ahead[0]:>8.1f} MiB/s")
+    print(f"speedup:    {direct[0] / ahead[0]:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
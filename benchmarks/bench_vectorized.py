@@ -0,0 +1,58 @@
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.data import write_table
+
+QUERIES = [
+    "SELECT id FROM bench WHERE price > 500",
+    "SELECT id, price FROM bench WHERE (qty > 50 AND price < 250) OR qty = 7",
+    "SELECT * FROM bench WHERE category = 'beta' AND qty >= 90",
+    "SELECT id, day FROM bench WHERE day >= '2021-01-01' OR active = TRUE",
+]
+
+
+def measure(executor_class, schema, parsed, rows: int) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = list(executor_class(schema).execute(parsed))
+    return rows / (time.perf_counter() - start), results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Row vs vectorized execution")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as storage:
+        write_table(Path(storage, "bench"), "bench", args.rows)
+        # Settings are read at import time; also measure full scans only
+        os.environ["STORAGE_PATH"] = storage
+        os.environ["ZONE_MAP_BLOCK_ROWS"] = "0"
+
+        from dbcsv.engine.query.executor import SelectExecutor
+        from dbcsv.engine.query.lexical_analysis import SQLLexer
+        from dbcsv.engine.query.syntactic_analysis import SQLParser
+        from dbcsv.engine.query.vectorized import VectorizedExecutor
+        from dbcsv.engine.relational import get_schema
+
+        schema = get_schema("bench")
+        print(f"rows scanned per query: {args.rows:,}")
+        for sql in QUERIES:
+            parsed = SQLParser(SQLLexer().tokenize(sql)).parse()
+            row, row_results = measure(SelectExecutor, schema, parsed, args.rows)
+            vector, vector_results = measure(
+                VectorizedExecutor, schema, parsed, args.rows
+            )
+            if row_results != vector_results:
+                raise SystemExit(f"results differ for: {sql}")
+
+            print(sql)
+            print(f"  row:        {row:>14,.0f} rows/s  ({len(row_results):,} rows)")
+            print(f"  vectorized: {vector:>14,.0f} rows/s")
+            print(f"  speedup:    {vector / row:>14.1f}x")
+
+
+if __name__ == "__main__":
+    main()
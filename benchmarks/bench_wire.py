@@ -0,0 +1,66 @@
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.data import write_table
+
+QUERIES = [
+    "SELECT id, price, qty FROM bench",
+    "SELECT * FROM bench WHERE qty > 50",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSON vs binary result encoding")
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as storage:
+        write_table(Path(storage, "bench"), "bench", args.rows)
+        # Settings are read at import time
+        os.environ["STORAGE_PATH"] = storage
+        os.environ["PARALLEL_SCAN_WORKERS"] = "1"
+
+        from dbcsv.dbapi2.utils import iter_ndjson, read_binary
+        from dbcsv.engine.api.framing import binary_batches, ndjson_batches
+        from dbcsv.engine.query import prepare_query
+        from dbcsv.engine.query.executor import VALUE_ROWS
+        from dbcsv.engine.setting import RESULT_BATCH_BYTES, RESULT_BATCH_ROWS
+
+        def run_json(sql: str) -> tuple[list, int]:
+            executor, parsed = prepare_query(sql, "bench")
+            body = ndjson_batches(executor.execute(parsed), RESULT_BATCH_BYTES)
+            frames = list(body)
+            return list(iter_ndjson(iter(frames))), sum(map(len, frames))
+
+        def run_binary(sql: str) -> tuple[list, int]:
+            executor, parsed = prepare_query(sql, "bench", VALUE_ROWS)
+            body = binary_batches(
+                executor.execute(parsed), executor.describe(parsed), RESULT_BATCH_ROWS
+            )
+            frames = list(body)
+            _, rows = read_binary(iter(frames))
+            return list(rows), sum(map(len, frames))
+
+        # Engine scan, encoding and client decoding in one process; the
+        # socket is left out so the encodings are compared on CPU and size
+        for sql in QUERIES:
+            print(sql)
+            results = {}
+            for name, run in (("json", run_json), ("binary", run_binary)):
+                start = time.perf_counter()
+                rows, size = run(sql)
+                elapsed = time.perf_counter() - start
+                results[name] = rows
+                print(
+                    f"  {name:<7} {size / 2**20:>9.2f} MiB  "
+                    f"{len(rows) / elapsed:>12,.0f} rows/s"
+                )
+            if results["json"] != results["binary"]:
+                raise SystemExit(f"decoded rows differ for: {sql}")
+
+
+if __name__ == "__main__":
+    main()
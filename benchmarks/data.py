@@ -0,0 +1,104 @@
+import csv
+import datetime
+import json
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+# (column name, column type) of the synthetic benchmark table
+COLUMNS: List[Tuple[str, str]] = [
+    ("id", "INT"),
+    ("price", "FLOAT"),
+    ("qty", "INT"),
+    ("category", "VARCHAR"),
+    ("active", "BOOLEAN"),
+    ("day", "DATE"),
+]
+CATEGORIES = ["alpha", "beta", "gamma", "delta", "epsilon"]
+FIRST_DAY = datetime.date(2020, 1, 1)
+FIRST_TIME = datetime.datetime(2020, 1, 1)
+
+# Random cell value of each column type
+GENERATORS: Dict[str, Callable[[random.Random], Any]] = {
+    "INT": lambda rnd: rnd.randint(0, 100),
+    "FLOAT": lambda rnd: round(rnd.uniform(0, 1000), 2),
+    "VARCHAR": lambda rnd: rnd.choice(CATEGORIES),
+    "BOOLEAN": lambda rnd: rnd.choice(["true", "false"]),
+    "DATE": lambda rnd: FIRST_DAY + datetime.timedelta(days=rnd.randint(0, 1500)),
+    "DATETIME": lambda rnd: (
+        FIRST_TIME + datetime.timedelta(seconds=rnd.randint(0, 1500 * 86400))
+    ).isoformat(sep=" "),
+}
+
+
+def make_columns(count: int, types: List[str]) -> List[Tuple[str, str]]:
+    # An "id" INT column, then count - 1 columns cycling through types
+    return [("id", "INT")] + [
+        (f"col_{i}", types[(i - 1) % len(types)]) for i in range(1, count)
+    ]
+
+
+def write_table(
+    schema_path: Path,
+    table_name: str,
+    rows: int,
+    seed: int = 0,
+    null_fraction: float = 0.01,
+    columns: List[Tuple[str, str]] = COLUMNS,
+) -> Path:
+    # Writes <schema_path>/<table_name>.csv and declares it in metadata.yaml,
+    # keeping the tables already declared there. The first column holds the
+    # row number; the others are drawn from `seed`, so the same arguments
+    # always write the same file.
+    rnd = random.Random(seed)
+    generators = [GENERATORS[dtype.upper()] for _, dtype in columns[1:]]
+    schema_path.mkdir(parents=True, exist_ok=True)
+    table_path = schema_path.joinpath(f"{table_name}.csv")
+
+    def cell(value) -> str:
+        return "" if rnd.random() < null_fraction else str(value)
+
+    with open(table_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _ in columns])
+        for i in range(rows):
+            writer.writerow([i] + [cell(generate(rnd)) for generate in generators])
+
+    metadata_path = schema_path.joinpath("metadata.yaml")
+    metadata = {"tables": []}
+    if metadata_path.exists():
+        with open(metadata_path, "r") as f:
+            metadata = yaml.safe_load(f) or metadata
+    metadata["tables"] = [
+        table for table in metadata["tables"] if table["table_name"] != table_name
+    ]
+    metadata["tables"].append(
+        {
+            "table_name": table_name,
+            "columns": [
+                {"column_name": name, "column_type": dtype} for name, dtype in columns
+            ],
+        }
+    )
+    with open(metadata_path, "w") as f:
+        yaml.safe_dump(metadata, f, sort_keys=False)
+    return table_path
+
+
+def write_accounts(storage_path: Path, username: str, password: str) -> None:
+    # accounts.json with a single user, for benchmarks that go through /auth
+    with open(storage_path.joinpath("accounts.json"), "w") as f:
+        json.dump(
+            {
+                username: {
+                    "username": username,
+                    "email": None,
+                    "full_name": None,
+                    "hashed_password": password,
+                }
+            },
+            f,
+            indent=4,
+        )
@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.data import GENERATORS, make_columns, write_accounts, write_table
+
+USER, PASSWORD = "bench", "bench"
+SCHEMA, TABLE = "bench", "bench"
+# Settings that change the numbers, recorded with the results
+SETTINGS = [
+    "EXECUTION_MODE",
+    "PARALLEL_SCAN_WORKERS",
+    "READ_AHEAD_BUFFER_BYTES",
+    "ZONE_MAP_BLOCK_ROWS",
+    "RESULT_BATCH_BYTES",
+]
+
+
+def filtered_sql(columns: List[Tuple[str, str]]) -> str:
+    # Filters on the first generated numeric column (values 0-100 for INT,
+    # 0-1000 for FLOAT), else on the row number
+    for name, dtype in columns[1:]:
+        if dtype == "INT":
+            return f"SELECT * FROM {TABLE} WHERE {name} > 50"
+        if dtype == "FLOAT":
+            return f"SELECT * FROM {TABLE} WHERE {name} < 500"
+    return f"SELECT * FROM {TABLE} WHERE id >= 0"
+
+
+def measure(run: Callable[[], int], repeat: int) -> Dict[str, Any]:
+    # run() returns the number of items it processed; timings in seconds
+    times = []
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = run()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return {
+        "median": median,
+        "min": min(times),
+        "items": items,
+        "rate": items / median if median else 0.0,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def engine_benchmarks(
+    args: argparse.Namespace, columns: List[Tuple[str, str]]
+) -> Dict[str, Dict[str, Any]]:
+    # Imported here: settings are read at import time, after STORAGE_PATH
+    from dbcsv.engine.query import run_query
+    from dbcsv.engine.query.lexical_analysis import SQLLexer
+    from dbcsv.engine.query.semantic_analysis import SemanticAnalyzer
+    from dbcsv.engine.query.syntactic_analysis import SQLParser
+    from dbcsv.engine.relational import get_schema
+    from dbcsv.engine.setting import ZONE_MAP_BLOCK_ROWS
+
+    schema = get_schema(SCHEMA)
+    if ZONE_MAP_BLOCK_ROWS > 0:
+        # Built now rather than in the background during the first runs
+        schema.tables[TABLE].build_zone_map()
+
+    sql = filtered_sql(columns)
+    lexer = SQLLexer()
+    tokens = lexer.tokenize(sql)
+    parsed = SQLParser(tokens).parse()
+    analyzer = SemanticAnalyzer(schema)
+    iterations = args.iterations
+
+    def lex() -> int:
+        for _ in range(iterations):
+            lexer.tokenize(sql)
+        return iterations
+
+    def parse() -> int:
+        for _ in range(iterations):
+            SQLParser(tokens).parse()
+        return iterations
+
+    def analyze() -> int:
+        for _ in range(iterations):
+            analyzer.analyze(parsed)
+        return iterations
+
+    def scan(query: str) -> Callable[[], int]:
+        return lambda: sum(1 for _ in run_query(query, SCHEMA))
+
+    return {
+        "lexer.tokenize": measure(lex, args.repeat),
+        "parser.parse": measure(parse, args.repeat),
+        "semantic.analyze": measure(analyze, args.repeat),
+        "scan.raw": measure(scan(f"SELECT * FROM {TABLE}"), args.repeat),
+        "scan.filtered": measure(scan(sql), args.repeat),
+    }
+
+
+def http_benchmarks(
+    args: argparse.Namespace, columns: List[Tuple[str, str]]
+) -> Dict[str, Dict[str, Any]]:
+    import uvicorn
+
+    from dbcsv import dbapi2
+    from dbcsv.engine.main import app
+
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise SystemExit("server did not start")
+        time.sleep(0.05)
+
+    results = {}
+    try:
+        for result_format in ("json", "binary"):
+            connection = dbapi2.connect(
+                f"http://127.0.0.1:{port}/{SCHEMA}",
+                user=USER,
+                password=PASSWORD,
+                result_format=result_format,
+            )
+            try:
+
+                def fetch(query: str) -> Callable[[], int]:
+                    def run() -> int:
+                        cursor = connection.cursor()
+                        # Measure the query, not the engine's result cache
+                        cursor.use_cache = False
+                        cursor.execute(query)
+                        count = len(cursor.fetchall())
+                        cursor.close()
+                        return count
+
+                    return run
+
+                results[f"http.{result_format}.raw"] = measure(
+                    fetch(f"SELECT * FROM {TABLE}"), args.repeat
+                )
+                results[f"http.{result_format}.filtered"] = measure(
+                    fetch(filtered_sql(columns)), args.repeat
+                )
+            finally:
+                connection.close()
+    finally:
+        server.should_exit = True
+        thread.join()
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+) -> List[str]:
+    # Prints median times against the baseline; returns the benchmarks more
+    # than `threshold` slower
+    regressions = []
+    print(f"{'benchmark':<24}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or not base["median"]:
+            print(f"{name:<24}{'-':>12}{result['median']:>11.4f}s{'new':>10}")
+            continue
+        change = result["median"] / base["median"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<24}{base['median']:>11.4f}s{result['median']:>11.4f}s"
+            f"{change:>+10.1%}{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="dbcsv benchmark suite")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument(
+        "--types",
+        default="FLOAT,INT,VARCHAR,BOOLEAN,DATE",
+        help=f"comma-separated types of the generated columns: {', '.join(GENERATORS)}",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--null-fraction", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--iterations", type=int, default=10_000, help="queries per front-end run"
+    )
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown that counts as a regression (0.1 = 10%%)",
+    )
+    args = parser.parse_args()
+
+    types = [dtype.strip().upper() for dtype in args.types.split(",")]
+    unknown = [dtype for dtype in types if dtype not in GENERATORS]
+    if unknown:
+        raise SystemExit(f"unknown column types: {', '.join(unknown)}")
+    columns = make_columns(args.columns, types)
+
+    with tempfile.TemporaryDirectory() as storage:
+        write_table(
+            Path(storage, SCHEMA),
+            TABLE,
+            args.rows,
+            args.seed,
+            args.null_fraction,
+            columns,
+        )
+        write_accounts(Path(storage), USER, PASSWORD)
+        os.environ["STORAGE_PATH"] = storage
+
+        results = engine_benchmarks(args, columns)
+        if not args.skip_http:
+            results.update(http_benchmarks(args, columns))
+
+        from dbcsv.engine import setting
+
+        report = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "rows": args.rows,
+                "columns": columns,
+                "seed": args.seed,
+                "null_fraction": args.null_fraction,
+                "repeat": args.repeat,
+                "iterations": args.iterations,
+                "settings": {name: getattr(setting, name) for name in SETTINGS},
+            },
+            "results": results,
+        }
+
+    for name, result in results.items():
+        print(f"{name:<24}{result['median']:>11.4f}s  {result['rate']:>14,.0f} items/s")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["rows"] != args.rows or (
+            baseline["meta"]["columns"] != [list(column) for column in columns]
+        ):
+            print("warning: the baseline was run on a different table")
+        print()
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            raise SystemExit(f"regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
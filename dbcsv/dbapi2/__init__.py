@@ -1,3 +1,4 @@
+from dbcsv.dbapi2.async_connection import AsyncConnection, AsyncConnectionPool
 from dbcsv.dbapi2.connection import Connection
 from dbcsv.dbapi2.utils import get_base_url_and_schema
 
@@ -6,6 +7,37 @@ def connect(
     dsn: str,
     user: str,
     password: str,
+    result_format: str = "json",
+    compression: bool = True,
 ) -> Connection:
     base_url, schema = get_base_url_and_schema(dsn)
-    return Connection.connect(base_url, user, password, schema)
+    return Connection.connect(
+        base_url, user, password, schema, result_format, compression
+    )
+
+
+async def connect_async(
+    dsn: str,
+    user: str,
+    password: str,
+    result_format: str = "json",
+    compression: bool = True,
+) -> AsyncConnection:
+    base_url, schema = get_base_url_and_schema(dsn)
+    return await AsyncConnection.connect(
+        base_url, user, password, schema, result_format, compression
+    )
+
+
+async def create_pool(
+    dsn: str,
+    user: str,
+    password: str,
+    size: int = 10,
+    result_format: str = "json",
+    compression: bool = True,
+) -> AsyncConnectionPool:
+    base_url, schema = get_base_url_and_schema(dsn)
+    return await AsyncConnectionPool.connect(
+        base_url, user, password, schema, size, result_format, compression
+    )
@@ -0,0 +1,218 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, NoReturn
+
+from httpx import AsyncClient, Limits
+
+from dbcsv.dbapi2.async_cursor import AsyncCursor
+from dbcsv.dbapi2.connection import RESULT_FORMATS
+from dbcsv.dbapi2.exceptions import (
+    AuthenticationError,
+    InterfaceError,
+    NotSupportedError,
+)
+from dbcsv.dbapi2.utils import token_expiry
+
+
+class AsyncConnection:
+    _base_url: str
+    _token: str
+    _token_expires: float
+    _schema: str
+    _client: AsyncClient
+    _result_format: str
+    _compression: bool
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        schema: str,
+        client: AsyncClient,
+        result_format: str = "json",
+        compression: bool = True,
+    ):
+        self._base_url = base_url
+        self._token = token
+        self._token_expires = token_expiry(token)
+        self._client = client
+        self._schema = schema
+        self._result_format = result_format
+        self._compression = compression
+        # Cursors that find the token about to expire refresh it once
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return self._base_url
+
+    @property
+    def token(self) -> str:
+        return self._token
+
+    @property
+    def token_expires(self) -> float:
+        return self._token_expires
+
+    @property
+    def schema(self) -> str:
+        return self._schema
+
+    @property
+    def client(self) -> AsyncClient:
+        return self._client
+
+    @property
+    def result_format(self) -> str:
+        return self._result_format
+
+    @property
+    def compression(self) -> bool:
+        return self._compression
+
+    @classmethod
+    async def connect(
+        cls,
+        base_url: str,
+        user: str,
+        password: str,
+        schema: str,
+        result_format: str = "json",
+        compression: bool = True,
+        limits: Limits | None = None,
+    ) -> "AsyncConnection":
+        if result_format not in RESULT_FORMATS:
+            raise NotSupportedError(f"Unknown result format: {result_format}")
+        client = AsyncClient() if limits is None else AsyncClient(limits=limits)
+        response = None
+        try:
+            response = await client.post(
+                f"{base_url}/auth/connect",
+                data={"username": user, "password": password},
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
+            response.raise_for_status()
+            token = response.json()["access_token"]
+            return cls(base_url, token, schema, client, result_format, compression)
+        except Exception:
+            await client.aclose()
+            raise AuthenticationError(_error_detail(response))
+
+    def cursor(self) -> AsyncCursor:
+        return AsyncCursor(self)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncConnection":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _refresh(self) -> None:
+        token = self._token
+        async with self._refresh_lock:
+            if self._token != token:
+                return  # Another cursor refreshed it meanwhile
+            response = None
+            try:
+                response = await self._client.post(
+                    f"{self._base_url}/auth/refresh",
+                    headers={"Authorization": f"Bearer {self._token}"},
+                )
+                response.raise_for_status()
+                self._token = response.json()["access_token"]
+                self._token_expires = token_expiry(self._token)
+            except Exception:
+                await self._client.aclose()
+                raise AuthenticationError(_error_detail(response))
+
+    def commit(self) -> NoReturn:
+        raise NotSupportedError("commit() not supported")
+
+    def rollback(self) -> NoReturn:
+        raise NotSupportedError("rollback() not supported")
+
+
+class AsyncConnectionPool:
+    # Runs up to `size` queries at once over one AsyncConnection, so the
+    # cursors share its token and the client's keep-alive HTTP connections.
+    # Cursors beyond `size` wait for a free slot.
+    def __init__(self, connection: AsyncConnection, size: int):
+        if size < 1:
+            raise InterfaceError("Pool size must be at least 1")
+        self._connection = connection
+        self._size = size
+        self._slots = asyncio.Semaphore(size)
+        self._closed = False
+
+    @property
+    def connection(self) -> AsyncConnection:
+        return self._connection
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @classmethod
+    async def connect(
+        cls,
+        base_url: str,
+        user: str,
+        password: str,
+        schema: str,
+        size: int = 10,
+        result_format: str = "json",
+        compression: bool = True,
+    ) -> "AsyncConnectionPool":
+        if size < 1:
+            raise InterfaceError("Pool size must be at least 1")
+        connection = await AsyncConnection.connect(
+            base_url,
+            user,
+            password,
+            schema,
+            result_format,
+            compression,
+            Limits(max_connections=size, max_keepalive_connections=size),
+        )
+        return cls(connection, size)
+
+    @asynccontextmanager
+    async def cursor(self) -> AsyncIterator[AsyncCursor]:
+        # async with pool.cursor() as cursor: ... holds a slot until the
+        # block exits and the cursor is closed
+        if self._closed:
+            raise InterfaceError("Cannot use a closed pool.")
+        async with self._slots:
+            cursor = self._connection.cursor()
+            try:
+                yield cursor
+            finally:
+                await cursor.close()
+
+    async def execute(self, query: str) -> List[List[Any]]:
+        # Runs one query on a pooled cursor and returns all its rows
+        async with self.cursor() as cursor:
+            await cursor.execute(query)
+            return await cursor.fetchall()
+
+    async def close(self) -> None:
+        self._closed = True
+        await self._connection.close()
+
+    async def __aenter__(self) -> "AsyncConnectionPool":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+def _error_detail(response) -> str | None:
+    if response is None:
+        return None
+    try:
+        return response.json().get("detail")
+    except Exception:
+        return response.text
@@ -0,0 +1,172 @@
+import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+
+from dbcsv.dbapi2.cursor import query_request, read_page
+from dbcsv.dbapi2.exceptions import ProgrammingError
+from dbcsv.dbapi2.setting import ACCESS_TOKEN_DELTA_SECONDS
+from dbcsv.dbapi2.utils import aiter_ndjson, aread_binary
+
+if TYPE_CHECKING:
+    from dbcsv.dbapi2.async_connection import AsyncConnection
+
+
+class AsyncCursor:
+    # Cursor for asyncio code: the fetch methods are coroutines and
+    # `async for row in cursor` iterates the rows as they arrive
+    def __init__(self, connection: "AsyncConnection"):
+        self.connection = connection
+        self.rowcount = -1
+        self.description = None
+        # False asks the engine to run the query even if it has it cached
+        self.use_cache = True
+        # Fetch results in pages of this many rows, each with its own short
+        # request; None streams the whole result over one response. Results
+        # of JOIN, ORDER BY and aggregate queries always come in one response.
+        self.page_rows: int | None = None
+        self._results: Optional[AsyncIterator[List[Any]]] = None
+        self._response = None
+        self._stream_context = None
+        self._closed = False
+
+    def _ensure_open(self):
+        if self._closed:
+            raise ProgrammingError("Cannot operate on a closed cursor.")
+
+    async def _ensure_token(self):
+        delta = self.connection.token_expires - time.time()
+
+        if delta < ACCESS_TOKEN_DELTA_SECONDS:
+            await self.connection._refresh()
+
+    async def execute(self, query: str) -> None:
+        self._ensure_open()
+        await self._release()
+        if self.page_rows is not None:
+            rows, continuation = await self._fetch_page(query, None)
+            self._results = self._paged_rows(query, rows, continuation)
+            return
+
+        await self._ensure_token()
+
+        try:
+            self._stream_context = self.connection.client.stream(
+                **query_request(
+                    self.connection,
+                    "/query/sql",
+                    {"sql_statement": query, "use_cache": self.use_cache},
+                )
+            )
+            self._response = await self._stream_context.__aenter__()
+            self._response.raise_for_status()
+        except Exception:
+            error_message = ""
+            if self._response is not None:
+                content = await self._response.aread()
+                error_message = content.decode("utf-8", errors="replace")
+            await self._release()
+            raise ProgrammingError(error_message)
+
+        chunks = self._response.aiter_bytes()
+        if self.connection.result_format == "binary":
+            columns, self._results = await aread_binary(chunks)
+            self.description = [
+                (name, column_type, None, None, None, None, None)
+                for name, column_type in columns
+            ]
+        else:
+            self._results = aiter_ndjson(chunks)
+
+    async def _fetch_page(
+        self, query: str, continuation: str | None
+    ) -> Tuple[List[List[Any]], str | None]:
+        await self._ensure_token()
+        body = {
+            "sql_statement": query,
+            "page_rows": self.page_rows,
+            "continuation": continuation,
+        }
+        response = await self.connection.client.request(
+            **query_request(self.connection, "/query/sql", body)
+        )
+        columns, rows, continuation = read_page(self.connection, response)
+        if columns is not None:
+            self.description = [
+                (name, column_type, None, None, None, None, None)
+                for name, column_type in columns
+            ]
+        return rows, continuation
+
+    async def _paged_rows(
+        self, query: str, rows: List[List[Any]], continuation: str | None
+    ) -> AsyncIterator[List[Any]]:
+        for row in rows:
+            yield row
+        while continuation is not None:
+            rows, continuation = await self._fetch_page(query, continuation)
+            for row in rows:
+                yield row
+
+    def _ensure_results(self) -> AsyncIterator[List[Any]]:
+        self._ensure_open()
+        if self._results is None:
+            raise ProgrammingError("No query executed")
+        return self._results
+
+    async def fetchone(self) -> List[Any] | None:
+        row = await anext(self._ensure_results(), None)
+        if row is None:
+            await self._release()
+        return row
+
+    async def fetchmany(self, size: int = 1) -> List[List[Any]]:
+        results = []
+        async for row in self._ensure_results():
+            results.append(row)
+            if len(results) >= size:
+                break
+        else:
+            await self._release()
+
+        return results
+
+    async def fetchall(self) -> List[List[Any]]:
+        results = [row async for row in self._ensure_results()]
+        self.rowcount = len(results)
+        await self._release()
+        return results
+
+    def __aiter__(self) -> "AsyncCursor":
+        return self
+
+    async def __anext__(self) -> List[Any]:
+        row = await self.fetchone()
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    async def _release(self) -> None:
+        # Closes the HTTP stream so the server stops scanning and the
+        # connection goes back to the client's pool
+        if self._stream_context:
+            await self._stream_context.__aexit__(None, None, None)
+            self._results = _no_rows()
+        self._response = None
+        self._stream_context = None
+
+    async def close(self):
+        await self._release()
+        self._results = None
+        self._closed = True
+
+    async def __aenter__(self) -> "AsyncCursor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+async def _no_rows() -> AsyncIterator[List[Any]]:
+    # Results of a released stream
+    for row in ():
+        yield row
@@ -4,19 +4,37 @@ from httpx import Client
 
 from dbcsv.dbapi2.cursor import Cursor
 from dbcsv.dbapi2.exceptions import AuthenticationError, NotSupportedError
+from dbcsv.dbapi2.utils import token_expiry
+
+# "json": newline-delimited JSON rows; "binary": typed column batches
+RESULT_FORMATS = ("json", "binary")
 
 
 class Connection:
     _base_url: str
     _token: str
+    _token_expires: float
     _schema: str
     _client: Client
+    _result_format: str
+    _compression: bool
 
-    def __init__(self, base_url: str, token: str, schema: str, client: Client):
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        schema: str,
+        client: Client,
+        result_format: str = "json",
+        compression: bool = True,
+    ):
         self._base_url = base_url
         self._token = token
+        self._token_expires = token_expiry(token)
         self._client = client
         self._schema = schema
+        self._result_format = result_format
+        self._compression = compression
 
     @property
     def base_url(self) -> str:
@@ -26,6 +44,10 @@ class Connection:
     def token(self) -> str:
         return self._token
 
+    @property
+    def token_expires(self) -> float:
+        return self._token_expires
+
     @property
     def schema(self) -> str:
         return self._schema
@@ -34,10 +56,26 @@ class Connection:
     def client(self) -> Client:
         return self._client
 
+    @property
+    def result_format(self) -> str:
+        return self._result_format
+
+    @property
+    def compression(self) -> bool:
+        return self._compression
+
     @classmethod
     def connect(
-        cls, base_url: str, user: str, password: str, schema: str
+        cls,
+        base_url: str,
+        user: str,
+        password: str,
+        schema: str,
+        result_format: str = "json",
+        compression: bool = True,
     ) -> "Connection":
+        if result_format not in RESULT_FORMATS:
+            raise NotSupportedError(f"Unknown result format: {result_format}")
         client = Client()
         try:
             response = client.post(
@@ -47,7 +85,7 @@ class Connection:
             )
             response.raise_for_status()
             token = response.json()["access_token"]
-            return cls(base_url, token, schema, client)
+            return cls(base_url, token, schema, client, result_format, compression)
         except Exception:
             client.close()
             raise AuthenticationError(response.json().get("detail"))
@@ -58,6 +96,12 @@ class Connection:
     def close(self) -> None:
         self._client.close()
 
+    def __enter__(self) -> "Connection":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def _refresh(self) -> None:
         try:
             response = self._client.post(
@@ -66,6 +110,7 @@ class Connection:
             )
             response.raise_for_status()
             self._token = response.json()["access_token"]
+            self._token_expires = token_expiry(self._token)
         except Exception:
             self._client.close()
             raise AuthenticationError(response.json().get("detail"))
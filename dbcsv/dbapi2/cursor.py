@@ -1,23 +1,79 @@
-import json
 import time
 from collections.abc import Iterator
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import jwt
+from httpx import Response
 
 from dbcsv.dbapi2.exceptions import ProgrammingError
 from dbcsv.dbapi2.setting import ACCESS_TOKEN_DELTA_SECONDS
+from dbcsv.dbapi2.utils import (
+    iter_binary_sets,
+    iter_ndjson,
+    iter_ndjson_sets,
+    read_binary,
+    read_binary_frames,
+)
 
 if TYPE_CHECKING:
+    from dbcsv.dbapi2.async_connection import AsyncConnection
     from dbcsv.dbapi2.connection import Connection
 
+# Response header with the token of the next page of a paged query
+CONTINUATION_HEADER = "X-Continuation-Token"
+
+
+def query_request(
+    connection: "Connection | AsyncConnection", path: str, body: Dict[str, Any]
+) -> Dict[str, Any]:
+    # Arguments of the client.stream call that posts a query request
+    return {
+        "method": "POST",
+        "url": f"{connection.base_url}{path}",
+        "json": {
+            **body,
+            "schema": connection.schema,
+            "result_format": connection.result_format,
+        },
+        "headers": {
+            "Authorization": f"Bearer {connection.token}",
+            # httpx decompresses the stream as it arrives
+            "Accept-Encoding": (
+                "gzip, deflate" if connection.compression else "identity"
+            ),
+        },
+    }
+
+
+def read_page(
+    connection: "Connection | AsyncConnection", response: Response
+) -> Tuple[List[List[str]] | None, List[List[Any]], str | None]:
+    # Columns (binary format only), rows and next-page token of a response
+    # to a paged query
+    if response.is_error:
+        raise ProgrammingError(response.text)
+    chunks = iter([response.content])
+    columns = None
+    if connection.result_format == "binary":
+        columns, rows = read_binary(chunks)
+    else:
+        rows = iter_ndjson(chunks)
+    return columns, list(rows), response.headers.get(CONTINUATION_HEADER)
+
 
 class Cursor:
     def __init__(self, connection: "Connection"):
         self.connection = connection
         self.rowcount = -1
         self.description = None
-        self._results: Optional[Iterator[bytes]] = None
+        # False asks the engine to run the query even if it has it cached
+        self.use_cache = True
+        # Fetch results in pages of this many rows, each with its own short
+        # request; None streams the whole result over one response. Results
+        # of JOIN, ORDER BY and aggregate queries always come in one response.
+        self.page_rows: int | None = None
+        self._results: Optional[Iterator[List[Any]]] = None
+        # Result sets of executemany() not read yet
+        self._result_sets: Optional[Iterator[Iterator[Any]]] = None
         self._response = None
         self._stream_context = None
         self._closed = False
@@ -27,60 +83,139 @@ class Cursor:
             raise ProgrammingError("Cannot operate on a closed cursor.")
 
     def _ensure_token(self):
-        decoded: Dict[str, Any] = jwt.decode(
-            self.connection.token, options={"verify_signature": False}
-        )
-        delta = decoded.get("exp", 0) - time.time()
+        delta = self.connection.token_expires - time.time()
 
         if delta < ACCESS_TOKEN_DELTA_SECONDS:
             self.connection._refresh()
 
-    def execute(self, query: str) -> None:
+    def _open(self, path: str, body: Dict[str, Any]) -> Iterator[bytes]:
         self._ensure_open()
         self._ensure_token()
+        self._release()
 
         try:
             self._stream_context = self.connection.client.stream(
-                method="POST",
-                url=f"{self.connection.base_url}/query/sql",
-                json={"sql_statement": query, "schema": self.connection.schema},
-                headers={"Authorization": f"Bearer {self.connection.token}"},
+                **query_request(self.connection, path, body)
             )
             self._response = self._stream_context.__enter__()  # enter manually
             self._response.raise_for_status()
-            self._results = self._response.iter_bytes()
         except Exception:
             content = self._response.read()
             error_message = content.decode("utf-8", errors="replace")
             raise ProgrammingError(error_message)
+        return self._response.iter_bytes()
+
+    def execute(self, query: str) -> None:
+        if self.page_rows is not None:
+            self._ensure_open()
+            self._release()
+            rows, continuation = self._fetch_page(query, None)
+            self._results = self._paged_rows(query, rows, continuation)
+            return
+
+        chunks = self._open(
+            "/query/sql", {"sql_statement": query, "use_cache": self.use_cache}
+        )
+        if self.connection.result_format == "binary":
+            columns, self._results = read_binary(chunks)
+            self.description = [
+                (name, column_type, None, None, None, None, None)
+                for name, column_type in columns
+            ]
+        else:
+            self._results = iter_ndjson(chunks)
+
+    def _fetch_page(
+        self, query: str, continuation: str | None
+    ) -> Tuple[List[List[Any]], str | None]:
+        # One page read in full, so the connection is free between pages;
+        # returns its rows and the token of the next page
+        self._ensure_token()
+        body = {
+            "sql_statement": query,
+            "page_rows": self.page_rows,
+            "continuation": continuation,
+        }
+        response = self.connection.client.request(
+            **query_request(self.connection, "/query/sql", body)
+        )
+        columns, rows, continuation = read_page(self.connection, response)
+        if columns is not None:
+            self.description = [
+                (name, column_type, None, None, None, None, None)
+                for name, column_type in columns
+            ]
+        return rows, continuation
+
+    def _paged_rows(
+        self, query: str, rows: List[List[Any]], continuation: str | None
+    ) -> Iterator[List[Any]]:
+        # The next page is requested when the rows of this one run out
+        yield from rows
+        while continuation is not None:
+            rows, continuation = self._fetch_page(query, continuation)
+            yield from rows
+
+    def executemany(self, queries: List[str]) -> None:
+        # Runs the queries in one request, scanning each table once for all
+        # of them. The rows of the first query are fetched first, nextset()
+        # moves to the next query.
+        chunks = self._open("/query/batch", {"sql_statements": list(queries)})
+        if self.connection.result_format == "binary":
+            self._result_sets = iter_binary_sets(chunks)
+        else:
+            self._result_sets = iter_ndjson_sets(chunks)
+        self.nextset()
+
+    def nextset(self) -> bool | None:
+        # True when the next result set is ready, None after the last one;
+        # rows of the current set that were not fetched are skipped
+        self._ensure_open()
+        if self._result_sets is None:
+            return None
+        members = next(self._result_sets, None)
+        if members is None:
+            self._release()
+            return None
+
+        self.rowcount = -1
+        if self.connection.result_format == "binary":
+            columns, self._results = read_binary_frames(members)
+            self.description = [
+                (name, column_type, None, None, None, None, None)
+                for name, column_type in columns
+            ]
+        else:
+            self._results = members
+        return True
+
+    def _end_of_rows(self) -> None:
+        # The stream of executemany() stays open for the following sets
+        if self._result_sets is None:
+            self._release()
 
     def fetchone(self) -> List[Any] | None:
         self._ensure_open()
         if self._results is None:
             raise ProgrammingError("No query executed")
 
-        try:
-            while True:
-                chunk = next(self._results)
-                if chunk.strip():  # skip empty chunks
-                    return json.loads(chunk.decode())
-        except StopIteration:
-            return None
+        row = next(self._results, None)
+        if row is None:
+            self._end_of_rows()
+        return row
 
     def fetchmany(self, size: int = 1) -> List[List[Any]]:
         self._ensure_open()
         if self._results is None:
             raise ProgrammingError("No query executed")
 
-        i = 1
         results = []
-        for chunk in self._results:
-            if chunk.strip():
-                results.append(json.loads(chunk.decode()))
-
-            if i >= size:
+        for row in self._results:
+            results.append(row)
+            if len(results) >= size:
                 break
-            i += 1
+        else:
+            self._end_of_rows()
 
         return results
 
@@ -89,18 +224,28 @@ class Cursor:
         if self._results is None:
             raise ProgrammingError("No query executed")
 
-        results = []
-        for chunk in self._results:
-            if chunk.strip():
-                results.append(json.loads(chunk.decode()))
-
+        results = list(self._results)
         self.rowcount = len(results)
+        self._end_of_rows()
         return results
 
-    def close(self):
+    def _release(self) -> None:
+        # Closes the HTTP stream so the server stops scanning and frees the
+        # connection, while fetches keep returning no rows
         if self._stream_context:
             self._stream_context.__exit__(None, None, None)
-        self._results = None
+            self._results = iter(())
+        self._result_sets = None
         self._response = None
         self._stream_context = None
+
+    def close(self):
+        self._release()
+        self._results = None
         self._closed = True
+
+    def __enter__(self) -> "Cursor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -1,5 +1,14 @@
+import datetime
+import json
+import struct
+import sys
+from array import array
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Callable, Dict, List, Tuple
 from urllib.parse import urlparse
 
+import jwt
+
 from dbcsv.dbapi2.exceptions import OperationalError
 
 
@@ -13,3 +22,239 @@ def get_base_url_and_schema(dsn: str):
     if not base_url or not schema:
         raise OperationalError("dsn wrong format")
     return base_url, schema
+
+
+def token_expiry(token: str) -> float:
+    # Unix time the access token expires, read once when it is issued; the
+    # engine checks the signature, the client only needs the claim
+    decoded: Dict[str, Any] = jwt.decode(token, options={"verify_signature": False})
+    return decoded.get("exp", 0)
+
+
+class NDJSONDecoder:
+    # Decodes newline-delimited JSON rows however the transport split or
+    # merged the chunks; a row is only parsed once its newline arrived
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[List[Any]]:
+        buffer = self._buffer
+        buffer += chunk
+        end = buffer.rfind(b"\n")
+        if end < 0:
+            return []
+        lines = buffer[:end].split(b"\n")
+        del buffer[: end + 1]
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def finish(self) -> List[List[Any]]:
+        rows = [json.loads(self._buffer)] if self._buffer.strip() else []
+        self._buffer = bytearray()
+        return rows
+
+
+def iter_ndjson(chunks: Iterator[bytes]) -> Iterator[List[Any]]:
+    decoder = NDJSONDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.finish()
+
+
+async def aiter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[Any]]:
+    decoder = NDJSONDecoder()
+    async for chunk in chunks:
+        for row in decoder.feed(chunk):
+            yield row
+    for row in decoder.finish():
+        yield row
+
+
+# Value encodings of the binary result format, see
+# dbcsv.engine.api.framing.binary_batches
+INT64, FLOAT64, BOOL, DATE32, TIMESTAMP64, VARCHAR, JSON, INT32 = range(8)
+HAS_NULLS = 0x80
+BINARY_VERSION = 1
+
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# typecode, item size and conversion to the value the JSON format returns
+_FIXED: Dict[int, Tuple[str, int, Callable[[Any], Any] | None]] = {
+    INT64: ("q", 8, None),
+    INT32: ("i", 4, None),
+    FLOAT64: ("d", 8, None),
+    BOOL: ("B", 1, bool),
+    DATE32: ("i", 4, lambda value: datetime.date.fromordinal(value).isoformat()),
+    TIMESTAMP64: (
+        "q",
+        8,
+        lambda value: (datetime.datetime.min + value * _MICROSECOND).isoformat(),
+    ),
+}
+
+
+class FrameDecoder:
+    # Length-prefixed frames, reassembled across chunk boundaries
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer += chunk
+        frames = []
+        start = 0
+        while len(buffer) - start >= 4:
+            (size,) = struct.unpack_from("<I", buffer, start)
+            if len(buffer) - start - 4 < size:
+                break
+            frames.append(bytes(buffer[start + 4 : start + 4 + size]))
+            start += 4 + size
+        del buffer[:start]
+        return frames
+
+    def finish(self) -> None:
+        if self._buffer:
+            raise OperationalError("Result stream ended in the middle of a frame")
+
+
+def _iter_frames(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    decoder = FrameDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    decoder.finish()
+
+
+async def _aiter_frames(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    decoder = FrameDecoder()
+    async for chunk in chunks:
+        for frame in decoder.feed(chunk):
+            yield frame
+    decoder.finish()
+
+
+def _array(typecode: str, data: bytes) -> array:
+    values = array(typecode, data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _decode_batch(frame: bytes, width: int) -> Iterator[List[Any]]:
+    (row_count,) = struct.unpack_from("<I", frame)
+    position = 4
+    columns = []
+    for _ in range(width):
+        encoding = frame[position]
+        position += 1
+        has_nulls = bool(encoding & HAS_NULLS)
+        encoding &= ~HAS_NULLS
+        nulls = b""
+        if has_nulls:
+            nulls = frame[position : position + row_count]
+            position += row_count
+
+        if encoding in _FIXED:
+            typecode, size, convert = _FIXED[encoding]
+            end = position + size * row_count
+            values = _array(typecode, frame[position:end]).tolist()
+            if convert is not None:
+                # NULL cells hold a placeholder that may not convert
+                if has_nulls:
+                    values = [
+                        None if null else convert(value)
+                        for value, null in zip(values, nulls)
+                    ]
+                else:
+                    values = [convert(value) for value in values]
+            position = end
+        else:
+            end = position + 4 * (row_count + 1)
+            offsets = _array("I", frame[position:end]).tolist()
+            data = frame[end : end + offsets[-1]]
+            values = [
+                str(data[begin:stop], "utf-8")
+                for begin, stop in zip(offsets, offsets[1:])
+            ]
+            if encoding == JSON:
+                values = [json.loads(value) if value else None for value in values]
+            position = end + offsets[-1]
+
+        if has_nulls:
+            values = [None if null else value for value, null in zip(values, nulls)]
+        columns.append(values)
+    return map(list, zip(*columns))
+
+
+def read_binary(chunks: Iterator[bytes]) -> Tuple[List[List[str]], Iterator[List[Any]]]:
+    # Reads the header of a binary result stream and returns its
+    # [name, column type] pairs and an iterator over the rows. Values
+    # match what the JSON format returns, e.g. dates as ISO strings.
+    return read_binary_frames(_iter_frames(chunks))
+
+
+def read_binary_frames(
+    frames: Iterator[bytes],
+) -> Tuple[List[List[str]], Iterator[List[Any]]]:
+    columns = _read_header(next(frames, b""))
+
+    def rows() -> Iterator[List[Any]]:
+        for frame in frames:
+            yield from _decode_batch(frame, len(columns))
+
+    return columns, rows()
+
+
+async def aread_binary(
+    chunks: AsyncIterator[bytes],
+) -> Tuple[List[List[str]], AsyncIterator[List[Any]]]:
+    # read_binary for a response streamed by httpx.AsyncClient
+    frames = _aiter_frames(chunks)
+    columns = _read_header(await anext(frames, b""))
+
+    async def rows() -> AsyncIterator[List[Any]]:
+        async for frame in frames:
+            for row in _decode_batch(frame, len(columns)):
+                yield row
+
+    return columns, rows()
+
+
+def iter_result_sets(
+    items: Iterator[Any], is_marker: Callable[[Any], bool]
+) -> Iterator[Iterator[Any]]:
+    # Splits the rows or frames of a batch response at the markers that
+    # start each result set. The sets share the stream, so the rest of a
+    # set is skipped when the next one is taken.
+    item = next(items, None)
+    while item is not None:
+        following = None
+
+        def members() -> Iterator[Any]:
+            nonlocal following
+            for member in items:
+                if is_marker(member):
+                    following = member
+                    return
+                yield member
+
+        current = members()
+        yield current
+        for _ in current:
+            pass
+        item = following
+
+
+def iter_ndjson_sets(chunks: Iterator[bytes]) -> Iterator[Iterator[List[Any]]]:
+    # Rows are JSON arrays; each set starts with a {"result_set": i} line
+    return iter_result_sets(iter_ndjson(chunks), lambda row: isinstance(row, dict))
+
+
+def iter_binary_sets(chunks: Iterator[bytes]) -> Iterator[Iterator[bytes]]:
+    # Each set starts with an empty frame, then its header frame
+    return iter_result_sets(_iter_frames(chunks), lambda frame: not frame)
+
+
+def _read_header(frame: bytes) -> List[List[str]]:
+    header = json.loads(frame or b"{}")
+    if header.get("version") != BINARY_VERSION:
+        raise OperationalError("Unsupported binary result format")
+    return header["columns"]
@@ -0,0 +1,118 @@
+import zlib
+from collections.abc import Generator
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.responses import Response, StreamingResponse
+
+from dbcsv.engine.api.streaming import run_blocking, stream_in_thread
+from dbcsv.engine.query.stats import QueryStats
+from dbcsv.engine.setting import (
+    RESULT_COMPRESSION_ENCODINGS,
+    RESULT_COMPRESSION_LEVEL,
+    RESULT_COMPRESSION_MIN_BYTES,
+    RESULT_QUEUE_DEPTH,
+)
+
+# zlib window bits selecting the container format of each encoding
+WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    # The first configured encoding the client accepts, if any
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in RESULT_COMPRESSION_ENCODINGS:
+        if encoding in WBITS and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress_chunks(
+    chunks: Generator[bytes, None, None], encoding: str, level: int
+) -> Generator[bytes, None, None]:
+    # Each chunk is a whole frame; a sync flush after it lets the client
+    # decode those rows without waiting for the rest of the stream
+    compressor = zlib.compressobj(level, zlib.DEFLATED, WBITS[encoding])
+    try:
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    finally:
+        chunks.close()
+
+
+def _peek(
+    chunks: Generator[bytes, None, None], min_bytes: int
+) -> Tuple[List[bytes], bool]:
+    # Reads chunks until min_bytes are buffered; True when the stream ended
+    head: List[bytes] = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= min_bytes:
+            return head, False
+    return head, True
+
+
+def _resume(
+    head: List[bytes], chunks: Generator[bytes, None, None]
+) -> Generator[bytes, None, None]:
+    try:
+        yield from head
+        yield from chunks
+    finally:
+        chunks.close()
+
+
+async def result_response(
+    chunks: Generator[bytes, None, None],
+    media_type: str,
+    accept_encoding: str | None,
+    stats: QueryStats | None = None,
+    headers: Dict[str, str] | None = None,
+    cancel: Callable[[], None] | None = None,
+) -> Response:
+    # Streams the result, compressed when the client accepts a supported
+    # encoding and the result reaches RESULT_COMPRESSION_MIN_BYTES. The
+    # query stats are finished once the body has been sent. cancel() stops
+    # the queries when the client goes away; by default it cancels `stats`.
+    headers = dict(headers or {})
+    if cancel is None and stats is not None:
+        cancel = stats.cancel
+    encoding = choose_encoding(accept_encoding)
+    if encoding is not None:
+        # The headers go out before the body, so look at the start of the
+        # result first; this runs the scan, so keep it off the event loop
+        head, finished = await run_blocking(_peek, chunks, RESULT_COMPRESSION_MIN_BYTES)
+        headers["Vary"] = "Accept-Encoding"
+        if finished and sum(map(len, head)) < RESULT_COMPRESSION_MIN_BYTES:
+            content = b"".join(head)
+            if stats is not None:
+                stats.bytes_sent = len(content)
+                stats.finish()
+            return Response(content, media_type=media_type, headers=headers)
+
+        headers["Content-Encoding"] = encoding
+        chunks = compress_chunks(
+            _resume(head, chunks), encoding, RESULT_COMPRESSION_LEVEL
+        )
+
+    body = chunks
+    if stats is not None:
+        body = stats.track(body, count_bytes=True)
+    if RESULT_QUEUE_DEPTH > 0:
+        body = stream_in_thread(body, RESULT_QUEUE_DEPTH, cancel)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
@@ -0,0 +1,194 @@
+import datetime
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Generator, Iterator
+from itertools import islice
+from typing import Any, Callable, Dict, List, Tuple
+
+from dbcsv.engine.query.executor import SelectExecutor
+from dbcsv.engine.relational.datatype import (
+    BOOLEAN,
+    DATE,
+    DATETIME,
+    FLOAT,
+    INTEGER,
+    STRING,
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_batches(
+    rows: Generator[str, None, None], batch_bytes: int
+) -> Generator[bytes, None, None]:
+    # Packs newline-terminated JSON rows into writes of about batch_bytes.
+    # json.dumps escapes newlines inside strings, so "\n" only ends rows.
+    batch: List[str] = []
+    size = 0
+    try:
+        for row in rows:
+            batch.append(row)
+            size += len(row) + 1
+            if size >= batch_bytes:
+                yield _encode(batch)
+                batch, size = [], 0
+        if batch:
+            yield _encode(batch)
+    finally:
+        # Stops the scan when the client disconnects mid-stream
+        rows.close()
+
+
+def _encode(batch: List[str]) -> bytes:
+    batch.append("")
+    return "\n".join(batch).encode("utf-8")
+
+
+# Binary, column-batched results. Every frame is a little-endian u32
+# payload length followed by the payload: first a JSON header with the
+# output columns, then one frame per batch of rows:
+#   u32 row count, then per column: u8 encoding (HAS_NULLS set when one
+#   null byte per row follows), and the values: a fixed-width array, or
+#   u32 offsets followed by the UTF-8 data
+BINARY_MEDIA_TYPE = "application/vnd.dbcsv.batch"
+BINARY_VERSION = 1
+
+# Value encodings, shared with dbcsv.dbapi2.utils.read_binary
+INT64, FLOAT64, BOOL, DATE32, TIMESTAMP64, VARCHAR, JSON, INT32 = range(8)
+HAS_NULLS = 0x80
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# encoding -> (array typecode, encode, value written for NULL cells)
+_FIXED: Dict[int, Tuple[str, Callable[[Any], Any], Any]] = {
+    INT64: ("q", int, 0),
+    INT32: ("i", int, 0),
+    FLOAT64: ("d", float, 0.0),
+    BOOL: ("B", int, False),
+    DATE32: ("i", datetime.date.toordinal, datetime.date.min),
+    TIMESTAMP64: (
+        "q",
+        lambda value: (value - datetime.datetime.min) // _MICROSECOND,
+        datetime.datetime.min,
+    ),
+}
+
+
+def column_encoding(dtype: str) -> int:
+    if dtype in STRING:
+        return VARCHAR
+    if dtype in INTEGER:
+        return INT64
+    if dtype in FLOAT:
+        return FLOAT64
+    if dtype in BOOLEAN:
+        return BOOL
+    if dtype in DATE:
+        return DATE32
+    if dtype in DATETIME:
+        return TIMESTAMP64
+    return JSON
+
+
+def _frame(payload: bytes) -> bytes:
+    return struct.pack("<I", len(payload)) + payload
+
+
+def _encode_column(values: Tuple[Any, ...], encoding: int) -> bytes:
+    nulls = bytes([value is None for value in values]) if None in values else b""
+
+    if encoding in _FIXED:
+        typecode, encode, placeholder = _FIXED[encoding]
+        present = [value for value in values if value is not None]
+        filled = [placeholder if value is None else value for value in values]
+        try:
+            if (
+                encoding == INT64
+                and present
+                and INT32_MIN <= min(present)
+                and max(present) <= INT32_MAX
+            ):
+                encoding, typecode = INT32, "i"
+            data = array(typecode, map(encode, filled))
+            if sys.byteorder != "little":
+                data.byteswap()
+            return _column_header(encoding, nulls) + data.tobytes()
+        except (OverflowError, TypeError, ValueError):
+            encoding = JSON  # e.g. an integer beyond int64
+
+    # NULL cells are written as empty text
+    if encoding == VARCHAR and all(
+        value is None or isinstance(value, str) for value in values
+    ):
+        texts = ["" if value is None else value for value in values]
+    else:
+        encoding = JSON
+        texts = [
+            "" if value is None else json.dumps(SelectExecutor.convert_value(value))
+            for value in values
+        ]
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = array("I", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return _column_header(encoding, nulls) + offsets.tobytes() + b"".join(encoded)
+
+
+def _column_header(encoding: int, nulls: bytes) -> bytes:
+    if nulls:
+        return bytes([encoding | HAS_NULLS]) + nulls
+    return bytes([encoding])
+
+
+def binary_batches(
+    rows: Generator[List[Any], None, None],
+    columns: List[Tuple[str, str]],
+    batch_rows: int,
+) -> Generator[bytes, None, None]:
+    # rows hold the output values; columns are (name, column type) pairs
+    encodings = [column_encoding(dtype) for _, dtype in columns]
+    header = {
+        "version": BINARY_VERSION,
+        "columns": [[name, dtype] for name, dtype in columns],
+    }
+    try:
+        yield _frame(json.dumps(header).encode("utf-8"))
+        for batch in iter(lambda: list(islice(rows, batch_rows)), []):
+            payload = [struct.pack("<I", len(batch))]
+            for values, encoding in zip(zip(*batch), encodings):
+                payload.append(_encode_column(values, encoding))
+            yield _frame(b"".join(payload))
+    finally:
+        rows.close()
+
+
+# A batch response holds the result set of each statement in turn. Each
+# starts with a marker: a {"result_set": index} line before its NDJSON
+# rows, or an empty frame before its binary header frame.
+def ndjson_result_sets(
+    result_sets: Generator[Generator[str, None, None], None, None], batch_bytes: int
+) -> Generator[bytes, None, None]:
+    try:
+        for index, rows in enumerate(result_sets):
+            yield json.dumps({"result_set": index}).encode("utf-8") + b"\n"
+            yield from ndjson_batches(rows, batch_bytes)
+    finally:
+        result_sets.close()
+
+
+def binary_result_sets(
+    result_sets: Generator[Generator[List[Any], None, None], None, None],
+    columns: Iterator[List[Tuple[str, str]]],
+    batch_rows: int,
+) -> Generator[bytes, None, None]:
+    try:
+        for rows, set_columns in zip(result_sets, columns):
+            yield _frame(b"")
+            yield from binary_batches(rows, set_columns, batch_rows)
+    finally:
+        result_sets.close()
@@ -0,0 +1,29 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from dbcsv.engine.query.metrics import query_metrics
+from dbcsv.engine.query.result_cache import result_cache
+from dbcsv.engine.relational.catalog import catalog
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+# Served at the root, where Prometheus scrapes by default
+metrics_router = APIRouter(tags=["Monitoring"])
+
+
+@router.get("/catalog")
+def catalog_stats() -> Dict[str, int]:
+    return catalog.stats
+
+
+@router.get("/result-cache")
+def result_cache_stats() -> Dict[str, Any]:
+    return result_cache.stats
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        query_metrics.render(), media_type="text/plain; version=0.0.4"
+    )
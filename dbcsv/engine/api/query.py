@@ -1,19 +1,136 @@
-from typing import Annotated
+from typing import Annotated, Any, Dict
 
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header
+from fastapi.responses import Response
 
+from dbcsv.engine.api.compression import result_response
+from dbcsv.engine.api.framing import (
+    BINARY_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    binary_batches,
+    binary_result_sets,
+    ndjson_batches,
+    ndjson_result_sets,
+)
+from dbcsv.engine.api.streaming import run_blocking
 from dbcsv.engine.dependencies import current_user_dependency
-from dbcsv.engine.query import run_query
+from dbcsv.engine.exceptions import DatabaseException
+from dbcsv.engine.query import prepare_batch, prepare_query, run_batch
+from dbcsv.engine.query.executor import JSON_ROWS, VALUE_ROWS, SelectExecutor
+from dbcsv.engine.query.paging import CONTINUATION_HEADER, run_page
+from dbcsv.engine.query.result_cache import result_cache
 from dbcsv.engine.schemas.auth import User
-from dbcsv.engine.schemas.sql_request import SQLRequest
+from dbcsv.engine.schemas.sql_request import BatchSQLRequest, SQLRequest
+from dbcsv.engine.setting import RESULT_BATCH_BYTES, RESULT_BATCH_ROWS
 
 router = APIRouter(prefix="/query", tags=["Query"])
 
 
 @router.post("/sql")
 async def query_by_sql(
-    sql_request: SQLRequest, current_user: Annotated[User, current_user_dependency]
-) -> StreamingResponse:
-    results = run_query(sql=sql_request.sql_statement, schema_name=sql_request.schema)
-    return StreamingResponse(results, media_type="text/event-stream")
+    sql_request: SQLRequest,
+    current_user: Annotated[User, current_user_dependency],
+    accept_encoding: Annotated[str | None, Header()] = None,
+) -> Response:
+    binary = sql_request.result_format == "binary"
+    executor, parsed = prepare_query(
+        sql=sql_request.sql_statement,
+        schema_name=sql_request.schema,
+        row_format=VALUE_ROWS if binary else JSON_ROWS,
+    )
+    media_type = BINARY_MEDIA_TYPE if binary else NDJSON_MEDIA_TYPE
+
+    stats = executor.stats
+    # Results of JOIN, ORDER BY and aggregate queries have no table row to
+    # resume from, so they come whole in one response, with no token
+    if sql_request.page_rows is not None and executor.seekable(parsed):
+        return await query_page(sql_request, executor, parsed, accept_encoding)
+    if sql_request.continuation is not None:
+        raise DatabaseException("Continuation token belongs to another query")
+
+    use_cache = result_cache.enabled and sql_request.use_cache
+    if result_cache.enabled and not sql_request.use_cache:
+        result_cache.bypass()
+        stats.result_cache = "bypass"
+    if use_cache:
+        tables = [parsed["FROM"]]
+        if "JOIN" in parsed:
+            tables.append(parsed["JOIN"]["table"])
+        key = result_cache.key(
+            executor.schema, parsed, tables, sql_request.result_format
+        )
+        frames = result_cache.get(key)
+        if frames is not None:
+            stats.result_cache = "hit"
+            chunks = result_cache.replay(frames)
+            return await result_response(chunks, media_type, accept_encoding, stats)
+        stats.result_cache = "miss"
+
+    rows = executor.execute(parsed)
+    if binary:
+        chunks = binary_batches(rows, executor.describe(parsed), RESULT_BATCH_ROWS)
+    else:
+        chunks = ndjson_batches(rows, RESULT_BATCH_BYTES)
+    if use_cache:
+        chunks = result_cache.record(key, chunks, executor.schema, parsed, tables)
+    return await result_response(chunks, media_type, accept_encoding, stats)
+
+
+async def query_page(
+    sql_request: SQLRequest,
+    executor: SelectExecutor,
+    parsed: Dict[str, Any],
+    accept_encoding: str | None,
+) -> Response:
+    # The page is read before responding, so its continuation token can go
+    # in a header and the scan holds no file or thread between pages
+    rows, token = await run_blocking(
+        run_page,
+        executor,
+        parsed,
+        sql_request.sql_statement,
+        sql_request.schema,
+        sql_request.page_rows,
+        sql_request.continuation,
+    )
+    if sql_request.result_format == "binary":
+        columns = executor.describe(parsed)
+        chunks = binary_batches((row for row in rows), columns, RESULT_BATCH_ROWS)
+        media_type = BINARY_MEDIA_TYPE
+    else:
+        chunks = ndjson_batches((row for row in rows), RESULT_BATCH_BYTES)
+        media_type = NDJSON_MEDIA_TYPE
+    headers = {} if token is None else {CONTINUATION_HEADER: token}
+    return await result_response(
+        chunks, media_type, accept_encoding, executor.stats, headers
+    )
+
+
+@router.post("/batch")
+async def query_batch(
+    batch_request: BatchSQLRequest,
+    current_user: Annotated[User, current_user_dependency],
+    accept_encoding: Annotated[str | None, Header()] = None,
+) -> Response:
+    # Every statement is checked before any result is sent; statements on
+    # the same table share one scan of it
+    binary = batch_request.result_format == "binary"
+    prepared = prepare_batch(
+        batch_request.sql_statements,
+        batch_request.schema,
+        row_format=VALUE_ROWS if binary else JSON_ROWS,
+    )
+    result_sets = run_batch(prepared)
+    if binary:
+        columns = (executor.describe(parsed) for executor, parsed in prepared)
+        chunks = binary_result_sets(result_sets, columns, RESULT_BATCH_ROWS)
+        media_type = BINARY_MEDIA_TYPE
+    else:
+        chunks = ndjson_result_sets(result_sets, RESULT_BATCH_BYTES)
+        media_type = NDJSON_MEDIA_TYPE
+
+    def cancel() -> None:
+        for executor, _ in prepared:
+            executor.stats.cancel()
+
+    return await result_response(chunks, media_type, accept_encoding, cancel=cancel)
@@ -0,0 +1,64 @@
+import asyncio
+from collections.abc import AsyncGenerator, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Tuple, TypeVar
+
+from dbcsv.engine.setting import QUERY_THREADS
+
+# Produces result streams: scanning, encoding and compressing
+_executor = ThreadPoolExecutor(max_workers=QUERY_THREADS, thread_name_prefix="query")
+# Runs the short blocking calls made before a response starts, so streams
+# being produced cannot hold them up
+_call_executor = ThreadPoolExecutor(
+    max_workers=QUERY_THREADS, thread_name_prefix="query-call"
+)
+
+T = TypeVar("T")
+
+
+async def run_blocking(function: Callable[..., T], *args: Any) -> T:
+    return await asyncio.get_running_loop().run_in_executor(
+        _call_executor, function, *args
+    )
+
+
+async def stream_in_thread(
+    chunks: Generator[bytes, None, None],
+    depth: int,
+    cancel: Callable[[], None] | None = None,
+) -> AsyncGenerator[bytes, None]:
+    # Drains a synchronous result generator on worker threads, `depth`
+    # chunks per job. The next batch is produced while the current one is
+    # sent, so the event loop only wakes once per batch; a slow client holds
+    # no thread, just the batch waiting for it. When the client goes away,
+    # cancel() makes the scan stop at its next row.
+    loop = asyncio.get_running_loop()
+
+    def produce() -> Tuple[List[bytes], bool]:
+        # The next chunks and whether the result ended
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) == depth:
+                return batch, False
+        return batch, True
+
+    pending: asyncio.Future | None = loop.run_in_executor(_executor, produce)
+    try:
+        while pending is not None:
+            batch, finished = await pending
+            pending = None
+            if not finished:
+                pending = loop.run_in_executor(_executor, produce)
+            for chunk in batch:
+                yield chunk
+    finally:
+        if pending is not None:
+            # The client is done or went away
+            if cancel is not None:
+                cancel()
+            try:
+                await asyncio.shield(pending)
+            except Exception:
+                pass
+        await asyncio.shield(loop.run_in_executor(_executor, chunks.close))
@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 
-from dbcsv.engine.api import query, security
+from dbcsv.engine.api import monitoring, query, security
 
 app = FastAPI()
 
@@ -12,3 +12,5 @@ def root():
 
 app.include_router(router=query.router)
 app.include_router(router=security.router)
+app.include_router(router=monitoring.router)
+app.include_router(router=monitoring.metrics_router)
@@ -0,0 +1,71 @@
+import argparse
+
+from dbcsv.engine.relational import get_schema
+from dbcsv.engine.relational.columnar import convert_table
+
+
+def columnar(args: argparse.Namespace) -> None:
+    schema = get_schema(args.schema)
+    names = args.tables or [
+        name for name, table in schema.tables.items() if table.storage == "columnar"
+    ]
+    for name in names:
+        if not schema.has_table(name):
+            raise SystemExit(f"Unknown table: {name}")
+        path = convert_table(schema.tables[name])
+        print(f"{args.schema}.{name} -> {path}")
+
+
+def zonemap(args: argparse.Namespace) -> None:
+    schema = get_schema(args.schema)
+    for name in args.tables or schema.list_table_names():
+        if not schema.has_table(name):
+            raise SystemExit(f"Unknown table: {name}")
+        zone_map = schema.tables[name].build_zone_map()
+        print(f"{args.schema}.{name}: {len(zone_map.blocks)} blocks")
+
+
+def index(args: argparse.Namespace) -> None:
+    schema = get_schema(args.schema)
+    for name in args.tables or schema.list_table_names():
+        if not schema.has_table(name):
+            raise SystemExit(f"Unknown table: {name}")
+        indexes = schema.tables[name].build_indexes()
+        print(f"{args.schema}.{name}: indexed {', '.join(indexes) or 'nothing'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m dbcsv.engine.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser(
+        "columnar", help="Convert CSV tables to the columnar storage format"
+    )
+    command.add_argument("schema")
+    command.add_argument(
+        "tables",
+        nargs="*",
+        help="Tables to convert (default: tables declared with storage: columnar)",
+    )
+    command.set_defaults(handler=columnar)
+
+    command = commands.add_parser(
+        "zonemap", help="Build the min/max zone maps used to skip blocks"
+    )
+    command.add_argument("schema")
+    command.add_argument("tables", nargs="*", help="Tables (default: all)")
+    command.set_defaults(handler=zonemap)
+
+    command = commands.add_parser(
+        "index", help="Build the secondary indexes declared in metadata.yaml"
+    )
+    command.add_argument("schema")
+    command.add_argument("tables", nargs="*", help="Tables (default: all)")
+    command.set_defaults(handler=index)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,106 @@
+import logging
 from collections.abc import Generator
+from typing import Any, Dict, List, Tuple
 
-from dbcsv.engine.query.executor import SelectExecutor
+from dbcsv.engine.query.executor import JSON_ROWS, SelectExecutor
 from dbcsv.engine.query.lexical_analysis import SQLLexer
 from dbcsv.engine.query.semantic_analysis import SemanticAnalyzer
+from dbcsv.engine.query.shared_scan import shared_scans
+from dbcsv.engine.query.stats import QueryStats
 from dbcsv.engine.query.syntactic_analysis import SQLParser
+from dbcsv.engine.query.vectorized import VectorizedExecutor, np
 from dbcsv.engine.relational import get_schema
+from dbcsv.engine.setting import EXECUTION_MODE
 
+logger = logging.getLogger(__name__)
 
-def run_query(sql: str, schema_name: str) -> Generator[str, None, None]:
-    schema = get_schema(schema_name)
+
+def prepare_query(
+    sql: str, schema_name: str, row_format: str = JSON_ROWS
+) -> Tuple[SelectExecutor, Dict[str, Any]]:
+    stats = QueryStats(schema_name)
+    stats.sql = sql
+    with stats.stage("schema"):
+        schema = get_schema(schema_name)
 
     # Lexical analysis
-    lexer = SQLLexer()
-    tokens = lexer.tokenize(sql)
+    with stats.stage("lex"):
+        lexer = SQLLexer()
+        tokens = lexer.tokenize(sql)
 
     # Syntax parsing
-    parser = SQLParser(tokens)
-    parsed = parser.parse()
+    with stats.stage("parse"):
+        parser = SQLParser(tokens)
+        parsed = parser.parse()
+    stats.table_name = parsed["FROM"]
 
     # Semantic analysis
-    analyzer = SemanticAnalyzer(schema)
-    analyzer.analyze(parsed)
+    with stats.stage("analyze"):
+        analyzer = SemanticAnalyzer(schema)
+        analyzer.analyze(parsed)
+
+    executor = SelectExecutor(schema, row_format, stats)
+    if EXECUTION_MODE == "vectorized":
+        if np is not None:
+            executor = VectorizedExecutor(schema, row_format, stats)
+        else:
+            logger.warning("EXECUTION_MODE=vectorized needs numpy; using row mode")
+    return executor, parsed
+
+
+def run_query(
+    sql: str, schema_name: str, row_format: str = JSON_ROWS
+) -> Generator[str, None, None]:
+    executor, parsed = prepare_query(sql, schema_name, row_format)
+
+    # Execution; the stats are logged once the rows are consumed or closed
+    return executor.stats.track(executor.execute(parsed))
+
+
+def prepare_batch(
+    sqls: List[str], schema_name: str, row_format: str = JSON_ROWS
+) -> List[Tuple[SelectExecutor, Dict[str, Any]]]:
+    prepared = [prepare_query(sql, schema_name, row_format) for sql in sqls]
+
+    # Single-table queries on the same CSV table read it in one shared pass
+    groups: Dict[str, List[Tuple[SelectExecutor, Dict[str, Any]]]] = {}
+    for executor, parsed in prepared:
+        table = executor.schema.tables[parsed["FROM"]]
+        if "JOIN" not in parsed and table.storage == "csv":
+            groups.setdefault(parsed["FROM"], []).append((executor, parsed))
+
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        table = group[0][0].schema.tables[group[0][1]["FROM"]]
+        positions = [
+            executor.scan_positions(parsed, table.column_names)
+            for executor, parsed in group
+        ]
+        scan = shared_scans.start(table, sorted(set().union(*positions)))
+        for (executor, parsed), columns in zip(group, positions):
+            where_clause = parsed.get("WHERE")
+            executor.shared_consumer = scan.attach(
+                lambda keys, executor=executor, where_clause=where_clause: (
+                    executor.compile_predicate(where_clause, keys)
+                ),
+                columns,
+                executor.stats,
+            )
+    return prepared
+
 
-    # Execution
-    executor = SelectExecutor(schema)
-    return executor.execute(parsed)
+def run_batch(
+    prepared: List[Tuple[SelectExecutor, Dict[str, Any]]],
+) -> Generator[Generator[str, None, None], None, None]:
+    # The result rows of each query in turn. Queries share scans, so each
+    # result set must be read, or skipped, before the next.
+    try:
+        for executor, parsed in prepared:
+            yield executor.stats.track(executor.execute(parsed))
+    finally:
+        for executor, _ in prepared:
+            executor.detach_scan()
 
 
 if __name__ == "__main__":
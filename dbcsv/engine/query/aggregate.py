@@ -0,0 +1,146 @@
+from collections.abc import Generator, Iterable
+from typing import Any, Dict, List, Tuple
+
+AGGREGATE_FUNCTIONS = frozenset({"COUNT", "SUM", "MIN", "MAX", "AVG"})
+
+
+def is_aggregate(item: Any) -> bool:
+    # SELECT items are column names or {"func": ..., "arg": column or "*"}
+    return isinstance(item, dict)
+
+
+def has_aggregates(query: Dict[str, Any]) -> bool:
+    return "GROUP BY" in query or any(is_aggregate(item) for item in query["SELECT"])
+
+
+def output_name(item: Any) -> str:
+    if is_aggregate(item):
+        return f"{item['func']}({item['arg']})"
+    return item
+
+
+def output_type(item: Any, column_types: Dict[str, str]) -> str:
+    if not is_aggregate(item):
+        return column_types[item]
+    if item["func"] == "COUNT":
+        return "INT"
+    if item["func"] == "AVG":
+        return "FLOAT"
+    return column_types[item["arg"]]
+
+
+class Count:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def add(self, value: Any) -> None:
+        if value is not None:
+            self.value += 1
+
+    def result(self) -> Any:
+        return self.value
+
+
+class Sum:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = None
+
+    def add(self, value: Any) -> None:
+        if value is not None:
+            self.value = value if self.value is None else self.value + value
+
+    def result(self) -> Any:
+        return self.value
+
+
+class Min:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = None
+
+    def add(self, value: Any) -> None:
+        if value is not None and (self.value is None or value < self.value):
+            self.value = value
+
+    def result(self) -> Any:
+        return self.value
+
+
+class Max:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = None
+
+    def add(self, value: Any) -> None:
+        if value is not None and (self.value is None or value > self.value):
+            self.value = value
+
+    def result(self) -> Any:
+        return self.value
+
+
+class Avg:
+    __slots__ = ("total", "count")
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.count = 0
+
+    def add(self, value: Any) -> None:
+        if value is not None:
+            self.total += value
+            self.count += 1
+
+    def result(self) -> Any:
+        return self.total / self.count if self.count else None
+
+
+ACCUMULATORS = {"COUNT": Count, "SUM": Sum, "MIN": Min, "MAX": Max, "AVG": Avg}
+
+
+class HashAggregator:
+    # Streaming hash aggregation: rows are folded into one accumulator per
+    # aggregate of their group as they arrive, so memory holds only the
+    # groups, never the rows. Groups are emitted in order of first appearance.
+    def __init__(
+        self, group_keys: List[int], aggregates: List[Tuple[str, int | None]]
+    ) -> None:
+        # aggregates: (function, row key of the argument, None for COUNT(*))
+        self._group_keys = group_keys
+        self._aggregates = aggregates
+        self._groups: Dict[Tuple[Any, ...], List[Any]] = {}
+
+    @property
+    def group_count(self) -> int:
+        return len(self._groups)
+
+    def _new_state(self) -> List[Any]:
+        return [ACCUMULATORS[func]() for func, _ in self._aggregates]
+
+    def add_rows(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        group_keys = self._group_keys
+        # COUNT(*) counts every row: it is fed a constant instead of a cell
+        arguments = [key for _, key in self._aggregates]
+        groups = self._groups
+        for row in rows:
+            group = tuple([row[key] for key in group_keys])
+            state = groups.get(group)
+            if state is None:
+                state = groups[group] = self._new_state()
+            for accumulator, key in zip(state, arguments):
+                accumulator.add(True if key is None else row[key])
+
+    def results(self) -> Generator[Tuple[Any, ...], None, None]:
+        # (group values..., aggregate values...) per group. Without GROUP BY
+        # there is exactly one row, even over no input rows.
+        groups = self._groups
+        if not groups and not self._group_keys:
+            groups = {(): self._new_state()}
+        for group, state in groups.items():
+            yield group + tuple([accumulator.result() for accumulator in state])
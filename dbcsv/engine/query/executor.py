@@ -1,126 +1,565 @@
 import json
-import re
+import logging
 from datetime import date, datetime
-from typing import Any, Dict, Generator, List
+from itertools import chain, islice
+from time import perf_counter
+from typing import Any, Dict, Generator, List, Tuple
 
-from dbcsv.engine.relational.datatype import DBTypeObject
+from dbcsv.engine.query.aggregate import (
+    HashAggregator,
+    has_aggregates,
+    is_aggregate,
+    output_name,
+    output_type,
+)
+from dbcsv.engine.query.index_scan import lookup_offsets
+from dbcsv.engine.query.parallel import plan_splits, scan_parallel
+from dbcsv.engine.query.predicate import (
+    Predicate,
+    compile_condition,
+    condition_columns,
+)
+from dbcsv.engine.query.join import (
+    HashJoin,
+    join_columns,
+    push_down,
+    qualified_names,
+    qualify_query,
+)
+from dbcsv.engine.query.pruning import select_blocks
+from dbcsv.engine.query.shared_scan import ScanConsumer, shared_scans
+from dbcsv.engine.query.sort import ExternalSorter, sort_key, top_k
+from dbcsv.engine.query.spill import SAMPLE_ROWS, estimate_row_size
+from dbcsv.engine.query.stats import QueryStats
 from dbcsv.engine.relational.schema import Schema
+from dbcsv.engine.relational.table import Table
+from dbcsv.engine.relational.zonemap import Block
+from dbcsv.engine.setting import (
+    INDEX_SCAN_MAX_FRACTION,
+    JOIN_MEMORY_BYTES,
+    JOIN_PARTITIONS,
+    SHARED_SCAN_SEGMENT_BYTES,
+    SORT_MEMORY_BYTES,
+    SPILL_TEMP_DIR,
+)
 
-# Precompiled regex
-RE_NUMERIC_LITERAL = re.compile(r"^-?\d+(\.\d+)?$")
+logger = logging.getLogger(__name__)
+
+
+# Result rows: JSON text, or the list of output values for encoders that
+# serialize rows themselves
+JSON_ROWS = "json"
+VALUE_ROWS = "values"
 
 
 class SelectExecutor:
-    def __init__(self, schema: Schema):
+    def __init__(
+        self,
+        schema: Schema,
+        row_format: str = JSON_ROWS,
+        stats: QueryStats | None = None,
+    ):
         self.schema = schema
+        self.row_format = row_format
+        self.stats = stats
+        # Set when a batch attached this query to a scan shared with others
+        self.shared_consumer: ScanConsumer | None = None
+        # Byte offset of the last row read by a positioned scan
+        self.last_offset: int | None = None
+
+    def describe(self, query: Dict[str, Any]) -> List[Tuple[str, str]]:
+        # (name, column type) of each output column
+        query, _, column_names, column_types = self.resolve_columns(query)
+        types = dict(zip(column_names, column_types))
+        select_columns = query["SELECT"]
+        output = column_names if select_columns == ["*"] else select_columns
+        return [(output_name(item), output_type(item, types)) for item in output]
 
-    def execute(self, query: Dict[str, Any]) -> Generator[str, None, None]:
-        table_name = query["FROM"]
+    def resolve_columns(
+        self, query: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], List[Table], List[str], List[str]]:
+        # (query, tables, column names, column types). Rows of a join are the
+        # left table's columns then the right table's, named table.column,
+        # and the query is rewritten to use those names.
+        tables = [self.schema.tables[query["FROM"]]]
+        if "JOIN" not in query:
+            return query, tables, tables[0].column_names, tables[0].column_types
+        tables.append(self.schema.tables[query["JOIN"]["table"]])
+        column_types = [dtype for table in tables for dtype in table.column_types]
+        return (
+            qualify_query(query, tables),
+            tables,
+            qualified_names(tables),
+            column_types,
+        )
+
+    def execute(
+        self, query: Dict[str, Any], after: int | None = None
+    ) -> Generator[str, None, None]:
+        # `after` resumes a seekable query at the rows starting past that
+        # byte offset of the table, keeping last_offset up to date
+        query, tables, column_names, _ = self.resolve_columns(query)
+        table = tables[0]
         select_columns = query["SELECT"]
         where_clause = query.get("WHERE")
+        join = query.get("JOIN")
+        limit = query.get("LIMIT")
+        offset = query.get("OFFSET", 0)
+
+        if self.stats is None:
+            self.stats = QueryStats(self.schema.schema_name)
+        self.stats.table_name = table.table_name
+
+        # Rows are tuples indexed by position in `positions`
+        output = column_names if select_columns == ["*"] else select_columns
+        order_by = query.get("ORDER BY", [])
+        aggregated = has_aggregates(query)
+        group_by = query.get("GROUP BY", [])
+        positions = self.scan_positions(query, column_names)
+        keys = {column_names[i]: key for key, i in enumerate(positions)}
+
+        if limit == 0:
+            return
+
+        # Stop pulling rows, and so reading the file, once LIMIT is reached
+        stop = None if limit is None else offset + limit
+        if join:
+            matches = self.join_rows(tables, join, where_clause, positions, keys)
+        elif aggregated or order_by:
+            matches = self.scan_table(table, where_clause, positions, keys)
+
+        if aggregated:
+            results = self.aggregate_results(
+                matches, keys, output, group_by, order_by, stop
+            )
+        elif order_by:
+            order = [
+                (keys[item["column"]], item["direction"] == "DESC") for item in order_by
+            ]
+            ordered = self.sort_rows(matches, order, stop)
+            results = self.format_rows(ordered, [keys[name] for name in output])
+        elif join:
+            results = self.format_rows(matches, [keys[name] for name in output])
+        elif after is not None:
+            matches = self.positioned_rows(table, where_clause, positions, keys, after)
+            results = self.format_rows(matches, [keys[name] for name in output])
+        else:
+            projection = [keys[name] for name in output]
+            results = self.produce_results(
+                table, where_clause, positions, keys, projection, stop
+            )
+        returned = 0
+        try:
+            for row in islice(results, offset, stop):
+                returned += 1
+                yield row
+        finally:
+            # Closing the scan generator closes the table file right away
+            results.close()
+            self.stats.rows_returned += returned
+
+    @staticmethod
+    def seekable(query: Dict[str, Any]) -> bool:
+        # Each result row is a table row, returned in file order
+        return not ("JOIN" in query or "ORDER BY" in query or has_aggregates(query))
 
-        table = self.schema.tables[table_name]
-        self.columns = dict(zip(table.column_names, table.column_types))
-        data_gen = table.load_data_gen()
+    @staticmethod
+    def scan_positions(query: Dict[str, Any], column_names: List[str]) -> List[int]:
+        # Only the columns used by SELECT, WHERE, ON and ORDER BY are read and
+        # converted, in table order
+        select_columns = query["SELECT"]
+        output = column_names if select_columns == ["*"] else select_columns
+        order_by = query.get("ORDER BY", [])
+        if has_aggregates(query):
+            needed = set(query.get("GROUP BY", [])) | {
+                item["arg"] for item in output if is_aggregate(item)
+            }
+            needed |= {
+                item["column"]["arg"]
+                for item in order_by
+                if is_aggregate(item["column"])
+            }
+            needed.discard("*")
+        else:
+            needed = set(output) | {item["column"] for item in order_by}
+        if "WHERE" in query:
+            needed |= condition_columns(query["WHERE"], column_names)
+        if "JOIN" in query:
+            needed |= condition_columns(query["JOIN"]["ON"], column_names)
+        return [i for i, name in enumerate(column_names) if name in needed]
+
+    def detach_scan(self) -> None:
+        if self.shared_consumer is not None:
+            self.shared_consumer.close()
+
+    def produce_results(
+        self,
+        table: Table,
+        where_clause: Dict[str, Any] | None,
+        columns: List[int],
+        keys: Dict[str, int],
+        projection: List[int],
+        stop: int | None = None,
+    ) -> Generator[str, None, None]:
+        if self.shared_consumer is not None:
+            matches = self.scan_table(table, where_clause, columns, keys)
+            return self.format_rows(matches, projection)
+
+        offsets, blocks = self.plan_access(table, where_clause)
+        # Workers pay off by filtering rows away. A LIMIT is usually met by
+        # the first rows read, long before the pool would deliver a split.
+        if offsets is None and where_clause is not None and stop is None:
+            splits = plan_splits(table, blocks)
+            if splits is not None:
+                self.stats.parallel_splits = len(splits)
+                return scan_parallel(
+                    self, table, where_clause, columns, keys, projection, splits
+                )
+
+        matches = self.match_rows(table, where_clause, columns, keys, offsets, blocks)
+        return self.format_rows(matches, projection)
+
+    def scan_table(
+        self,
+        table: Table,
+        where_clause: Dict[str, Any] | None,
+        columns: List[int],
+        keys: Dict[str, int],
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        if self.shared_consumer is not None:
+            self.stats.access_path = "shared_scan"
+            return self.filter_rows(self.shared_consumer.rows(), None)
 
-        for row in data_gen:
+        offsets, blocks = self.plan_access(table, where_clause)
+        return self.match_rows(table, where_clause, columns, keys, offsets, blocks)
+
+    def positioned_rows(
+        self,
+        table: Table,
+        where_clause: Dict[str, Any] | None,
+        columns: List[int],
+        keys: Dict[str, int],
+        after: int,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        # Matching rows of the table past byte offset `after`, through the
+        # index or zone map when they apply. last_offset follows the rows
+        # read; matches are passed on one at a time, so once a row comes out
+        # of the pipeline it is the offset of that row.
+        offsets, blocks = self.plan_access(table, where_clause)
+        byte_ranges = None
+        if offsets is None:
+            size = table.table_path.stat().st_size
+            zone_map = table.zone_map() if blocks is not None else None
+            if zone_map is None:
+                byte_ranges = [(table.data_start(), size)]
+            else:
+                byte_ranges = zone_map.byte_ranges(blocks, size)
+        rows = table.load_positioned_rows(
+            columns, after, byte_ranges, offsets, stats=self.stats
+        )
+
+        def track(
+            rows: Generator[Tuple[int, Tuple[Any, ...]], None, None],
+        ) -> Generator[Tuple[Any, ...], None, None]:
             try:
-                if not where_clause or self.evaluate_condition(where_clause, row):
-                    yield self.format_row(row, select_columns)
-            except Exception:
-                continue  # Skip row on any evaluation error
-
-    def format_row(self, row: Dict[str, Any], select_columns: List[str]) -> str:
-        if select_columns == ["*"]:
-            projected = [self.convert_value(v) for v in row.values()]
+                for offset, row in rows:
+                    self.last_offset = offset
+                    yield row
+            finally:
+                rows.close()
+
+        return self.filter_rows(track(rows), self.compile_predicate(where_clause, keys))
+
+    def join_rows(
+        self,
+        tables: List[Table],
+        join: Dict[str, Any],
+        where_clause: Dict[str, Any] | None,
+        columns: List[int],
+        keys: Dict[str, int],
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        left, right = tables
+        width = len(left.column_names)
+        left_columns = [i for i in columns if i < width]
+        right_columns = [i - width for i in columns if i >= width]
+        left_keys = {left.column_names[i]: key for key, i in enumerate(left_columns)}
+        right_keys = {right.column_names[i]: key for key, i in enumerate(right_columns)}
+
+        # Single-table conditions filter the scans, with their zone maps and
+        # indexes; the rest is evaluated on the joined rows
+        left_where, right_where, residual = push_down(
+            where_clause, join, left.table_name, right.table_name
+        )
+        left_rows = self.scan_table(left, left_where, left_columns, left_keys)
+        right_rows = self.scan_table(right, right_where, right_columns, right_keys)
+
+        # The hash table is built on the smaller file, the other side probes
+        pairs = join_columns(join["ON"], left, right)
+        build_is_left = left.table_path.stat().st_size < right.table_path.stat().st_size
+        left_join_keys = [left_keys[name] for name, _ in pairs]
+        right_join_keys = [right_keys[name] for _, name in pairs]
+        keep_left = join["type"] == "LEFT"
+        if build_is_left:
+            build, probe = left_rows, right_rows
+            hash_join = HashJoin(
+                left_join_keys,
+                right_join_keys,
+                len(left_columns),
+                len(right_columns),
+                build_is_left=True,
+                keep_build=keep_left,
+                memory_bytes=JOIN_MEMORY_BYTES,
+                partitions=JOIN_PARTITIONS,
+                temp_dir=SPILL_TEMP_DIR,
+            )
         else:
-            projected = [
-                self.convert_value(row[col]) for col in select_columns if col in row
+            build, probe = right_rows, left_rows
+            hash_join = HashJoin(
+                right_join_keys,
+                left_join_keys,
+                len(right_columns),
+                len(left_columns),
+                build_is_left=False,
+                keep_probe=keep_left,
+                memory_bytes=JOIN_MEMORY_BYTES,
+                partitions=JOIN_PARTITIONS,
+                temp_dir=SPILL_TEMP_DIR,
+            )
+        self.stats.join_build = (left if build_is_left else right).table_name
+
+        predicate = self.compile_predicate(residual, keys)
+        joined = hash_join.join(build, probe)
+        matches = self.filter_rows(joined, predicate, "rows_joined")
+        try:
+            yield from matches
+        finally:
+            matches.close()
+            left_rows.close()
+            right_rows.close()
+            self.stats.join_partitions = hash_join.partition_count
+
+    def aggregate_results(
+        self,
+        matches: Generator[Tuple[Any, ...], None, None],
+        keys: Dict[str, int],
+        select_items: List[Any],
+        group_by: List[str],
+        order_by: List[Dict[str, Any]],
+        stop: int | None,
+    ) -> Generator[str, None, None]:
+        # Aggregates of SELECT, then those only ORDER BY uses; the input is
+        # consumed when this is called
+        aggregates: List[Dict[str, str]] = []
+        for item in select_items + [item["column"] for item in order_by]:
+            if is_aggregate(item) and item not in aggregates:
+                aggregates.append(item)
+        aggregator = HashAggregator(
+            [keys[name] for name in group_by],
+            [
+                (item["func"], None if item["arg"] == "*" else keys[item["arg"]])
+                for item in aggregates
+            ],
+        )
+
+        try:
+            aggregator.add_rows(matches)
+        finally:
+            matches.close()
+        self.stats.groups = aggregator.group_count
+
+        # Result rows are (GROUP BY values..., aggregate values...)
+        def result_key(item: Any) -> int:
+            if is_aggregate(item):
+                return len(group_by) + aggregates.index(item)
+            return group_by.index(item)
+
+        rows = aggregator.results()
+        if order_by:
+            order = [
+                (result_key(item["column"]), item["direction"] == "DESC")
+                for item in order_by
             ]
-        return json.dumps(projected)
+            rows = self.sort_rows(rows, order, stop)
+        projection = [result_key(item) for item in select_items]
+        return self.format_rows(rows, projection)
 
-    @staticmethod
-    def convert_value(val: Any) -> Any:
-        return val.isoformat() if isinstance(val, (date, datetime)) else val
+    def sort_rows(
+        self,
+        rows: Generator[Tuple[Any, ...], None, None],
+        order: List[Tuple[int, bool]],
+        stop: int | None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        # Rows up to `stop` (OFFSET + LIMIT) only need a bounded heap, unless
+        # `stop` rows would not fit in SORT_MEMORY_BYTES; a full sort spills
+        # to disk past SORT_MEMORY_BYTES
+        key, reverse = sort_key(order)
+        try:
+            sample: List[Tuple[Any, ...]] = []
+            if stop is not None:
+                sample = list(islice(rows, SAMPLE_ROWS))
+                if (
+                    len(sample) < SAMPLE_ROWS
+                    or stop * estimate_row_size(sample) <= SORT_MEMORY_BYTES
+                ):
+                    self.stats.sort_method = "top_k"
+                    yield from top_k(chain(sample, rows), stop, key, reverse)
+                    return
+
+            sorter = ExternalSorter(key, reverse, SORT_MEMORY_BYTES, SPILL_TEMP_DIR)
+            ordered = sorter.sort(chain(sample, rows))
+            try:
+                first = next(ordered, None)
+                self.stats.sort_method = "external" if sorter.run_count else "memory"
+                self.stats.sort_runs = sorter.run_count
+                if first is not None:
+                    yield first
+                    yield from ordered
+            finally:
+                ordered.close()
+        finally:
+            rows.close()
 
-    def evaluate_condition(self, expr: Dict[str, Any], row: Dict[str, Any]) -> bool:
+    def format_rows(
+        self, matches: Generator[Tuple[Any, ...], None, None], projection: List[int]
+    ) -> Generator[str, None, None]:
+        format_row = self.format_row
+        serialize_time = 0.0
         try:
-            op = expr["op"]
-            if op == "AND":
-                return self.evaluate_condition(
-                    expr["left"], row
-                ) and self.evaluate_condition(expr["right"], row)
-            elif op == "OR":
-                return self.evaluate_condition(
-                    expr["left"], row
-                ) or self.evaluate_condition(expr["right"], row)
-
-            # Leaf condition
-            left_val, left_type = self.resolve_operand(expr["left"], row)
-            right_val, right_type = self.resolve_operand(expr["right"], row)
-
-            if left_val is None or right_val is None:
-                return False  # Skip row if operand not resolvable
-
-            if left_type and not isinstance(left_val, DBTypeObject):
-                try:
-                    left_val = DBTypeObject.convert_datatype(left_val, left_type)
-                except Exception:
-                    pass
+            for row in matches:
+                start = perf_counter()
+                result = format_row(row, projection)
+                serialize_time += perf_counter() - start
+                yield result
+        finally:
+            matches.close()
+            self.stats.add_time("serialize", serialize_time)
+
+    def match_rows(
+        self,
+        table: Table,
+        where_clause: Dict[str, Any] | None,
+        columns: List[int],
+        keys: Dict[str, int],
+        offsets: List[int] | None,
+        blocks: List[Block] | None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        if offsets is not None:
+            rows = table.fetch_rows(offsets, columns, stats=self.stats)
+            return self.filter_rows(rows, self.compile_predicate(where_clause, keys))
+        return self.scan_blocks(table, where_clause, columns, keys, blocks)
 
-            if right_type and not isinstance(right_val, DBTypeObject):
+    def scan_blocks(
+        self,
+        table: Table,
+        where_clause: Dict[str, Any] | None,
+        columns: List[int],
+        keys: Dict[str, int],
+        blocks: List[Block] | None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        if blocks is None and SHARED_SCAN_SEGMENT_BYTES > 0 and table.storage == "csv":
+            # Full scans join one already running on the table
+            consumer = shared_scans.attach(
+                table,
+                columns,
+                lambda scan_keys: self.compile_predicate(where_clause, scan_keys),
+                self.stats,
+            )
+            self.stats.access_path = "shared_scan"
+            return self.filter_rows(consumer.rows(), None)
+
+        rows = table.load_data_gen(columns, blocks=blocks, stats=self.stats)
+        return self.filter_rows(rows, self.compile_predicate(where_clause, keys))
+
+    def compile_predicate(
+        self, where_clause: Dict[str, Any] | None, keys: Dict[str, int]
+    ) -> Predicate | None:
+        # Compile the WHERE tree once instead of interpreting it per row
+        if not where_clause:
+            return None
+        return compile_condition(where_clause, keys, self.stats.evaluation_error)
+
+    def filter_rows(
+        self,
+        rows: Generator[Tuple[Any, ...], None, None],
+        predicate: Predicate | None,
+        counter: str = "rows_matched",
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        # Counts the rows that pass into the stats field `counter`, and the
+        # rows that failed because evaluating the predicate raised
+        stats = self.stats
+        matched = skipped = 0
+        filter_time = 0.0
+        try:
+            if predicate is None:
+                for row in rows:
+                    if stats.cancelled:
+                        return
+                    matched += 1
+                    yield row
+                return
+
+            for row in rows:
+                if stats.cancelled:
+                    return
+                errors = stats.evaluation_errors
+                start = perf_counter()
                 try:
-                    right_val = DBTypeObject.convert_datatype(right_val, right_type)
+                    passed = predicate(row)
                 except Exception:
-                    pass
-
-            return self.compare(left_val, op, right_val)
-
-        except Exception:
-            return False  # Skip row on any error
-
-    def resolve_operand(
-        self, operand: str, row: Dict[str, Any]
-    ) -> tuple[Any, str | None]:
-        operand_uc = operand.upper()
-        if self.is_string_literal(operand):
-            return operand[1:-1], None
-        elif self.is_numeric_literal(operand):
-            return self.cast_number(operand), None
-        elif operand_uc == "TRUE":
-            return 1, None
-        elif operand_uc == "FALSE":
-            return 0, None
-        elif operand in row:
-            return row[operand], self.columns.get(operand)
-        else:
-            return None, None  # Unknown column or invalid operand
+                    passed = False  # Skip row on any evaluation error
+                    stats.evaluation_error()
+                filter_time += perf_counter() - start
+                if passed:
+                    matched += 1
+                    yield row
+                elif stats.evaluation_errors != errors:
+                    skipped += 1
+        finally:
+            rows.close()
+            setattr(stats, counter, getattr(stats, counter) + matched)
+            stats.rows_skipped += skipped
+            stats.add_time("filter", filter_time)
 
-    @staticmethod
-    def is_string_literal(value: str) -> bool:
-        return value.startswith("'") and value.endswith("'")
+    def plan_access(
+        self, table: Table, where_clause: Dict[str, Any] | None
+    ) -> Tuple[List[int] | None, List[Block] | None]:
+        # Picks the cheapest way to produce candidate rows: sorted row
+        # offsets from the indexes, zone map blocks to read, or (None, None)
+        # for a full scan
+        if not where_clause:
+            return None, None
 
-    @staticmethod
-    def is_numeric_literal(value: str) -> bool:
-        return RE_NUMERIC_LITERAL.match(value) is not None
+        indexes = table.indexes()
+        if indexes:
+            offsets = lookup_offsets(where_clause, indexes, table.column_names)
+            row_count = max(index.row_count for index in indexes.values())
+            if offsets is not None and (
+                len(offsets) <= row_count * INDEX_SCAN_MAX_FRACTION
+            ):
+                self.stats.access_path = "index"
+                self.stats.index_candidates = len(offsets)
+                return sorted(offsets), None
 
-    @staticmethod
-    def cast_number(value: str) -> Any:
-        return int(value) if "." not in value else float(value)
+        zone_map = table.zone_map()
+        if zone_map is None:
+            return None, None
+
+        blocks = select_blocks(zone_map, where_clause, table.column_names)
+        self.stats.access_path = "zone_map"
+        self.stats.blocks_total = len(zone_map.blocks)
+        self.stats.blocks_read = len(blocks)
+        self.stats.blocks_skipped = len(zone_map.blocks) - len(blocks)
+        if not self.stats.blocks_skipped:
+            return None, None
+        return None, blocks
+
+    def format_row(
+        self, row: Tuple[Any, ...], projection: List[int]
+    ) -> str | List[Any]:
+        if self.row_format == VALUE_ROWS:
+            return [row[key] for key in projection]
+        return json.dumps([self.convert_value(row[key]) for key in projection])
 
     @staticmethod
-    def compare(left: Any, op: str, right: Any) -> bool:
-        if op == "=":
-            return left == right
-        elif op in ("!=", "<>"):
-            return left != right
-        elif op == "<":
-            return left < right
-        elif op == ">":
-            return left > right
-        elif op == "<=":
-            return left <= right
-        elif op == ">=":
-            return left >= right
-        else:
-            raise ValueError(f"Unknown operator: {op}")
+    def convert_value(val: Any) -> Any:
+        return val.isoformat() if isinstance(val, (date, datetime)) else val
@@ -0,0 +1,54 @@
+from typing import Any, Dict, List, Set
+
+from dbcsv.engine.query.predicate import OPERATORS, UNRESOLVED, Column, resolve_operand
+from dbcsv.engine.query.pruning import FLIPPED
+from dbcsv.engine.relational.index import ColumnIndex
+
+INDEX_OPERATORS = frozenset({"=", "<", "<=", ">", ">="})
+
+
+def lookup_offsets(
+    expr: Dict[str, Any], indexes: Dict[str, ColumnIndex], column_names: List[str]
+) -> Set[int] | None:
+    # Candidate row offsets for expr, or None when the indexes cannot
+    # narrow it down and the table has to be scanned. Candidates are a
+    # superset of the matches; the caller still evaluates the predicate.
+    op = expr["op"]
+    if op == "AND":
+        left = lookup_offsets(expr["left"], indexes, column_names)
+        right = lookup_offsets(expr["right"], indexes, column_names)
+        if left is None:
+            return right
+        if right is None:
+            return left
+        return left & right
+    if op == "OR":
+        left = lookup_offsets(expr["left"], indexes, column_names)
+        if left is None:
+            return None
+        right = lookup_offsets(expr["right"], indexes, column_names)
+        if right is None:
+            return None
+        return left | right
+
+    columns = {name: name for name in column_names}
+    left = resolve_operand(expr["left"], columns)
+    right = resolve_operand(expr["right"], columns)
+    if left is UNRESOLVED or right is UNRESOLVED:
+        return set()  # the leaf is always False
+
+    if isinstance(left, Column) == isinstance(right, Column):
+        if isinstance(left, Column):
+            return None
+        # Constant leaf: fold it
+        try:
+            return None if OPERATORS[op](left, right) else set()
+        except Exception:
+            return set()
+
+    if isinstance(right, Column):
+        left, right, op = right, left, FLIPPED[op]
+    index = indexes.get(left.key)
+    if index is None or op not in INDEX_OPERATORS:
+        return None
+    return set(index.lookup(op, right))
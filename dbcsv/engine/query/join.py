@@ -0,0 +1,325 @@
+from collections.abc import Generator, Iterable
+from itertools import chain
+from typing import Any, Dict, List, Tuple
+
+from dbcsv.engine.exceptions import SyntaxException
+from dbcsv.engine.query.aggregate import is_aggregate
+from dbcsv.engine.query.predicate import UNRESOLVED, resolve_operand
+from dbcsv.engine.query.spill import SAMPLE_ROWS, SpillFile, estimate_row_size
+from dbcsv.engine.relational.table import Table
+
+# Bytes per build row on top of the row itself: dict slot, key tuple, list
+ENTRY_OVERHEAD = 120
+
+
+def is_column_reference(operand: str) -> bool:
+    return resolve_operand(operand, {}) is UNRESOLVED
+
+
+def qualify_column(name: str, tables: List[Table]) -> str:
+    # table.column for a qualified or unambiguous unqualified column name
+    if "." in name:
+        table_name, column = name.split(".", 1)
+        for table in tables:
+            if table.table_name == table_name and table.has_column(column):
+                return name
+        raise SyntaxException(f"Unknown column: {name}")
+
+    owners = [table.table_name for table in tables if table.has_column(name)]
+    if not owners:
+        raise SyntaxException(f"Unknown column: {name}")
+    if len(owners) > 1:
+        raise SyntaxException(f"Ambiguous column: {name}")
+    return f"{owners[0]}.{name}"
+
+
+def qualify_condition(expr: Dict[str, Any], tables: List[Table]) -> Dict[str, Any]:
+    # Operands that are not columns of the tables are kept as they are and
+    # compare False at run time, as in single-table queries
+    if expr["op"] in ("AND", "OR"):
+        return {
+            "op": expr["op"],
+            "left": qualify_condition(expr["left"], tables),
+            "right": qualify_condition(expr["right"], tables),
+        }
+
+    def qualify(operand: str) -> str:
+        if not is_column_reference(operand):
+            return operand
+        try:
+            return qualify_column(operand, tables)
+        except SyntaxException:
+            return operand
+
+    return {
+        "left": qualify(expr["left"]),
+        "op": expr["op"],
+        "right": qualify(expr["right"]),
+    }
+
+
+def qualify_query(query: Dict[str, Any], tables: List[Table]) -> Dict[str, Any]:
+    # Copy of a join query with every column reference written table.column
+    def qualify_item(item: Any) -> Any:
+        if is_aggregate(item):
+            if item["arg"] == "*":
+                return item
+            return {"func": item["func"], "arg": qualify_column(item["arg"], tables)}
+        return qualify_column(item, tables)
+
+    qualified = dict(query)
+    if query["SELECT"] != ["*"]:
+        qualified["SELECT"] = [qualify_item(item) for item in query["SELECT"]]
+    qualified["JOIN"] = dict(query["JOIN"])
+    qualified["JOIN"]["ON"] = qualify_condition(query["JOIN"]["ON"], tables)
+    if "WHERE" in query:
+        qualified["WHERE"] = qualify_condition(query["WHERE"], tables)
+    if "GROUP BY" in query:
+        qualified["GROUP BY"] = [
+            qualify_column(name, tables) for name in query["GROUP BY"]
+        ]
+    if "ORDER BY" in query:
+        qualified["ORDER BY"] = [
+            {"column": qualify_item(item["column"]), "direction": item["direction"]}
+            for item in query["ORDER BY"]
+        ]
+    return qualified
+
+
+def qualified_names(tables: List[Table]) -> List[str]:
+    return [
+        f"{table.table_name}.{column}"
+        for table in tables
+        for column in table.column_names
+    ]
+
+
+def split_conjuncts(expr: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if expr["op"] == "AND":
+        return split_conjuncts(expr["left"]) + split_conjuncts(expr["right"])
+    return [expr]
+
+
+def conjoin(conjuncts: List[Dict[str, Any]]) -> Dict[str, Any] | None:
+    expr = None
+    for conjunct in conjuncts:
+        expr = (
+            conjunct if expr is None else {"op": "AND", "left": expr, "right": conjunct}
+        )
+    return expr
+
+
+def referenced_tables(expr: Dict[str, Any]) -> set[str]:
+    # Tables whose columns a qualified condition reads
+    if expr["op"] in ("AND", "OR"):
+        return referenced_tables(expr["left"]) | referenced_tables(expr["right"])
+    return {
+        operand.split(".", 1)[0]
+        for operand in (expr["left"], expr["right"])
+        if "." in operand and is_column_reference(operand)
+    }
+
+
+def unqualify(expr: Dict[str, Any]) -> Dict[str, Any]:
+    # A single-table condition with the table prefix dropped, so the scan
+    # can plan it against zone maps and indexes
+    if expr["op"] in ("AND", "OR"):
+        return {
+            "op": expr["op"],
+            "left": unqualify(expr["left"]),
+            "right": unqualify(expr["right"]),
+        }
+
+    def strip(operand: str) -> str:
+        if "." in operand and is_column_reference(operand):
+            return operand.split(".", 1)[1]
+        return operand
+
+    return {
+        "left": strip(expr["left"]),
+        "op": expr["op"],
+        "right": strip(expr["right"]),
+    }
+
+
+def join_columns(
+    on: Dict[str, Any], left: Table, right: Table
+) -> List[Tuple[str, str]]:
+    # (left column, right column) pairs of an ON clause made of equalities
+    # joined by AND
+    pairs = []
+    for conjunct in split_conjuncts(on):
+        if conjunct["op"] != "=":
+            raise SyntaxException("ON supports equality conditions joined by AND")
+        sides = {}
+        for operand in (conjunct["left"], conjunct["right"]):
+            if "." not in operand or not is_column_reference(operand):
+                raise SyntaxException(f"Expected a join column in ON, got {operand}")
+            table_name, column = operand.split(".", 1)
+            sides[table_name] = column
+        if set(sides) != {left.table_name, right.table_name}:
+            raise SyntaxException("ON must compare a column of each joined table")
+        pairs.append((sides[left.table_name], sides[right.table_name]))
+    return pairs
+
+
+def push_down(
+    where_clause: Dict[str, Any] | None, join: Dict[str, Any], left: str, right: str
+) -> Tuple[Dict[str, Any] | None, Dict[str, Any] | None, Dict[str, Any] | None]:
+    # Splits a qualified WHERE into the (left scan, right scan, joined rows)
+    # conditions. Conditions on the right table of a LEFT JOIN stay on the
+    # joined rows, where the NULL-padded rows fail them.
+    if where_clause is None:
+        return None, None, None
+    pushed: Dict[str, List[Dict[str, Any]]] = {left: [], right: []}
+    residual = []
+    for conjunct in split_conjuncts(where_clause):
+        tables = referenced_tables(conjunct)
+        if tables == {left}:
+            pushed[left].append(conjunct)
+        elif tables == {right} and join["type"] == "INNER":
+            pushed[right].append(conjunct)
+        else:
+            residual.append(conjunct)
+    left_where, right_where = conjoin(pushed[left]), conjoin(pushed[right])
+    return (
+        None if left_where is None else unqualify(left_where),
+        None if right_where is None else unqualify(right_where),
+        conjoin(residual),
+    )
+
+
+class HashJoin:
+    # Equi-join that loads the build rows into a hash table and streams the
+    # probe rows past it. When the build side outgrows memory_bytes, both
+    # sides are hash partitioned into spill files and joined one partition
+    # at a time (grace hash join). Output rows are left row + right row;
+    # keep_build / keep_probe emit the unmatched rows of that side padded
+    # with NULLs, for LEFT JOIN.
+    def __init__(
+        self,
+        build_keys: List[int],
+        probe_keys: List[int],
+        build_width: int,
+        probe_width: int,
+        build_is_left: bool,
+        keep_build: bool = False,
+        keep_probe: bool = False,
+        memory_bytes: int = 64 * 1024 * 1024,
+        partitions: int = 16,
+        temp_dir: str | None = None,
+    ) -> None:
+        self._build_keys = build_keys
+        self._probe_keys = probe_keys
+        self._build_padding = (None,) * build_width
+        self._probe_padding = (None,) * probe_width
+        self._build_is_left = build_is_left
+        self._keep_build = keep_build
+        self._keep_probe = keep_probe
+        self._memory_bytes = memory_bytes
+        self._partitions = partitions
+        self._temp_dir = temp_dir
+        self._partition_count = 0
+
+    @property
+    def partition_count(self) -> int:
+        # 0 when the build side fit in memory
+        return self._partition_count
+
+    def _combine(self, build: Tuple[Any, ...], probe: Tuple[Any, ...]) -> Any:
+        return build + probe if self._build_is_left else probe + build
+
+    def join(
+        self,
+        build_rows: Iterable[Tuple[Any, ...]],
+        probe_rows: Iterable[Tuple[Any, ...]],
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        build_rows = iter(build_rows)
+        table: Dict[Tuple[Any, ...], List[Tuple[Any, ...]]] = {}
+        sample: List[Tuple[Any, ...]] = []
+        row_count = 0
+        max_rows = None
+        for row in build_rows:
+            key = tuple([row[k] for k in self._build_keys])
+            if None in key:
+                # A NULL key matches nothing
+                if self._keep_build:
+                    yield self._combine(row, self._probe_padding)
+                continue
+            table.setdefault(key, []).append(row)
+            row_count += 1
+            if max_rows is None:
+                sample.append(row)
+                if len(sample) == SAMPLE_ROWS:
+                    row_size = estimate_row_size(sample) + ENTRY_OVERHEAD
+                    max_rows = max(SAMPLE_ROWS, self._memory_bytes // row_size)
+                    sample = []
+            elif row_count >= max_rows:
+                loaded = (row for rows in table.values() for row in rows)
+                table = {}
+                yield from self._grace_join(chain(loaded, build_rows), probe_rows)
+                return
+
+        yield from self._probe(table, probe_rows)
+
+    def _probe(
+        self,
+        table: Dict[Tuple[Any, ...], List[Tuple[Any, ...]]],
+        probe_rows: Iterable[Tuple[Any, ...]],
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        probe_keys = self._probe_keys
+        matched = set() if self._keep_build else None
+        for row in probe_rows:
+            key = tuple([row[k] for k in probe_keys])
+            matches = table.get(key)
+            if matches:
+                if matched is not None:
+                    matched.add(key)
+                for build in matches:
+                    yield self._combine(build, row)
+            elif self._keep_probe:
+                yield self._combine(self._build_padding, row)
+
+        if matched is not None:
+            for key, rows in table.items():
+                if key not in matched:
+                    for build in rows:
+                        yield self._combine(build, self._probe_padding)
+
+    def _grace_join(
+        self,
+        build_rows: Iterable[Tuple[Any, ...]],
+        probe_rows: Iterable[Tuple[Any, ...]],
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        count = self._partitions
+        self._partition_count = count
+        build_parts = [SpillFile(self._temp_dir) for _ in range(count)]
+        probe_parts = [SpillFile(self._temp_dir) for _ in range(count)]
+        try:
+            for row in build_rows:
+                key = tuple([row[k] for k in self._build_keys])
+                if None in key:
+                    if self._keep_build:
+                        yield self._combine(row, self._probe_padding)
+                    continue
+                build_parts[hash(key) % count].append(row)
+
+            for row in probe_rows:
+                key = tuple([row[k] for k in self._probe_keys])
+                if None in key:
+                    if self._keep_probe:
+                        yield self._combine(self._build_padding, row)
+                    continue
+                probe_parts[hash(key) % count].append(row)
+
+            for build_part, probe_part in zip(build_parts, probe_parts):
+                table: Dict[Tuple[Any, ...], List[Tuple[Any, ...]]] = {}
+                for row in build_part.rows():
+                    key = tuple([row[k] for k in self._build_keys])
+                    table.setdefault(key, []).append(row)
+                build_part.close()
+                yield from self._probe(table, probe_part.rows())
+                probe_part.close()
+        finally:
+            for part in build_parts + probe_parts:
+                part.close()
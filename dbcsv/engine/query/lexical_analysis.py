@@ -22,7 +22,10 @@ class SQLLexer:
             ("MISMATCH", r"."),  # Any other character
         ]
 
-        # Use frozenset for faster keyword lookup
+        # Use frozenset for faster keyword lookup. Only these words are
+        # reserved; the other clause words and the aggregate functions are
+        # recognized by the parser where they can appear, so they remain
+        # usable as column names.
         self.KEYWORDS = frozenset(
             {
                 "SELECT",
@@ -0,0 +1,168 @@
+import bisect
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    from dbcsv.engine.query.stats import QueryStats
+
+SECONDS_BUCKETS = [
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+]
+BYTES_BUCKETS = [float(4**i * 1024) for i in range(11)]  # 1 KiB to 1 GiB
+ROWS_BUCKETS = [float(10**i) for i in range(9)]
+
+# QueryStats counters exported as <name>_total
+COUNTERS = {
+    "rows_read": "Data rows read from tables",
+    "rows_invalid": "Rows dropped for a wrong field count or unconvertible cell",
+    "rows_matched": "Rows that satisfied WHERE",
+    "rows_skipped": "Rows dropped because evaluating WHERE raised an error",
+    "evaluation_errors": "Errors raised while evaluating WHERE",
+    "rows_returned": "Rows produced by executed queries, not cache hits",
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    # Prometheus histogram, one series per label set
+    def __init__(self, name: str, help_text: str, buckets: List[float]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = sorted(buckets)
+        # labels -> (bucket counts, sum, count)
+        self._series: Dict[Tuple[Tuple[str, str], ...], List] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = labels + (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(le)} {cumulative}")
+            le = labels + (("le", "+Inf"),)
+            lines.append(f"{self.name}_bucket{_format_labels(le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class QueryMetrics:
+    # Aggregates the QueryStats of finished queries for /metrics
+    def __init__(self, prefix: str = "dbcsv_query") -> None:
+        self._lock = threading.Lock()
+        self._queries = Counter(f"{prefix}_total", "Queries finished")
+        self._duration = Histogram(
+            f"{prefix}_duration_seconds",
+            "Wall time of queries, from parsing to the last byte sent",
+            SECONDS_BUCKETS,
+        )
+        self._stages = Histogram(
+            f"{prefix}_stage_seconds",
+            "Time per query spent in each stage",
+            SECONDS_BUCKETS,
+        )
+        self._bytes = Histogram(
+            f"{prefix}_bytes_sent",
+            "Response bytes per query, after compression",
+            BYTES_BUCKETS,
+        )
+        self._rows = Histogram(
+            f"{prefix}_rows_returned",
+            "Rows returned per query",
+            ROWS_BUCKETS,
+        )
+        self._counters = {
+            name: Counter(f"{prefix}_{name}_total", help_text)
+            for name, help_text in COUNTERS.items()
+        }
+
+    def observe(self, stats: "QueryStats") -> None:
+        with self._lock:
+            self._queries.inc(
+                access_path=stats.access_path,
+                result_cache=stats.result_cache or "none",
+            )
+            self._duration.observe(stats.duration)
+            for stage, seconds in stats.stages.items():
+                self._stages.observe(seconds, stage=stage)
+            if stats.bytes_sent:
+                self._bytes.observe(stats.bytes_sent)
+            self._rows.observe(stats.rows_returned)
+            for name, counter in self._counters.items():
+                counter.inc(getattr(stats, name))
+
+    def render(self) -> str:
+        with self._lock:
+            lines = self._queries.render()
+            for metric in (self._duration, self._stages, self._bytes, self._rows):
+                lines.extend(metric.render())
+            for counter in self._counters.values():
+                lines.extend(counter.render())
+        return "\n".join(lines) + "\n"
+
+
+query_metrics = QueryMetrics()
@@ -0,0 +1,128 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any, Dict, List, Tuple
+
+import jwt
+
+from dbcsv.engine.exceptions import DatabaseException
+from dbcsv.engine.query.executor import SelectExecutor
+from dbcsv.engine.relational.csvio import source_fingerprint
+from dbcsv.engine.setting import (
+    ALGORITHM,
+    CONTINUATION_TOKEN_EXPIRE_MINUTES,
+    SECRET_KEY,
+)
+
+# Response header carrying the token of the next page
+CONTINUATION_HEADER = "X-Continuation-Token"
+
+# Audience of continuation tokens: they share the signing key with access
+# tokens, which are decoded without an audience and so reject them
+CONTINUATION_AUDIENCE = "dbcsv:continuation"
+
+
+def query_digest(sql: str, schema_name: str) -> str:
+    return hashlib.sha256(f"{schema_name}\0{sql}".encode("utf-8")).hexdigest()
+
+
+def table_versions(executor: SelectExecutor, query: Dict[str, Any]) -> List[List[int]]:
+    # [size, mtime_ns] of each table the query reads
+    names = [query["FROM"]]
+    if "JOIN" in query:
+        names.append(query["JOIN"]["table"])
+    versions = []
+    for name in names:
+        source = source_fingerprint(executor.schema.tables[name].table_path)
+        versions.append([source["size"], source["mtime_ns"]])
+    return versions
+
+
+class Continuation:
+    # Where a paged query stopped: the query and table versions it belongs
+    # to, the byte offset of the last row returned and the number of rows
+    # returned. Tokens are signed, so the offset can be trusted when the scan
+    # seeks to it.
+    def __init__(
+        self, digest: str, versions: List[List[int]], offset: int, returned: int
+    ) -> None:
+        self.digest = digest
+        self.versions = versions
+        self.offset = offset
+        self.returned = returned
+
+    def encode(self) -> str:
+        return jwt.encode(
+            {
+                "query": self.digest,
+                "versions": self.versions,
+                "offset": self.offset,
+                "returned": self.returned,
+                "aud": CONTINUATION_AUDIENCE,
+                "exp": datetime.now(timezone.utc)
+                + timedelta(minutes=CONTINUATION_TOKEN_EXPIRE_MINUTES),
+            },
+            SECRET_KEY,
+            algorithm=ALGORITHM,
+        )
+
+    @classmethod
+    def decode(
+        cls, token: str, digest: str, versions: List[List[int]]
+    ) -> "Continuation":
+        try:
+            payload: Dict[str, Any] = jwt.decode(
+                token,
+                SECRET_KEY,
+                algorithms=[ALGORITHM],
+                audience=CONTINUATION_AUDIENCE,
+                options={"require": ["aud", "exp"]},
+            )
+        except jwt.ExpiredSignatureError:
+            raise DatabaseException("Continuation token expired")
+        except jwt.InvalidTokenError:
+            raise DatabaseException("Invalid continuation token")
+        if payload.get("query") != digest:
+            raise DatabaseException("Continuation token belongs to another query")
+        if payload.get("versions") != versions:
+            raise DatabaseException("Table changed since the continuation token")
+        return cls(digest, versions, payload["offset"], payload["returned"])
+
+
+def run_page(
+    executor: SelectExecutor,
+    parsed: Dict[str, Any],
+    sql: str,
+    schema_name: str,
+    page_rows: int,
+    token: str | None = None,
+) -> Tuple[List[Any], str | None]:
+    # Up to page_rows result rows of a seekable query and the token of the
+    # next page, None once the result is complete. Pages resume by seeking
+    # past the last row returned.
+    digest = query_digest(sql, schema_name)
+    versions = table_versions(executor, parsed)
+    if token is None:
+        # Offset 0 is the header row, so the scan starts at the data
+        state = Continuation(digest, versions, 0, 0)
+    else:
+        state = Continuation.decode(token, digest, versions)
+
+    query = dict(parsed)
+    limit = parsed.get("LIMIT")
+    if state.returned:
+        query["OFFSET"] = 0
+        if limit is not None:
+            query["LIMIT"] = limit - state.returned
+
+    rows = executor.execute(query, after=state.offset)
+    try:
+        page = list(islice(rows, page_rows))
+    finally:
+        rows.close()
+
+    returned = state.returned + len(page)
+    if len(page) < page_rows or (limit is not None and returned >= limit):
+        return page, None
+    state = Continuation(digest, versions, executor.last_offset, returned)
+    return page, state.encode()
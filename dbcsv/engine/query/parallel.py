@@ -0,0 +1,184 @@
+import multiprocessing
+import threading
+from collections import deque
+from collections.abc import Generator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Tuple
+
+from dbcsv.engine.query.stats import QueryStats
+from dbcsv.engine.relational.table import Table
+from dbcsv.engine.relational.zonemap import Block
+from dbcsv.engine.setting import (
+    PARALLEL_SCAN_MAX_SPLIT_BYTES,
+    PARALLEL_SCAN_MIN_SPLIT_BYTES,
+    PARALLEL_SCAN_ORDER,
+    PARALLEL_SCAN_WORKERS,
+)
+
+# [start, stop) byte ranges of the CSV rows one worker scans
+ByteRanges = List[Tuple[int, int]]
+
+# More splits than workers, so a LIMIT or as-ready output does not wait on
+# one large range
+SPLITS_PER_WORKER = 4
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a server process that runs threads is unsafe
+            _pool = ProcessPoolExecutor(
+                PARALLEL_SCAN_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def row_ranges(table: Table, target_bytes: int) -> ByteRanges:
+    # Consecutive byte ranges of about target_bytes covering the rows of the
+    # table. They are cut at zone map block offsets, row starts found by the
+    # CSV reader, so no range begins inside a quoted field that spans lines.
+    # One range when target_bytes is 0 or the zone map is not built yet.
+    size = table.table_path.stat().st_size
+    start = table.data_start()
+    if start >= size:
+        return []
+    zone_map = table.zone_map() if target_bytes > 0 else None
+    if zone_map is None:
+        return [(start, size)]
+    ranges: ByteRanges = []
+    for block in zone_map.blocks[1:]:
+        if block.offset - start >= target_bytes:
+            ranges.append((start, block.offset))
+            start = block.offset
+    ranges.append((start, size))
+    return ranges
+
+
+def plan_splits(table: Table, blocks: List[Block] | None) -> List[ByteRanges] | None:
+    # Splits the rows to scan, all of them or the selected zone map blocks,
+    # into byte ranges cut at block boundaries: row starts found by the CSV
+    # reader, which a quoted field spanning lines cannot fool. None keeps the
+    # scan in-process, as for a table whose zone map is not built yet.
+    if PARALLEL_SCAN_WORKERS <= 1 or table.storage != "csv":
+        return None
+    size = table.table_path.stat().st_size
+    if size < 2 * PARALLEL_SCAN_MIN_SPLIT_BYTES:
+        return None
+    target = max(
+        PARALLEL_SCAN_MIN_SPLIT_BYTES,
+        min(
+            size // (PARALLEL_SCAN_WORKERS * SPLITS_PER_WORKER),
+            PARALLEL_SCAN_MAX_SPLIT_BYTES,
+        ),
+    )
+
+    zone_map = table.zone_map()
+    if zone_map is None:
+        return None
+    units = zone_map.byte_ranges(zone_map.blocks if blocks is None else blocks, size)
+
+    if sum(stop - start for start, stop in units) < 2 * PARALLEL_SCAN_MIN_SPLIT_BYTES:
+        return None
+
+    splits: List[ByteRanges] = []
+    current: ByteRanges = []
+    current_bytes = 0
+    for start, stop in units:
+        if current and current[-1][1] == start:
+            current[-1] = (current[-1][0], stop)
+        else:
+            current.append((start, stop))
+        current_bytes += stop - start
+        if current_bytes >= target:
+            splits.append(current)
+            current, current_bytes = [], 0
+    if current:
+        splits.append(current)
+    return splits if len(splits) > 1 else None
+
+
+def scan_split(
+    executor_class: type,
+    row_format: str,
+    table_spec: Tuple[str, str, List[str], List[str]],
+    columns: List[int],
+    where_clause: Dict[str, Any] | None,
+    keys: Dict[str, int],
+    projection: List[int],
+    byte_ranges: ByteRanges,
+) -> Tuple[List[Any], Dict[str, Any]]:
+    # Runs in a worker process: parse, filter and serialize one split.
+    # Returns the result rows and the split's stats.
+    table_name, table_path, column_names, column_types = table_spec
+    table = Table(table_name, column_names, column_types, table_path=Path(table_path))
+    stats = QueryStats("", table_name)
+    executor = executor_class(None, row_format, stats)
+    rows = table.load_data_gen(
+        columns, storage="csv", byte_ranges=byte_ranges, stats=stats
+    )
+    matches = executor.filter_rows(rows, executor.compile_predicate(where_clause, keys))
+    results = list(executor.format_rows(matches, projection))
+    return results, stats.as_dict()
+
+
+def scan_parallel(
+    executor: Any,
+    table: Table,
+    where_clause: Dict[str, Any] | None,
+    columns: List[int],
+    keys: Dict[str, int],
+    projection: List[int],
+    splits: List[ByteRanges],
+) -> Generator[Any, None, None]:
+    # At most two splits per worker are in flight, which with the split size
+    # bounds the results buffered while the consumer is slow or waiting on an
+    # earlier split
+    pool = get_pool()
+    table_spec = (
+        table.table_name,
+        str(table.table_path),
+        table.column_names,
+        table.column_types,
+    )
+    args = (
+        type(executor),
+        executor.row_format,
+        table_spec,
+        columns,
+        where_clause,
+        keys,
+        projection,
+    )
+    remaining = iter(splits)
+    pending: Deque[Future] = deque()
+
+    def submit() -> None:
+        window = 2 * PARALLEL_SCAN_WORKERS - len(pending)
+        for byte_ranges in islice(remaining, max(window, 0)):
+            pending.append(pool.submit(scan_split, *args, byte_ranges))
+
+    try:
+        submit()
+        while pending:
+            if PARALLEL_SCAN_ORDER == "as_ready":
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(future for future in pending if future in done)
+                pending.remove(future)
+            else:
+                future = pending.popleft()
+            results, stats = future.result()
+            submit()
+            executor.stats.merge(stats)
+            yield from results
+    finally:
+        # Stop queued splits once the client went away. Running ones cannot be
+        # interrupted; their results are dropped as they arrive.
+        for future in pending:
+            future.cancel()
+        pending.clear()
@@ -0,0 +1,162 @@
+import operator
+import re
+from collections.abc import Callable, Mapping
+from typing import Any, Dict, Hashable, Iterable, Set
+
+from dbcsv.engine.exceptions import SyntaxException
+
+Predicate = Callable[[Any], bool]
+
+RE_NUMERIC_LITERAL = re.compile(r"^-?\d+(\.\d+)?$")
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+# Marker for operands that are neither a literal nor a known column
+UNRESOLVED = object()
+
+
+class Column:
+    __slots__ = ("key",)
+
+    def __init__(self, key: Hashable) -> None:
+        self.key = key
+
+
+def _always_false(row: Any) -> bool:
+    return False
+
+
+def _always_true(row: Any) -> bool:
+    return True
+
+
+def resolve_operand(operand: str, columns: Mapping[str, Hashable]) -> Any:
+    if len(operand) > 1 and operand[0] == "'" and operand[-1] == "'":
+        return operand[1:-1]
+    if RE_NUMERIC_LITERAL.match(operand):
+        return int(operand) if "." not in operand else float(operand)
+
+    operand_uc = operand.upper()
+    if operand_uc == "TRUE":
+        return 1
+    if operand_uc == "FALSE":
+        return 0
+    if operand in columns:
+        return Column(columns[operand])
+    return UNRESOLVED
+
+
+def condition_columns(expr: Dict[str, Any], column_names: Iterable[str]) -> Set[str]:
+    # Names of the table columns a WHERE tree reads
+    if expr["op"] in ("AND", "OR"):
+        return condition_columns(expr["left"], column_names) | condition_columns(
+            expr["right"], column_names
+        )
+    columns = {name: name for name in column_names}
+    return {
+        operand.key
+        for operand in (
+            resolve_operand(expr["left"], columns),
+            resolve_operand(expr["right"], columns),
+        )
+        if isinstance(operand, Column)
+    }
+
+
+def _ignore_error() -> None:
+    pass
+
+
+def compile_condition(
+    expr: Dict[str, Any],
+    columns: Mapping[str, Hashable],
+    on_error: Callable[[], None] | None = None,
+) -> Predicate:
+    # `columns` maps a column name to the key used to read it from a row.
+    # A leaf is False when an operand is NULL or the values cannot be
+    # compared, keeping the skip-on-error rule of the old row interpreter; on_error
+    # is called for each comparison that raised.
+    if on_error is None:
+        on_error = _ignore_error
+    op = expr["op"]
+    if op == "AND":
+        left = compile_condition(expr["left"], columns, on_error)
+        right = compile_condition(expr["right"], columns, on_error)
+        return lambda row: left(row) and right(row)
+    if op == "OR":
+        left = compile_condition(expr["left"], columns, on_error)
+        right = compile_condition(expr["right"], columns, on_error)
+        return lambda row: left(row) or right(row)
+
+    compare = OPERATORS.get(op)
+    if compare is None:
+        raise SyntaxException(f"Unknown operator: {op}")
+
+    left = resolve_operand(expr["left"], columns)
+    right = resolve_operand(expr["right"], columns)
+    if left is UNRESOLVED or right is UNRESOLVED:
+        return _always_false
+
+    left_is_column = isinstance(left, Column)
+    right_is_column = isinstance(right, Column)
+
+    if left_is_column and right_is_column:
+        left_key, right_key = left.key, right.key
+
+        def column_column(row: Any) -> bool:
+            left_val = row[left_key]
+            right_val = row[right_key]
+            if left_val is None or right_val is None:
+                return False
+            try:
+                return compare(left_val, right_val)
+            except Exception:
+                on_error()
+                return False
+
+        return column_column
+
+    if left_is_column:
+        key, literal = left.key, right
+
+        def column_literal(row: Any) -> bool:
+            value = row[key]
+            if value is None:
+                return False
+            try:
+                return compare(value, literal)
+            except Exception:
+                on_error()
+                return False
+
+        return column_literal
+
+    if right_is_column:
+        key, literal = right.key, left
+
+        def literal_column(row: Any) -> bool:
+            value = row[key]
+            if value is None:
+                return False
+            try:
+                return compare(literal, value)
+            except Exception:
+                on_error()
+                return False
+
+        return literal_column
+
+    # Both sides are literals: fold the comparison at plan time
+    try:
+        constant = bool(compare(left, right))
+    except Exception:
+        constant = False
+    return _always_true if constant else _always_false
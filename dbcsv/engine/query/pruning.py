@@ -0,0 +1,60 @@
+from typing import Any, Dict, List
+
+from dbcsv.engine.query.predicate import OPERATORS, UNRESOLVED, Column, resolve_operand
+from dbcsv.engine.relational.zonemap import Block, ZoneMap
+
+# Mirror of an operator when the literal is on the left: 5 < col -> col > 5
+FLIPPED = {"=": "=", "!=": "!=", "<>": "<>", "<": ">", ">": "<", "<=": ">=", ">=": "<="}
+
+
+def select_blocks(
+    zone_map: ZoneMap, where: Dict[str, Any], column_names: List[str]
+) -> List[Block]:
+    columns = {name: i for i, name in enumerate(column_names)}
+    return [block for block in zone_map.blocks if may_match(where, block, columns)]
+
+
+def may_match(expr: Dict[str, Any], block: Block, columns: Dict[str, int]) -> bool:
+    # Conservative: False only when no row of the block can satisfy expr
+    op = expr["op"]
+    if op == "AND":
+        return may_match(expr["left"], block, columns) and may_match(
+            expr["right"], block, columns
+        )
+    if op == "OR":
+        return may_match(expr["left"], block, columns) or may_match(
+            expr["right"], block, columns
+        )
+
+    left = resolve_operand(expr["left"], columns)
+    right = resolve_operand(expr["right"], columns)
+    if left is UNRESOLVED or right is UNRESOLVED:
+        return False  # the leaf is always False
+    if isinstance(left, Column) == isinstance(right, Column):
+        return True  # column vs column or constant: no bound to check
+    if isinstance(right, Column):
+        left, right, op = right, left, FLIPPED[op]
+
+    stats = block.columns[left.key]
+    if stats is None:
+        return True
+    low, high, null_count = stats
+    if null_count == block.row_count:
+        return False  # NULL never satisfies a comparison
+    if low is None or high is None:
+        return True
+
+    # A comparison the rows could not evaluate makes the leaf False,
+    # so a TypeError here means the block cannot match either.
+    try:
+        if op == "=":
+            return low <= right <= high
+        if op in ("!=", "<>"):
+            return not (low == high == right)
+        if op in ("<", "<="):
+            return OPERATORS[op](low, right)
+        if op in (">", ">="):
+            return OPERATORS[op](high, right)
+    except TypeError:
+        return False
+    return True
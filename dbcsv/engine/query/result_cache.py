@@ -0,0 +1,146 @@
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Generator
+from typing import Any, Dict, List, Tuple
+
+from dbcsv.engine.relational.schema import Schema
+from dbcsv.engine.setting import RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_ENTRY_BYTES
+
+# (schema, result format, normalized query, file versions)
+CacheKey = Tuple[str, str, str, Tuple[Tuple[str, int, int], ...]]
+
+
+class ResultCache:
+    # Encoded result frames of recent queries, least recently used first.
+    # Keys include the size and mtime of metadata.yaml and of the tables a
+    # query reads, so a changed file makes its old entries unreachable;
+    # they age out through LRU eviction.
+    _entries: "OrderedDict[CacheKey, List[bytes]]"
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int) -> None:
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_bytes = max_bytes
+        self._max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._bypasses = 0
+        self._stores = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self._max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "bypasses": self._bypasses,
+            "stores": self._stores,
+            "evictions": self._evictions,
+        }
+
+    @staticmethod
+    def key(
+        schema: Schema,
+        query: Dict[str, Any],
+        table_names: List[str],
+        result_format: str,
+    ) -> CacheKey:
+        # The parsed query is the normalized SQL: whitespace and keyword
+        # case do not change it
+        paths = [schema.metadata_path]
+        paths.extend(schema.tables[name].table_path for name in table_names)
+        versions = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                versions.append((str(path), -1, -1))
+            else:
+                versions.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return (
+            schema.schema_name,
+            result_format,
+            json.dumps(query, sort_keys=True),
+            tuple(versions),
+        )
+
+    def get(self, key: CacheKey) -> List[bytes] | None:
+        with self._lock:
+            frames = self._entries.get(key)
+            if frames is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return frames
+
+    def bypass(self) -> None:
+        with self._lock:
+            self._bypasses += 1
+
+    def put(self, key: CacheKey, frames: List[bytes]) -> None:
+        size = sum(map(len, frames))
+        if size > self._max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= sum(map(len, previous))
+            self._entries[key] = frames
+            self._bytes += size
+            self._stores += 1
+            while self._bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= sum(map(len, evicted))
+                self._evictions += 1
+
+    def record(
+        self,
+        key: CacheKey,
+        chunks: Generator[bytes, None, None],
+        schema: Schema,
+        query: Dict[str, Any],
+        table_names: List[str],
+    ) -> Generator[bytes, None, None]:
+        # Passes the frames through and stores them once the stream has
+        # completed, unless it grew too large or a file changed meanwhile
+        frames: List[bytes] | None = []
+        size = 0
+        try:
+            for chunk in chunks:
+                if frames is not None:
+                    size += len(chunk)
+                    if size > self._max_entry_bytes:
+                        frames = None  # too large to cache
+                    else:
+                        frames.append(chunk)
+                yield chunk
+            if frames is not None and key == self.key(
+                schema, query, table_names, key[1]
+            ):
+                self.put(key, frames)
+        finally:
+            chunks.close()
+
+    @staticmethod
+    def replay(frames: List[bytes]) -> Generator[bytes, None, None]:
+        yield from frames
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_ENTRY_BYTES)
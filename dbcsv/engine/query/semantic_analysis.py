@@ -1,6 +1,10 @@
 import re
+from typing import Dict, Tuple
 
 from dbcsv.engine.exceptions import SyntaxException
+from dbcsv.engine.query.aggregate import has_aggregates, is_aggregate
+from dbcsv.engine.query.join import join_columns, qualified_names, qualify_query
+from dbcsv.engine.relational.datatype import FLOAT, INTEGER
 from dbcsv.engine.relational.schema import Schema
 
 
@@ -20,14 +24,88 @@ class SemanticAnalyzer:
         if not self.schema.has_table(table):
             raise SyntaxException(f"Unknown table: {table}")
 
+        # Column name -> type; a join names its columns table.column
+        if "JOIN" in query:
+            query, columns = self._check_join(query)
+        else:
+            tbl = self.schema.tables[table]
+            columns = dict(zip(tbl.column_names, tbl.column_types))
+
         # Check SELECT columns
         for col in query["SELECT"]:
-            if col != "*" and not self.schema.has_column(table, col):
+            if is_aggregate(col):
+                self._check_aggregate(col, columns)
+            elif col != "*" and col not in columns:
                 raise SyntaxException(f"Unknown column in SELECT: {col}")
 
+        # Check GROUP BY: every plain SELECT column must be grouped on
+        aggregated = has_aggregates(query)
+        if aggregated:
+            group_by = query.get("GROUP BY", [])
+            for col in group_by:
+                if col not in columns:
+                    raise SyntaxException(f"Unknown column in GROUP BY: {col}")
+            for col in query["SELECT"]:
+                if not is_aggregate(col) and col not in group_by:
+                    raise SyntaxException(
+                        f"Column {col} must appear in GROUP BY or in an aggregate"
+                    )
+
+        # Check ORDER BY: aggregated rows sort on groups and aggregates only
+        for item in query.get("ORDER BY", []):
+            col = item["column"]
+            if is_aggregate(col):
+                if not aggregated:
+                    raise SyntaxException(
+                        "Aggregates in ORDER BY need an aggregate SELECT or GROUP BY"
+                    )
+                self._check_aggregate(col, columns)
+            elif col not in columns:
+                raise SyntaxException(f"Unknown column in ORDER BY: {col}")
+            elif aggregated and col not in query.get("GROUP BY", []):
+                raise SyntaxException(
+                    f"Column {col} in ORDER BY must appear in GROUP BY"
+                )
+
         # Check WHERE clause
         if "WHERE" in query:
-            self._check_expression(query["WHERE"], table)
+            self._check_expression(query["WHERE"], columns)
+
+        # Check LIMIT / OFFSET
+        for clause in ("LIMIT", "OFFSET"):
+            value = query.get(clause)
+            if value is not None and (not isinstance(value, int) or value < 0):
+                raise SyntaxException(f"{clause} must be a non-negative integer")
+
+    def _check_join(self, query: dict) -> Tuple[dict, Dict[str, str]]:
+        # The join query with qualified column names, and its columns
+        left, right = query["FROM"], query["JOIN"]["table"]
+        if not self.schema.has_table(right):
+            raise SyntaxException(f"Unknown table: {right}")
+        if right == left:
+            raise SyntaxException(f"Cannot join table {left} with itself")
+
+        tables = [self.schema.tables[left], self.schema.tables[right]]
+        query = qualify_query(query, tables)
+        join_columns(query["JOIN"]["ON"], *tables)
+        column_types = [dtype for tbl in tables for dtype in tbl.column_types]
+        return query, dict(zip(qualified_names(tables), column_types))
+
+    def _check_aggregate(self, item: dict, columns: Dict[str, str]) -> None:
+        func, arg = item["func"], item["arg"]
+        if arg == "*":
+            if func != "COUNT":
+                raise SyntaxException(f"{func}(*) is not supported")
+            return
+        if arg not in columns:
+            raise SyntaxException(f"Unknown column in {func}: {arg}")
+
+        if func in ("SUM", "AVG"):
+            dtype = columns[arg]
+            if dtype not in INTEGER and dtype not in FLOAT:
+                raise SyntaxException(
+                    f"{func} requires a numeric column, {arg} is {dtype}"
+                )
 
     def _is_literal(self, operand: str) -> bool:
         return bool(
@@ -36,13 +114,13 @@ class SemanticAnalyzer:
             or operand.upper() in ("TRUE", "FALSE")  # Boolean literals
         )
 
-    def _check_expression(self, expr, table):
+    def _check_expression(self, expr, columns):
         if "op" in expr and expr["op"] in ("AND", "OR"):
-            self._check_expression(expr["left"], table)
-            self._check_expression(expr["right"], table)
+            self._check_expression(expr["left"], columns)
+            self._check_expression(expr["right"], columns)
         else:
             left = expr["left"]
-            if not self._is_literal(left) and not self.schema.has_column(table, left):
+            if not self._is_literal(left) and left not in columns:
                 raise SyntaxException(f"Unknown column in WHERE clause: {left}")
 
 
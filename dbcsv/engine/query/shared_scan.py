@@ -0,0 +1,272 @@
+import threading
+from collections.abc import Generator
+from itertools import islice
+from typing import Any, Callable, Dict, List, Tuple
+
+from dbcsv.engine.query.parallel import ByteRanges, row_ranges
+from dbcsv.engine.query.predicate import Predicate
+from dbcsv.engine.query.spill import SpillQueue
+from dbcsv.engine.query.stats import QueryStats
+from dbcsv.engine.relational.csvio import source_fingerprint
+from dbcsv.engine.relational.table import Table
+from dbcsv.engine.setting import (
+    SHARED_SCAN_QUEUE_BYTES,
+    SHARED_SCAN_SEGMENT_BYTES,
+    SPILL_TEMP_DIR,
+)
+
+# Rows read from a segment, and filtered for every consumer, at a time
+CHUNK_ROWS = 1024
+
+
+def merge_ranges(ranges: ByteRanges) -> ByteRanges:
+    merged: ByteRanges = []
+    for start, stop in ranges:
+        if merged and merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], stop)
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+class ScanConsumer:
+    # One query's view of a shared scan: the rows of the segments read
+    # before it attached, scanned by itself, then the rows the shared pass
+    # queued for it. Rows come out in file order, as tuples of `columns`.
+    def __init__(
+        self,
+        scan: "SharedScan",
+        predicate: Predicate | None,
+        columns: List[int],
+        start_segment: int,
+        head: ByteRanges,
+        stats: QueryStats,
+    ) -> None:
+        self.predicate = predicate
+        self.start_segment = start_segment
+        self.stats = stats
+        self.queue = SpillQueue(SHARED_SCAN_QUEUE_BYTES, SPILL_TEMP_DIR)
+        self.closed = False
+        self._scan = scan
+        self._head = head
+        self._project = None
+        if columns != scan.columns:
+            index = [scan.columns.index(i) for i in columns]
+            self._project = lambda row: tuple([row[i] for i in index])
+
+    def rows(self) -> Generator[Tuple[Any, ...], None, None]:
+        predicate = self.predicate
+        project = self._project
+        try:
+            if self._head:
+                rows = self._scan.table.load_data_gen(
+                    self._scan.columns,
+                    storage="csv",
+                    byte_ranges=self._head,
+                    stats=self.stats,
+                )
+                try:
+                    for row in rows:
+                        if predicate is None or predicate(row):
+                            yield row if project is None else project(row)
+                finally:
+                    rows.close()
+
+            while True:
+                chunk = self._scan.next_chunk(self)
+                if chunk is None:
+                    return
+                yield from chunk if project is None else map(project, chunk)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._scan.detach(self)
+
+
+class SharedScan:
+    # One sequential pass over a CSV table, reading `columns`, that feeds
+    # every attached consumer. Whichever consumer runs out of queued rows
+    # reads the next chunk, evaluates each consumer's predicate on it and
+    # queues the matches, so a query that stops early or reads slowly does
+    # not hold back the others.
+    def __init__(
+        self,
+        table: Table,
+        columns: List[int],
+        segments: ByteRanges,
+        on_finish: Callable[["SharedScan"], None] | None = None,
+    ) -> None:
+        self.table = table
+        self.columns = columns
+        self.keys = {table.column_names[i]: key for key, i in enumerate(columns)}
+        self._segments = segments
+        self._next_segment = 0
+        self._current: Generator[Tuple[Any, ...], None, None] | None = None
+        self._consumers: List[ScanConsumer] = []
+        self._finished = False
+        self._on_finish = on_finish
+        # _lock guards the consumers, their queues and the scan position;
+        # _read_lock lets one consumer at a time read the file
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+    def covers(self, columns: List[int]) -> bool:
+        return set(columns) <= set(self.columns)
+
+    def attach(
+        self,
+        compile_predicate: Callable[[Dict[str, int]], Predicate | None],
+        columns: List[int],
+        stats: QueryStats,
+    ) -> ScanConsumer | None:
+        # compile_predicate gets the row keys of the scan's columns. None
+        # once the scan has read its last segment.
+        with self._lock:
+            if self._finished:
+                return None
+            # Segments already started are read by the consumer itself
+            head = merge_ranges(self._segments[: self._next_segment])
+            consumer = ScanConsumer(
+                self,
+                compile_predicate(self.keys),
+                columns,
+                self._next_segment,
+                head,
+                stats,
+            )
+            self._consumers.append(consumer)
+            return consumer
+
+    def next_chunk(self, consumer: ScanConsumer) -> List[Tuple[Any, ...]] | None:
+        # The consumer's next queued chunk, reading more of the table while
+        # its queue is empty; None at the end of the scan
+        while True:
+            with self._lock:
+                chunk = consumer.queue.get()
+                if chunk is not None:
+                    return chunk
+                if self._finished or consumer.stats.cancelled:
+                    return None
+            with self._read_lock:
+                with self._lock:
+                    # Another consumer may have read while this one waited
+                    if not consumer.queue.empty or self._finished:
+                        continue
+                self._read_chunk(consumer.stats)
+
+    def _read_chunk(self, stats: QueryStats) -> None:
+        # Called with _read_lock held
+        if self._current is None:
+            with self._lock:
+                if self._next_segment == len(self._segments):
+                    self._finish()
+                    return
+                segment = self._segments[self._next_segment]
+                self._next_segment += 1
+            self._current = self.table.load_data_gen(
+                self.columns, storage="csv", byte_ranges=[segment], stats=stats
+            )
+        index = self._next_segment - 1
+
+        rows = list(islice(self._current, CHUNK_ROWS))
+        exhausted = len(rows) < CHUNK_ROWS
+        if exhausted:
+            self._current.close()
+            self._current = None
+
+        if rows:
+            with self._lock:
+                consumers = [c for c in self._consumers if c.start_segment <= index]
+            for consumer in consumers:
+                predicate = consumer.predicate
+                matches = rows if predicate is None else list(filter(predicate, rows))
+                if matches:
+                    with self._lock:
+                        if not consumer.closed:
+                            consumer.queue.put(matches)
+
+        # Finished only once the last rows are queued
+        if exhausted and self._next_segment == len(self._segments):
+            with self._lock:
+                self._finish()
+
+    def _finish(self) -> None:
+        # Called with _lock held
+        if not self._finished:
+            self._finished = True
+            if self._on_finish is not None:
+                self._on_finish(self)
+
+    def detach(self, consumer: ScanConsumer) -> None:
+        with self._lock:
+            if consumer.closed:
+                return
+            consumer.closed = True
+            consumer.queue.close()
+            self._consumers.remove(consumer)
+            abandoned = not self._consumers and not self._finished
+            if abandoned:
+                self._finish()
+        if abandoned:
+            with self._read_lock:
+                if self._current is not None:
+                    self._current.close()
+                    self._current = None
+
+
+class SharedScans:
+    # The shared scans in progress, by table file and version
+    def __init__(self, segment_bytes: int) -> None:
+        self._segment_bytes = segment_bytes
+        self._scans: Dict[Tuple[Any, ...], List[SharedScan]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(table: Table) -> Tuple[Any, ...]:
+        fingerprint = source_fingerprint(table.table_path)
+        return str(table.table_path), fingerprint["size"], fingerprint["mtime_ns"]
+
+    def start(self, table: Table, columns: List[int]) -> SharedScan:
+        key = self._key(table)
+
+        def unregister(scan: SharedScan) -> None:
+            with self._lock:
+                scans = self._scans.get(key, [])
+                if scan in scans:
+                    scans.remove(scan)
+                if not scans:
+                    self._scans.pop(key, None)
+
+        scan = SharedScan(
+            table, columns, row_ranges(table, self._segment_bytes), unregister
+        )
+        with self._lock:
+            self._scans.setdefault(key, []).append(scan)
+        return scan
+
+    def attach(
+        self,
+        table: Table,
+        columns: List[int],
+        compile_predicate: Callable[[Dict[str, int]], Predicate | None],
+        stats: QueryStats,
+    ) -> ScanConsumer:
+        # Joins a scan in progress that reads the needed columns, or starts one
+        with self._lock:
+            scans = list(self._scans.get(self._key(table), []))
+        for scan in scans:
+            if scan.covers(columns):
+                consumer = scan.attach(compile_predicate, columns, stats)
+                if consumer is not None:
+                    stats.scan_attached = True
+                    return consumer
+        scan = self.start(table, columns)
+        return scan.attach(compile_predicate, columns, stats)
+
+    def active(self) -> int:
+        with self._lock:
+            return sum(map(len, self._scans.values()))
+
+
+shared_scans = SharedScans(SHARED_SCAN_SEGMENT_BYTES)
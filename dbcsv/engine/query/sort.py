@@ -0,0 +1,113 @@
+import heapq
+from collections.abc import Generator, Iterable
+from typing import Any, Callable, List, Tuple
+
+from dbcsv.engine.query.spill import SAMPLE_ROWS, SpillFile, estimate_row_size
+
+SortKey = Callable[[Tuple[Any, ...]], Any]
+
+
+class _Descending:
+    # Inverts the comparison of one sort key element
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __eq__(self, other: Any) -> bool:
+        return self.value == other.value
+
+    def __lt__(self, other: Any) -> bool:
+        return other.value < self.value
+
+
+def sort_key(order: List[Tuple[int, bool]]) -> Tuple[SortKey, bool]:
+    # (key, reverse) for rows sorted on the (row key, descending) pairs.
+    # NULLs sort first ascending and last descending.
+    row_keys = [key for key, _ in order]
+    directions = {descending for _, descending in order}
+
+    if len(directions) == 1:
+
+        def key(row: Tuple[Any, ...]) -> Any:
+            return tuple([(row[k] is not None, row[k]) for k in row_keys])
+
+        return key, directions.pop()
+
+    def mixed_key(row: Tuple[Any, ...]) -> Any:
+        return tuple(
+            [
+                _Descending((row[k] is not None, row[k]))
+                if descending
+                else (row[k] is not None, row[k])
+                for k, descending in order
+            ]
+        )
+
+    return mixed_key, False
+
+
+def top_k(
+    rows: Iterable[Tuple[Any, ...]], k: int, key: SortKey, reverse: bool
+) -> List[Tuple[Any, ...]]:
+    # The first k rows in sort order, keeping a heap of k rows at most
+    if reverse:
+        return heapq.nlargest(k, rows, key=key)
+    return heapq.nsmallest(k, rows, key=key)
+
+
+class ExternalSorter:
+    # Sorts in memory until the buffered rows exceed memory_bytes, then
+    # writes each sorted buffer to a temporary file as a run and merges the
+    # runs with the last buffer. Equal rows keep their input order.
+    def __init__(
+        self,
+        key: SortKey,
+        reverse: bool,
+        memory_bytes: int,
+        temp_dir: str | None = None,
+    ) -> None:
+        self._key = key
+        self._reverse = reverse
+        self._memory_bytes = memory_bytes
+        self._temp_dir = temp_dir
+        self._runs: List[SpillFile] = []
+
+    @property
+    def run_count(self) -> int:
+        return len(self._runs)
+
+    def sort(
+        self, rows: Iterable[Tuple[Any, ...]]
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        buffer: List[Tuple[Any, ...]] = []
+        max_rows = None
+        try:
+            for row in rows:
+                buffer.append(row)
+                if max_rows is None:
+                    if len(buffer) == SAMPLE_ROWS:
+                        max_rows = max(
+                            SAMPLE_ROWS, self._memory_bytes // estimate_row_size(buffer)
+                        )
+                elif len(buffer) >= max_rows:
+                    self._spill(buffer)
+                    buffer = []
+
+            buffer.sort(key=self._key, reverse=self._reverse)
+            if not self._runs:
+                yield from buffer
+                return
+
+            runs = [run.rows() for run in self._runs]
+            runs.append(iter(buffer))
+            yield from heapq.merge(*runs, key=self._key, reverse=self._reverse)
+        finally:
+            for run in self._runs:
+                run.close()
+
+    def _spill(self, buffer: List[Tuple[Any, ...]]) -> None:
+        buffer.sort(key=self._key, reverse=self._reverse)
+        run = SpillFile(self._temp_dir)
+        self._runs.append(run)
+        run.extend(buffer)
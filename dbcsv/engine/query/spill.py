@@ -0,0 +1,120 @@
+import pickle
+import sys
+import tempfile
+from collections import deque
+from collections.abc import Generator, Iterable
+from typing import IO, Any, Deque, List, Tuple
+
+# Rows sampled to estimate the in-memory size of a row
+SAMPLE_ROWS = 256
+# Rows per pickled chunk in a spill file
+CHUNK_ROWS = 4096
+
+
+def estimate_row_size(rows: List[Tuple[Any, ...]]) -> int:
+    total = sum(sys.getsizeof(row) + sum(map(sys.getsizeof, row)) for row in rows)
+    return max(1, total // len(rows))
+
+
+class SpillFile:
+    # Rows written in pickled chunks to an anonymous temporary file, which
+    # the OS removes on close
+    def __init__(self, temp_dir: str | None = None) -> None:
+        self._file = tempfile.TemporaryFile(prefix="dbcsv-spill-", dir=temp_dir)
+        self._chunk: List[Tuple[Any, ...]] = []
+        self._row_count = 0
+
+    @property
+    def row_count(self) -> int:
+        return self._row_count
+
+    def append(self, row: Tuple[Any, ...]) -> None:
+        self._chunk.append(row)
+        self._row_count += 1
+        if len(self._chunk) == CHUNK_ROWS:
+            self._flush()
+
+    def extend(self, rows: Iterable[Tuple[Any, ...]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def _flush(self) -> None:
+        if self._chunk:
+            pickle.dump(self._chunk, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._chunk = []
+
+    def rows(self) -> Generator[Tuple[Any, ...], None, None]:
+        self._flush()
+        self._file.seek(0)
+        while True:
+            try:
+                chunk = pickle.load(self._file)
+            except EOFError:
+                return
+            yield from chunk
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SpillQueue:
+    # FIFO of row chunks kept in memory up to about memory_bytes. Chunks
+    # put while it is full, or while spilled chunks are still waiting, go
+    # to a temporary file, so they come out in the order they were put.
+    def __init__(self, memory_bytes: int, temp_dir: str | None = None) -> None:
+        self._memory_bytes = memory_bytes
+        self._temp_dir = temp_dir
+        self._chunks: Deque[List[Tuple[Any, ...]]] = deque()
+        self._rows = 0
+        self._max_rows: int | None = None
+        self._file: IO[bytes] | None = None
+        self._read_position = 0
+        self._spilled = 0
+
+    @property
+    def empty(self) -> bool:
+        return not self._chunks and not self._spilled
+
+    def put(self, chunk: List[Tuple[Any, ...]]) -> None:
+        if self._max_rows is None:
+            row_size = estimate_row_size(chunk[:SAMPLE_ROWS])
+            self._max_rows = max(CHUNK_ROWS, self._memory_bytes // row_size)
+        if not self._spilled and self._rows + len(chunk) <= self._max_rows:
+            self._chunks.append(chunk)
+            self._rows += len(chunk)
+            return
+
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(
+                prefix="dbcsv-spill-", dir=self._temp_dir
+            )
+        self._file.seek(0, 2)
+        pickle.dump(chunk, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled += 1
+
+    def get(self) -> List[Tuple[Any, ...]] | None:
+        # The oldest chunk, or None when the queue is empty
+        if self._chunks:
+            chunk = self._chunks.popleft()
+            self._rows -= len(chunk)
+            return chunk
+        if not self._spilled:
+            return None
+
+        self._file.seek(self._read_position)
+        chunk = pickle.load(self._file)
+        self._read_position = self._file.tell()
+        self._spilled -= 1
+        if not self._spilled:
+            # Drained: reuse the file from the start
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_position = 0
+        return chunk
+
+    def close(self) -> None:
+        self._chunks.clear()
+        self._rows = 0
+        self._spilled = 0
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,109 @@
+import json
+import logging
+import time
+from collections.abc import Generator, Iterable
+from contextlib import contextmanager
+from typing import Any, Dict
+
+from dbcsv.engine.query.metrics import query_metrics
+
+logger = logging.getLogger(__name__)
+
+# Counters summed when the stats of a parallel scan worker are merged
+MERGED_COUNTERS = (
+    "rows_read",
+    "rows_invalid",
+    "rows_matched",
+    "rows_skipped",
+    "evaluation_errors",
+)
+
+
+class QueryStats:
+    def __init__(self, schema_name: str, table_name: str | None = None) -> None:
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.sql = None
+        self.access_path = "scan"
+        self.index_candidates = 0
+        self.blocks_total = 0
+        self.blocks_read = 0
+        self.blocks_skipped = 0
+        self.parallel_splits = 0
+        # Joined a shared scan that another query had started
+        self.scan_attached = False
+        # Data rows read from the table; rows_invalid of them had the wrong
+        # number of fields or a cell that did not convert to its type
+        self.rows_read = 0
+        self.rows_invalid = 0
+        self.rows_matched = 0
+        # Rows dropped because evaluating WHERE raised, and the errors raised
+        self.rows_skipped = 0
+        self.evaluation_errors = 0
+        self.join_build = None
+        self.join_partitions = 0
+        self.rows_joined = 0
+        self.groups = 0
+        self.sort_method = None
+        self.sort_runs = 0
+        self.rows_returned = 0
+        self.bytes_sent = 0
+        self.result_cache = None
+        # Set when the client went away: scans stop at the next row
+        self.cancelled = False
+        # Seconds per stage; the scan stages of parallel workers are summed
+        self.stages: Dict[str, float] = {}
+        self.duration = 0.0
+        self._started = time.perf_counter()
+        self._finished = False
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+    def evaluation_error(self) -> None:
+        self.evaluation_errors += 1
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        for name in MERGED_COUNTERS:
+            setattr(self, name, getattr(self, name) + other[name])
+        for stage, seconds in other["stages"].items():
+            self.add_time(stage, seconds)
+
+    def track(
+        self, chunks: Iterable[Any], count_bytes: bool = False
+    ) -> Generator[Any, None, None]:
+        # Passes the result through, then finishes the stats once it has
+        # been consumed or closed
+        try:
+            for chunk in chunks:
+                if count_bytes:
+                    self.bytes_sent += len(chunk)
+                yield chunk
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            self.finish()
+
+    def finish(self) -> None:
+        # One structured log line and the /metrics histograms per query
+        if self._finished:
+            return
+        self._finished = True
+        self.duration = time.perf_counter() - self._started
+        logger.info("query stats %s", json.dumps(self.as_dict()))
+        query_metrics.observe(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: value for name, value in vars(self).items() if name[0] != "_"}
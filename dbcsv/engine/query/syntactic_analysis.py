@@ -3,6 +3,7 @@ import sys
 from typing import Any, Dict, List
 
 from dbcsv.engine.exceptions import SyntaxException
+from dbcsv.engine.query.aggregate import AGGREGATE_FUNCTIONS
 
 # Precompiled regex patterns for performance
 RE_NUMBER = re.compile(r"^\d+(\.\d+)?$")
@@ -22,12 +23,17 @@ class SQLParser:
             return self.tokens[self.pos]
         return None
 
+    def at_keyword(self, *keywords: str) -> bool:
+        # Whether the current token is one of the keywords, in any case
+        token = self.current_token()
+        return token is not None and token.upper() in keywords
+
     def consume(self, expected: str | None = None) -> str:
         token = self.current_token()
         if token is None:
             raise SyntaxException("Unexpected end of input")
 
-        if expected and token != expected:
+        if expected and token.upper() != expected:
             raise SyntaxException(f"Expected '{expected}', got '{token}'")
 
         self.pos += 1
@@ -36,17 +42,38 @@ class SQLParser:
     def parse(self) -> Dict[str, Any]:
         query = {"SELECT": self.parse_select(), "FROM": self.parse_from()}
 
+        if self.at_keyword("JOIN", "INNER", "LEFT"):
+            query["JOIN"] = self.parse_join()
+
         token = self.current_token()
         if token == "WHERE":
             self.consume("WHERE")
             query["WHERE"] = self.parse_expression()
 
+        if self.at_keyword("GROUP"):
+            self.consume("GROUP")
+            self.consume("BY")
+            query["GROUP BY"] = self.parse_identifiers()
+
+        if self.at_keyword("ORDER"):
+            self.consume("ORDER")
+            self.consume("BY")
+            query["ORDER BY"] = self.parse_order_items()
+
+        if self.at_keyword("LIMIT"):
+            self.consume("LIMIT")
+            query["LIMIT"] = self.parse_integer()
+
+            if self.at_keyword("OFFSET"):
+                self.consume("OFFSET")
+                query["OFFSET"] = self.parse_integer()
+
         if self.current_token() == ";":
             self.consume(";")
 
         return query
 
-    def parse_select(self) -> List[str]:
+    def parse_select(self) -> List[Any]:
         self.consume("SELECT")
         token = self.current_token()
 
@@ -54,16 +81,69 @@ class SQLParser:
             self.consume("*")
             return ["*"]
 
-        columns = [self.parse_identifier()]
+        items = [self.parse_select_item()]
         while self.current_token() == ",":
             self.consume(",")
-            columns.append(self.parse_identifier())
+            items.append(self.parse_select_item())
+
+        return items
+
+    def parse_select_item(self) -> str | Dict[str, str]:
+        # An aggregate name is a function only when called; otherwise it is
+        # a column name
+        call = self.tokens[self.pos + 1 : self.pos + 2] == ["("]
+        if not (call and self.at_keyword(*AGGREGATE_FUNCTIONS)):
+            return self.parse_identifier()
+
+        func = self.consume().upper()
+        self.consume("(")
+        if func == "COUNT" and self.current_token() == "*":
+            arg = self.consume("*")
+        else:
+            arg = self.parse_identifier()
+        self.consume(")")
+        return {"func": func, "arg": arg}
+
+    def parse_order_items(self) -> List[Dict[str, Any]]:
+        items = []
+        while True:
+            item = {"column": self.parse_select_item(), "direction": "ASC"}
+            if self.at_keyword("ASC", "DESC"):
+                item["direction"] = self.consume().upper()
+            items.append(item)
+            if self.current_token() != ",":
+                return items
+            self.consume(",")
 
-        return columns
+    def parse_identifiers(self) -> List[str]:
+        identifiers = [self.parse_identifier()]
+        while self.current_token() == ",":
+            self.consume(",")
+            identifiers.append(self.parse_identifier())
+        return identifiers
 
     def parse_from(self) -> str:
         self.consume("FROM")
-        return self.parse_identifier()
+        return self.parse_table_name()
+
+    def parse_join(self) -> Dict[str, Any]:
+        join_type = "INNER"
+        if self.at_keyword("INNER"):
+            self.consume("INNER")
+        elif self.at_keyword("LEFT"):
+            join_type = self.consume("LEFT").upper()
+            if self.at_keyword("OUTER"):
+                self.consume("OUTER")
+        self.consume("JOIN")
+        table = self.parse_table_name()
+        self.consume("ON")
+        return {"type": join_type, "table": table, "ON": self.parse_expression()}
+
+    def parse_table_name(self) -> str:
+        token = self.current_token()
+        if token and RE_IDENTIFIER.match(token):
+            return self.consume()
+        raise SyntaxException(f"Expected table name, got '{token}'")
 
     def parse_expression(self) -> Dict[str, Any]:
         expr = self.parse_condition()
@@ -98,7 +178,9 @@ class SQLParser:
         is_str = RE_STRING.match(token)
         is_id = RE_IDENTIFIER.match(token)
 
-        if is_num or is_str or is_id:
+        if is_id:
+            return self.parse_identifier()
+        if is_num or is_str:
             return self.consume()
 
         raise SyntaxException(f"Expected identifier or value, got '{token}'")
@@ -110,7 +192,21 @@ class SQLParser:
         return self.consume()
 
     def parse_identifier(self) -> str:
+        # A column name, optionally qualified by its table: table.column
         token = self.current_token()
-        if token and RE_IDENTIFIER.match(token):
-            return self.consume()
-        raise SyntaxException(f"Expected identifier, got '{token}'")
+        if not (token and RE_IDENTIFIER.match(token)):
+            raise SyntaxException(f"Expected identifier, got '{token}'")
+        name = self.consume()
+        if self.current_token() == ".":
+            self.consume(".")
+            token = self.current_token()
+            if not (token and RE_IDENTIFIER.match(token)):
+                raise SyntaxException(f"Expected column name, got '{token}'")
+            name = sys.intern(f"{name}.{self.consume()}")
+        return name
+
+    def parse_integer(self) -> int:
+        token = self.current_token()
+        if token and token.isdigit():
+            return int(self.consume())
+        raise SyntaxException(f"Expected integer, got '{token}'")
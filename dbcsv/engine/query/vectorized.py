@@ -0,0 +1,260 @@
+from collections.abc import Generator
+from itertools import repeat
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from dbcsv.engine.exceptions import SyntaxException
+from dbcsv.engine.query.executor import SelectExecutor
+from dbcsv.engine.query.predicate import (
+    OPERATORS,
+    UNRESOLVED,
+    Column,
+    condition_columns,
+    resolve_operand,
+)
+from dbcsv.engine.relational.datatype import BOOLEAN, FLOAT, INTEGER, converter
+from dbcsv.engine.relational.table import Table
+from dbcsv.engine.relational.zonemap import Block
+from dbcsv.engine.setting import VECTOR_BATCH_ROWS
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, see the "vectorized" extra
+    np = None
+
+# float64 holds every integer up to 2**53 exactly; beyond that, mixing ints
+# and floats in NumPy would round where Python compares exactly
+EXACT_INT_LIMIT = 2**53
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+
+class Vector:
+    # One converted column of a batch. `array` is a NumPy copy of numeric
+    # columns (NULLs stored as 0) used for vectorized comparisons, or None.
+    __slots__ = ("values", "array", "nulls", "valid")
+
+    def __init__(self, values: List[Any], array: Any, nulls: Any, valid: Any) -> None:
+        self.values = values
+        self.array = array
+        self.nulls = nulls
+        self.valid = valid
+
+    def exact_as_float(self) -> bool:
+        array = self.array
+        if array.dtype.kind == "f" or len(array) == 0:
+            return True
+        return array.min() >= -EXACT_INT_LIMIT and array.max() <= EXACT_INT_LIMIT
+
+
+def convert_column(cells: List[str], dtype: str) -> Vector:
+    size = len(cells)
+    numeric = dtype in INTEGER or dtype in FLOAT
+    errors: List[int] = []
+    values = None
+    if numeric:
+        try:
+            # Fast path: no NULL and no malformed cell in the batch
+            values = list(map(int if dtype in INTEGER else float, cells))
+        except ValueError:
+            pass
+    if values is None:
+        convert = converter(dtype)
+        values = []
+        for i, cell in enumerate(cells):
+            try:
+                values.append(convert(cell))
+            except ValueError:
+                values.append(None)
+                errors.append(i)
+
+    valid = np.ones(size, dtype=bool)
+    valid[errors] = False
+    nulls = np.fromiter((value is None for value in values), dtype=bool, count=size)
+
+    array = None
+    if numeric or dtype in BOOLEAN:
+        filled = values if not nulls.any() else [value or 0 for value in values]
+        try:
+            array = np.array(filled, dtype=np.float64 if dtype in FLOAT else np.int64)
+        except OverflowError:
+            array = None  # beyond int64: compared in Python
+    return Vector(values, array, nulls, valid)
+
+
+def _compare_each(
+    compare: Callable[[Any, Any], bool], lefts: Any, rights: Any, size: int
+) -> Any:
+    # Exact row-engine semantics: NULL or an incomparable pair is False
+    def test(left: Any, right: Any) -> bool:
+        if left is None or right is None:
+            return False
+        try:
+            return bool(compare(left, right))
+        except Exception:
+            return False
+
+    return np.fromiter(map(test, lefts, rights), dtype=bool, count=size)
+
+
+def _literal_fits(vector: Vector, literal: Any) -> bool:
+    # Whether comparing vector.array to the literal in NumPy gives the
+    # same answer as Python would for every element
+    if vector.array is None or isinstance(literal, bool):
+        return False
+    if isinstance(literal, float):
+        return vector.exact_as_float()
+    if isinstance(literal, int):
+        if vector.array.dtype.kind == "f":
+            return -EXACT_INT_LIMIT <= literal <= EXACT_INT_LIMIT
+        return INT64_MIN <= literal <= INT64_MAX
+    return False
+
+
+def _columns_fit(left: Vector, right: Vector) -> bool:
+    if left.array is None or right.array is None:
+        return False
+    if left.array.dtype.kind == right.array.dtype.kind:
+        return True
+    return left.exact_as_float() and right.exact_as_float()
+
+
+def evaluate(
+    expr: Dict[str, Any], vectors: Dict[int, Vector], keys: Dict[str, int], size: int
+) -> Any:
+    # Boolean mask of the batch rows satisfying the WHERE tree
+    op = expr["op"]
+    if op == "AND":
+        return evaluate(expr["left"], vectors, keys, size) & evaluate(
+            expr["right"], vectors, keys, size
+        )
+    if op == "OR":
+        return evaluate(expr["left"], vectors, keys, size) | evaluate(
+            expr["right"], vectors, keys, size
+        )
+
+    compare = OPERATORS.get(op)
+    if compare is None:
+        raise SyntaxException(f"Unknown operator: {op}")
+
+    left = resolve_operand(expr["left"], keys)
+    right = resolve_operand(expr["right"], keys)
+    if left is UNRESOLVED or right is UNRESOLVED:
+        return np.zeros(size, dtype=bool)
+
+    left_is_column = isinstance(left, Column)
+    right_is_column = isinstance(right, Column)
+
+    if left_is_column and right_is_column:
+        left, right = vectors[left.key], vectors[right.key]
+        if _columns_fit(left, right):
+            return compare(left.array, right.array) & ~(left.nulls | right.nulls)
+        return _compare_each(compare, left.values, right.values, size)
+
+    if left_is_column:
+        vector = vectors[left.key]
+        if _literal_fits(vector, right):
+            return compare(vector.array, right) & ~vector.nulls
+        return _compare_each(compare, vector.values, repeat(right), size)
+
+    if right_is_column:
+        vector = vectors[right.key]
+        if _literal_fits(vector, left):
+            return compare(left, vector.array) & ~vector.nulls
+        return _compare_each(compare, repeat(left), vector.values, size)
+
+    try:
+        constant = bool(compare(left, right))
+    except Exception:
+        constant = False
+    return np.full(size, constant, dtype=bool)
+
+
+class VectorizedExecutor(SelectExecutor):
+    # Evaluates WHERE a batch of CSV rows at a time: the predicate columns
+    # are converted column-wise and compared with NumPy, and the remaining
+    # output columns are converted only for the rows that matched. Index
+    # lookups and columnar tables keep the row-at-a-time path.
+
+    def scan_blocks(
+        self,
+        table: Table,
+        where_clause: Dict[str, Any] | None,
+        columns: List[int],
+        keys: Dict[str, int],
+        blocks: List[Block] | None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        if not where_clause or table.storage != "csv":
+            return super().scan_blocks(table, where_clause, columns, keys, blocks)
+        return self.scan_batches(table, where_clause, columns, keys, blocks)
+
+    def scan_batches(
+        self,
+        table: Table,
+        where_clause: Dict[str, Any],
+        columns: List[int],
+        keys: Dict[str, int],
+        blocks: List[Block] | None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        column_types = [table.column_types[i] for i in columns]
+        converters = [table.converters[i] for i in columns]
+        where_keys = sorted(
+            keys[name] for name in condition_columns(where_clause, keys)
+        )
+
+        stats = self.stats
+        matched = invalid = 0
+        convert_time = filter_time = 0.0
+        batches = table.load_raw_batches(
+            columns, blocks, VECTOR_BATCH_ROWS, stats=stats
+        )
+        try:
+            for cells in batches:
+                if stats.cancelled:
+                    return
+                start = perf_counter()
+                size = len(cells[0])
+                vectors = {
+                    key: convert_column(cells[key], column_types[key])
+                    for key in where_keys
+                }
+                valid = np.ones(size, dtype=bool)
+                for key in where_keys:
+                    valid &= vectors[key].valid
+                converted = perf_counter()
+                convert_time += converted - start
+                # Rows with a cell that does not convert are skipped, as in
+                # load_data_gen
+                mask = evaluate(where_clause, vectors, keys, size) & valid
+                invalid += size - int(np.count_nonzero(valid))
+                filter_time += perf_counter() - converted
+
+                sources: List[
+                    Tuple[List[Any] | List[str], Callable[[str], Any] | None]
+                ] = [
+                    (vectors[key].values, None)
+                    if key in vectors
+                    else (cells[key], converters[key])
+                    for key in range(len(columns))
+                ]
+                for i in np.flatnonzero(mask).tolist():
+                    start = perf_counter()
+                    try:
+                        row = tuple(
+                            [
+                                values[i] if convert is None else convert(values[i])
+                                for values, convert in sources
+                            ]
+                        )
+                    except ValueError:
+                        invalid += 1
+                        continue
+                    finally:
+                        convert_time += perf_counter() - start
+                    matched += 1
+                    yield row
+        finally:
+            batches.close()
+            stats.rows_matched += matched
+            stats.rows_invalid += invalid
+            stats.add_time("convert", convert_time)
+            stats.add_time("filter", filter_time)
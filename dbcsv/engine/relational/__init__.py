@@ -1,5 +1,6 @@
+from dbcsv.engine.relational.catalog import catalog
 from dbcsv.engine.relational.schema import Schema
 
 
 def get_schema(schema_name: str) -> Schema:
-    return Schema.load(schema_name)
+    return catalog.get_schema(schema_name)
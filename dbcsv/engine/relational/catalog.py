@@ -0,0 +1,69 @@
+import threading
+from typing import Dict, Tuple
+
+from dbcsv.engine.relational.schema import Schema
+
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+class Catalog:
+    _entries: Dict[str, Tuple[Schema, Fingerprint]]
+
+    def __init__(self) -> None:
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "schemas": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "reloads": self._reloads,
+        }
+
+    def get_schema(self, schema_name: str) -> Schema:
+        with self._lock:
+            entry = self._entries.get(schema_name)
+            if entry is not None:
+                schema, fingerprint = entry
+                if self.fingerprint(schema) == fingerprint:
+                    self._hits += 1
+                    return schema
+                # Drop the stale entry first so a failing reload is not cached
+                del self._entries[schema_name]
+                self._reloads += 1
+            else:
+                self._misses += 1
+
+            schema = Schema.load(schema_name)
+            self._entries[schema_name] = (schema, self.fingerprint(schema))
+            return schema
+
+    def invalidate(self, schema_name: str | None = None) -> None:
+        with self._lock:
+            if schema_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(schema_name, None)
+
+    @staticmethod
+    def fingerprint(schema: Schema) -> Fingerprint:
+        paths = [schema.metadata_path]
+        paths.extend(table.table_path for table in schema.tables.values())
+
+        fingerprint = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                fingerprint.append((str(path), -1, -1))
+            else:
+                fingerprint.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+
+catalog = Catalog()
@@ -0,0 +1,315 @@
+import datetime
+import json
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from collections.abc import Generator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+from dbcsv.engine.relational.csvio import source_fingerprint
+from dbcsv.engine.relational.datatype import (
+    BOOLEAN,
+    DATE,
+    DATETIME,
+    FLOAT,
+    INTEGER,
+    STRING,
+)
+
+if TYPE_CHECKING:
+    from dbcsv.engine.relational.table import Table
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+CHUNK_ROWS = 65536
+
+# Storage kinds: fixed-width arrays and offset + data buffers for VARCHAR
+VARCHAR = "varchar"
+INT64 = "int64"
+FLOAT64 = "float64"
+BOOL = "bool"
+DATE32 = "date32"
+TIMESTAMP64 = "timestamp64"
+
+# array typecode used on write, memoryview format used on read
+TYPECODES: Dict[str, Tuple[str, str]] = {
+    INT64: ("q", "q"),
+    FLOAT64: ("d", "d"),
+    BOOL: ("B", "?"),
+    DATE32: ("i", "i"),
+    TIMESTAMP64: ("q", "q"),
+}
+
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def storage_kind(dtype: str) -> str:
+    if dtype in STRING:
+        return VARCHAR
+    if dtype in INTEGER:
+        return INT64
+    if dtype in FLOAT:
+        return FLOAT64
+    if dtype in BOOLEAN:
+        return BOOL
+    if dtype in DATE:
+        return DATE32
+    if dtype in DATETIME:
+        return TIMESTAMP64
+    raise ValueError(f"Column type {dtype} has no columnar representation")
+
+
+def _encoder(kind: str) -> Tuple[Callable[[Any], Any], Any]:
+    # Returns (encode, placeholder stored for NULL cells)
+    if kind == DATE32:
+        return datetime.date.toordinal, 1
+    if kind == TIMESTAMP64:
+        return lambda value: (value - datetime.datetime.min) // _MICROSECOND, 0
+    if kind == BOOL:
+        return int, 0
+    return lambda value: value, 0
+
+
+def _decoder(kind: str) -> Callable[[Any], Any] | None:
+    if kind == DATE32:
+        return datetime.date.fromordinal
+    if kind == TIMESTAMP64:
+        return lambda value: datetime.datetime.min + value * _MICROSECOND
+    return None
+
+
+def columnar_path(table_path: Path) -> Path:
+    return table_path.with_suffix(".columnar")
+
+
+class _ColumnWriter:
+    def __init__(self, directory: Path, index: int, kind: str) -> None:
+        self.kind = kind
+        self.null_count = 0
+        self._nulls = bytearray()
+        self._nulls_file = open(directory.joinpath(f"{index}.nulls"), "wb")
+        self._values_file = open(directory.joinpath(f"{index}.values"), "wb")
+
+        if kind == VARCHAR:
+            self._offset = 0
+            self._offsets = array("q", [0])
+            self._data = bytearray()
+            self._offsets_file = open(directory.joinpath(f"{index}.offsets"), "wb")
+        else:
+            self._encode, self._placeholder = _encoder(kind)
+            self._values = array(TYPECODES[kind][0])
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.null_count += 1
+            self._nulls.append(1)
+        else:
+            self._nulls.append(0)
+
+        if self.kind == VARCHAR:
+            if value is not None:
+                encoded = str(value).encode("utf-8")
+                self._data += encoded
+                self._offset += len(encoded)
+            self._offsets.append(self._offset)
+        elif value is None:
+            self._values.append(self._placeholder)
+        else:
+            self._values.append(self._encode(value))
+
+        if len(self._nulls) >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        self._nulls_file.write(self._nulls)
+        self._nulls.clear()
+        if self.kind == VARCHAR:
+            self._offsets.tofile(self._offsets_file)
+            del self._offsets[:]
+            self._values_file.write(self._data)
+            self._data.clear()
+        else:
+            self._values.tofile(self._values_file)
+            del self._values[:]
+
+    def close(self) -> None:
+        self.flush()
+        self._nulls_file.close()
+        self._values_file.close()
+        if self.kind == VARCHAR:
+            self._offsets_file.close()
+
+
+def convert_table(table: "Table") -> Path:
+    kinds = [storage_kind(dtype) for dtype in table.column_types]
+    target = columnar_path(table.table_path)
+    staging = target.with_name(target.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    # Taken before reading so a CSV modified mid-conversion reads as stale
+    source = source_fingerprint(table.table_path)
+    writers = [_ColumnWriter(staging, i, kind) for i, kind in enumerate(kinds)]
+    row_count = 0
+    try:
+        for row in table.load_data_gen(storage="csv"):
+            for writer, value in zip(writers, row):
+                writer.append(value)
+            row_count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "row_count": row_count,
+        "source": source,
+        "columns": [
+            {
+                "column_name": name,
+                "column_type": dtype,
+                "kind": writer.kind,
+                "null_count": writer.null_count,
+            }
+            for name, dtype, writer in zip(
+                table.column_names, table.column_types, writers
+            )
+        ],
+    }
+    with open(staging.joinpath(MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    return target
+
+
+class ColumnarReader:
+    _path: Path
+    _manifest: Dict[str, Any]
+
+    def __init__(self, path: Path, manifest: Dict[str, Any]) -> None:
+        self._path = path
+        self._manifest = manifest
+        self._maps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
+
+    @property
+    def row_count(self) -> int:
+        return self._manifest["row_count"]
+
+    @classmethod
+    def open_fresh(cls, table: "Table") -> "ColumnarReader | None":
+        # None when the table has not been converted or the CSV changed since
+        path = columnar_path(table.table_path)
+        try:
+            with open(path.joinpath(MANIFEST_NAME), "r") as f:
+                manifest = json.load(f)
+            source = source_fingerprint(table.table_path)
+        except (OSError, ValueError):
+            return None
+
+        columns = [
+            (column["column_name"], column["column_type"])
+            for column in manifest["columns"]
+        ]
+        if (
+            manifest.get("version") != FORMAT_VERSION
+            or manifest.get("byteorder") != sys.byteorder
+            or manifest.get("source") != source
+            or columns != list(zip(table.column_names, table.column_types))
+        ):
+            return None
+        return cls(path, manifest)
+
+    def _view(self, name: str, fmt: str) -> memoryview:
+        if self.row_count == 0:
+            return memoryview(b"").cast(fmt)
+
+        with open(self._path.joinpath(name), "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # zero-length file, e.g. all-NULL VARCHAR data
+                return memoryview(b"").cast(fmt)
+        self._maps.append(mapped)
+        view = memoryview(mapped).cast(fmt)
+        self._views.append(view)
+        return view
+
+    def _column_reader(
+        self, index: int, column: Dict[str, Any]
+    ) -> Callable[[int, int], List[Any]]:
+        kind = column["kind"]
+        nulls = self._view(f"{index}.nulls", "B") if column["null_count"] else None
+
+        if kind == VARCHAR:
+            offsets = self._view(f"{index}.offsets", "q")
+            data = self._view(f"{index}.values", "B")
+
+            def read_values(start: int, stop: int) -> List[Any]:
+                bounds = offsets[start : stop + 1].tolist()
+                return [
+                    str(data[begin:end], "utf-8")
+                    for begin, end in zip(bounds, bounds[1:])
+                ]
+
+        else:
+            values = self._view(f"{index}.values", TYPECODES[kind][1])
+
+            def read_values(start: int, stop: int) -> List[Any]:
+                return values[start:stop].tolist()
+
+        decode = _decoder(kind)
+        if nulls is None and decode is None:
+            return read_values
+
+        def read_column(start: int, stop: int) -> List[Any]:
+            chunk = read_values(start, stop)
+            if nulls is None:
+                return [decode(value) for value in chunk]
+            flags = nulls[start:stop]
+            if decode is None:
+                return [None if null else value for value, null in zip(chunk, flags)]
+            return [
+                None if null else decode(value) for value, null in zip(chunk, flags)
+            ]
+
+        return read_column
+
+    def rows(
+        self,
+        ranges: List[Tuple[int, int]] | None = None,
+        columns: List[int] | None = None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        # ranges: (row_start, row_stop) pairs to read, default the whole table.
+        # columns: positions to materialize, default all of them.
+        if ranges is None:
+            ranges = [(0, self.row_count)]
+        manifest_columns = self._manifest["columns"]
+        if columns is None:
+            columns = list(range(len(manifest_columns)))
+        try:
+            readers = [
+                self._column_reader(index, manifest_columns[index]) for index in columns
+            ]
+
+            for start, stop in ranges:
+                stop = min(stop, self.row_count)
+                for chunk_start in range(start, stop, CHUNK_ROWS):
+                    chunk_stop = min(chunk_start + CHUNK_ROWS, stop)
+                    chunk = [read(chunk_start, chunk_stop) for read in readers]
+                    yield from zip(*chunk)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views.clear()
+        self._maps.clear()
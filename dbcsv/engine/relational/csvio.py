@@ -0,0 +1,27 @@
+import csv
+from collections.abc import Generator
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Tuple
+
+
+def iter_rows(file: BinaryIO) -> Generator[Tuple[int, List[str]], None, None]:
+    # Yields (byte offset of the row, fields) starting at the current file
+    # position. Blank lines are skipped, as csv.DictReader does.
+    position = file.tell()
+
+    def lines() -> Generator[str, None, None]:
+        nonlocal position
+        for line in file:
+            position += len(line)
+            yield line.decode("utf-8")
+
+    start = position
+    for fields in csv.reader(lines()):
+        if fields:
+            yield start, fields
+        start = position
+
+
+def source_fingerprint(table_path: Path) -> Dict[str, int]:
+    stat = table_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
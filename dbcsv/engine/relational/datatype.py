@@ -1,6 +1,6 @@
 import datetime
 from functools import lru_cache
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
 
 class DBTypeObject:
@@ -17,79 +17,9 @@ class DBTypeObject:
         return item.lower() in self.values
 
     @staticmethod
-    @lru_cache(maxsize=1024)  # Cache common conversions
     def convert_datatype(data: str, dtype: str = "") -> Any:
-        dtype = dtype.lower()
-
-        # Fast path for empty data
-        if not data:
-            return None
-
-        # Fast path for string types (most common case first)
-        if dtype in STRING:
-            if len(data) > 1 and data[0] == "'" and data[-1] == "'":
-                return data[1:-1]
-            return data
-
-        # Check for quoted strings for non-string types
-        if len(data) > 1 and data[0] == "'" and data[-1] == "'" and dtype not in STRING:
-            raise ValueError(
-                f"Invalid {dtype} format: {data} is a string, not a {dtype}"
-            )
-
-        # Numeric types
-        if dtype in INTEGER:
-            try:
-                return int(data)
-            except ValueError:
-                raise ValueError(f"Invalid integer format: {data}")
-
-        if dtype in FLOAT:
-            try:
-                return float(data)
-            except ValueError:
-                raise ValueError(f"Invalid float format: {data}")
-
-        # Boolean type
-        if dtype in BOOLEAN:
-            data_lower = data.lower()
-            if data_lower == "true":
-                return True
-            elif data_lower == "false":
-                return False
-            raise ValueError(f"Invalid boolean format: {data}")
-
-        # Date/time types
-        if dtype in DATE:
-            try:
-                return datetime.datetime.strptime(data, "%Y-%m-%d").date()
-            except ValueError:
-                raise ValueError(f"Invalid date format (expected %Y-%m-%d): {data}")
-
-        if dtype in DATETIME:
-            try:
-                return datetime.datetime.strptime(data, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                raise ValueError(
-                    f"Invalid datetime format (expected %Y-%m-%d %H:%M:%S): {data}"
-                )
-
-        # NULL type
-        if dtype in NULL:
-            if data.lower() == "null":
-                return None
-            raise ValueError(f"Invalid null format: {data}")
-
-        # Fallback: best-effort conversion
-        try:
-            if len(data) > 1 and data[0] == "'" and data[-1] == "'":
-                return data[1:-1]
-            return int(data)
-        except ValueError:
-            try:
-                return float(data)
-            except ValueError:
-                return data
+        # One cell; scans apply the converter of each column instead
+        return converter(dtype)(data)
 
     @staticmethod
     def convert_rowtype(row: Dict[str, Any], column_types: List[str]) -> Dict[str, Any]:
@@ -116,3 +46,140 @@ BOOLEAN = DBTypeObject("BOOLEAN", "BOOL")
 DATE = DBTypeObject("DATE")
 DATETIME = DBTypeObject("DATETIME", "TIMESTAMP")
 NULL = DBTypeObject("NULL")
+
+
+def _convert_string(data: str) -> str | None:
+    if not data:
+        return None
+    if len(data) > 1 and data[0] == "'" and data[-1] == "'":
+        return data[1:-1]
+    return data
+
+
+def _convert_integer(data: str) -> int | None:
+    if not data:
+        return None
+    try:
+        return int(data)
+    except ValueError:
+        raise ValueError(f"Invalid integer format: {data}")
+
+
+def _convert_float(data: str) -> float | None:
+    if not data:
+        return None
+    try:
+        return float(data)
+    except ValueError:
+        raise ValueError(f"Invalid float format: {data}")
+
+
+def _convert_boolean(data: str) -> bool | None:
+    if not data:
+        return None
+    data_lower = data.lower()
+    if data_lower == "true":
+        return True
+    if data_lower == "false":
+        return False
+    raise ValueError(f"Invalid boolean format: {data}")
+
+
+def _convert_date(data: str) -> datetime.date | None:
+    if not data:
+        return None
+    # fromisoformat is far cheaper than strptime; it takes other ISO forms
+    # too, so only the plain YYYY-MM-DD shape goes to it
+    if len(data) == 10 and data[4] == "-" and data[7] == "-":
+        try:
+            return datetime.date.fromisoformat(data)
+        except ValueError:
+            pass
+    try:
+        return datetime.datetime.strptime(data, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"Invalid date format (expected %Y-%m-%d): {data}")
+
+
+def _convert_datetime(data: str) -> datetime.datetime | None:
+    if not data:
+        return None
+    if (
+        len(data) == 19
+        and data[4] == "-"
+        and data[7] == "-"
+        and data[10] == " "
+        and data[13] == ":"
+        and data[16] == ":"
+    ):
+        try:
+            return datetime.datetime.fromisoformat(data)
+        except ValueError:
+            pass
+    try:
+        return datetime.datetime.strptime(data, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise ValueError(
+            f"Invalid datetime format (expected %Y-%m-%d %H:%M:%S): {data}"
+        )
+
+
+def _convert_null(data: str) -> None:
+    if data and data.lower() != "null":
+        raise ValueError(f"Invalid null format: {data}")
+    return None
+
+
+@lru_cache(maxsize=64)
+def converter(dtype: str) -> Callable[[str], Any]:
+    # The function converting CSV cells of a column type, resolved once per
+    # type name. An empty cell is NULL (None) for every type; a cell that
+    # does not convert raises ValueError.
+    if dtype in STRING:
+        return _convert_string
+    if dtype in INTEGER:
+        return _convert_integer
+    if dtype in FLOAT:
+        return _convert_float
+    if dtype in BOOLEAN:
+        return _convert_boolean
+    if dtype in DATE:
+        return _convert_date
+    if dtype in DATETIME:
+        return _convert_datetime
+    if dtype in NULL:
+        return _convert_null
+    return _untyped_converter(dtype.lower())
+
+
+def _untyped_converter(dtype: str) -> Callable[[str], Any]:
+    # Unknown type names: a number when the cell is one, else the text
+    def convert(data: str) -> Any:
+        if not data:
+            return None
+        if len(data) > 1 and data[0] == "'" and data[-1] == "'":
+            raise ValueError(
+                f"Invalid {dtype} format: {data} is a string, not a {dtype}"
+            )
+        try:
+            return int(data)
+        except ValueError:
+            try:
+                return float(data)
+            except ValueError:
+                return data
+
+    return convert
+
+
+def encode_value(value: Any) -> Any:
+    # JSON-safe form of a converted value, read back with value_decoder
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return str(value)
+    return value
+
+
+def value_decoder(dtype: str) -> Callable[[Any], Any] | None:
+    if dtype in DATE or dtype in DATETIME:
+        return converter(dtype)
+    return None
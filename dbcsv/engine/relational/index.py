@@ -0,0 +1,158 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from dbcsv.engine.relational.csvio import iter_rows, source_fingerprint
+from dbcsv.engine.relational.datatype import (
+    encode_value,
+    value_decoder,
+)
+
+if TYPE_CHECKING:
+    from dbcsv.engine.relational.table import Table
+
+FORMAT_VERSION = 1
+
+
+def index_path(table_path: Path, column_name: str) -> Path:
+    return table_path.with_name(f"{table_path.stem}.{column_name}.index.json")
+
+
+class ColumnIndex:
+    # Sorted (value, byte offset) pairs kept as two parallel lists.
+    # NULL cells are not indexed since NULL never satisfies a comparison.
+    _column_name: str
+    _source: Dict[str, int]
+    _row_count: int
+    _keys: List[Any]
+    _offsets: List[int]
+
+    def __init__(
+        self,
+        column_name: str,
+        source: Dict[str, int],
+        row_count: int,
+        keys: List[Any],
+        offsets: List[int],
+    ) -> None:
+        self._column_name = column_name
+        self._source = source
+        self._row_count = row_count
+        self._keys = keys
+        self._offsets = offsets
+
+    @property
+    def column_name(self) -> str:
+        return self._column_name
+
+    @property
+    def row_count(self) -> int:
+        return self._row_count
+
+    def is_fresh(self, table_path: Path) -> bool:
+        try:
+            return source_fingerprint(table_path) == self._source
+        except OSError:
+            return False
+
+    def lookup(self, op: str, value: Any) -> List[int]:
+        # Byte offsets of the rows where `column <op> value` holds
+        keys = self._keys
+        try:
+            if op == "=":
+                start, stop = bisect_left(keys, value), bisect_right(keys, value)
+            elif op == "<":
+                start, stop = 0, bisect_left(keys, value)
+            elif op == "<=":
+                start, stop = 0, bisect_right(keys, value)
+            elif op == ">":
+                start, stop = bisect_right(keys, value), len(keys)
+            elif op == ">=":
+                start, stop = bisect_left(keys, value), len(keys)
+            else:
+                raise ValueError(f"Operator {op} cannot use an index")
+        except TypeError:
+            return []  # incomparable with every row, so no row matches
+        return self._offsets[start:stop]
+
+    @classmethod
+    def build_all(
+        cls, table: "Table", column_names: List[str]
+    ) -> Dict[str, "ColumnIndex"]:
+        # Builds the indexes of several columns in a single pass over the CSV
+        source = source_fingerprint(table.table_path)
+        positions = [table.column_names.index(name) for name in column_names]
+        converters = [table.converters[i] for i in positions]
+        width = len(table.column_types)
+        entries: List[List[tuple]] = [[] for _ in column_names]
+        row_count = 0
+
+        with table.table_path.open("rb") as file:
+            rows = iter_rows(file)
+            if next(rows, None) is not None:  # header
+                for offset, fields in rows:
+                    # Rows scans drop are left out: those of the wrong length,
+                    # and from each index those whose cell does not convert.
+                    # NULL and NaN match no comparison.
+                    if len(fields) != width:
+                        continue
+                    for pairs, i, convert in zip(entries, positions, converters):
+                        try:
+                            value = convert(fields[i])
+                        except ValueError:
+                            continue
+                        if value is not None and value == value:
+                            pairs.append((value, offset))
+                    row_count += 1
+
+        indexes = {}
+        for name, pairs in zip(column_names, entries):
+            pairs.sort()
+            indexes[name] = cls(
+                name,
+                source,
+                row_count,
+                [value for value, _ in pairs],
+                [offset for _, offset in pairs],
+            )
+        return indexes
+
+    @classmethod
+    def load(cls, table: "Table", column_name: str) -> "ColumnIndex | None":
+        # None when the index was never built or no longer matches the CSV
+        try:
+            with open(index_path(table.table_path, column_name), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != FORMAT_VERSION:
+            return None
+
+        keys = data["keys"]
+        decode = value_decoder(
+            table.column_types[table.column_names.index(column_name)]
+        )
+        if decode is not None:
+            keys = [decode(key) for key in keys]
+
+        index = cls(
+            column_name, data["source"], data["row_count"], keys, data["offsets"]
+        )
+        return index if index.is_fresh(table.table_path) else None
+
+    def save(self, table_path: Path) -> None:
+        data = {
+            "version": FORMAT_VERSION,
+            "source": self._source,
+            "row_count": self._row_count,
+            "keys": [encode_value(key) for key in self._keys],
+            "offsets": self._offsets,
+        }
+        path = index_path(table_path, self._column_name)
+        staging = path.with_name(path.name + ".tmp")
+        with open(staging, "w") as f:
+            json.dump(data, f)
+        os.replace(staging, path)
@@ -0,0 +1,115 @@
+import io
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO
+
+
+class ReadAheadRaw(io.RawIOBase):
+    # Unbuffered file whose reads are served from chunks fetched by a
+    # background thread, `depth` chunks ahead of the reader. The thread uses
+    # os.pread, which releases the GIL, so the disk stays busy while the
+    # caller parses. A seek drops the chunks read ahead and restarts there.
+    def __init__(self, path: Path, chunk_size: int, depth: int) -> None:
+        super().__init__()
+        self._fd = os.open(path, os.O_RDONLY)
+        self._chunk_size = chunk_size
+        self._depth = depth
+        self._position = 0
+        self._chunk = memoryview(b"")
+        self._chunks: queue.Queue | None = None
+        self._stop: threading.Event | None = None
+        self._thread: threading.Thread | None = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += os.fstat(self._fd).st_size
+        if offset != self._position:
+            self._stop_reading()
+            self._position = offset
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            if self._chunks is None:
+                self._start_reading()
+            chunk = self._chunks.get()
+            if isinstance(chunk, BaseException):
+                self._stop_reading()
+                raise chunk
+            if not chunk:
+                self._chunks.put(chunk)  # stay at end of file
+                return 0
+            self._chunk = memoryview(chunk)
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        self._position += size
+        return size
+
+    def _start_reading(self) -> None:
+        chunks: queue.Queue = queue.Queue(maxsize=self._depth)
+        stop = threading.Event()
+        fd, chunk_size, position = self._fd, self._chunk_size, self._position
+
+        def run() -> None:
+            offset = position
+            while not stop.is_set():
+                try:
+                    chunk = os.pread(fd, chunk_size, offset)
+                except OSError as e:
+                    chunk = e
+                while not stop.is_set():
+                    try:
+                        chunks.put(chunk, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if not isinstance(chunk, bytes) or not chunk:
+                    return
+                offset += len(chunk)
+
+        self._chunks, self._stop = chunks, stop
+        self._thread = threading.Thread(target=run, name="read-ahead", daemon=True)
+        self._thread.start()
+
+    def _stop_reading(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            # The thread may be blocked on a full queue: taking the chunks
+            # out lets its put return, and it sees `stop` right away
+            while True:
+                try:
+                    self._chunks.get_nowait()
+                except queue.Empty:
+                    break
+            self._thread.join()
+        self._chunks = self._stop = self._thread = None
+        self._chunk = memoryview(b"")
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop_reading()
+            os.close(self._fd)
+        super().close()
+
+
+def open_read_ahead(path: Path, chunk_size: int, depth: int) -> BinaryIO:
+    # A buffered binary file (readline, iteration, seek, tell) over
+    # ReadAheadRaw
+    return io.BufferedReader(
+        ReadAheadRaw(path, chunk_size, depth), buffer_size=min(chunk_size, 65536)
+    )
@@ -13,17 +13,18 @@ class Schema:
     _schema_path: Path
     _metadata: Dict[str, Any]
     _metadata_path: Path
-    _tables: Dict[str, Table] = {}
+    _tables: Dict[str, Table]
 
     def __init__(self, schema_name: str) -> None:
         self._schema_name = schema_name
+        self._tables = {}
 
     @property
     def schema_name(self) -> str:
         return self._schema_name
 
     @property
-    def schema_path(self) -> str:
+    def schema_path(self) -> Path:
         return self._schema_path
 
     @property
@@ -31,7 +32,7 @@ class Schema:
         return self._metadata
 
     @property
-    def metadata_path(self) -> Dict[str, Any]:
+    def metadata_path(self) -> Path:
         return self._metadata_path
 
     @property
@@ -61,13 +62,18 @@ class Schema:
                 schema_name=schema_name,
                 table_name=table["table_name"],
                 columns=table["columns"],
+                storage=table.get("storage", "csv"),
             )
         return schema
 
     def load_table(
-        self, schema_name: str, table_name: str, columns: Dict[str, Any]
+        self,
+        schema_name: str,
+        table_name: str,
+        columns: Dict[str, Any],
+        storage: str = "csv",
     ) -> Table:
-        table = Table.load(schema_name, table_name, columns)
+        table = Table.load(schema_name, table_name, columns, storage)
         self._tables[table_name] = table
         return table
 
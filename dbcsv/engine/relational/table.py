@@ -1,15 +1,35 @@
 # import csv
 # from collections.abc import Generator
-import csv
+import logging
+import threading
 from collections.abc import Generator
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Literal
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, List, Literal, Tuple
 
 from dbcsv.engine.exceptions import DatabaseException
-from dbcsv.engine.relational.datatype import DBTypeObject
-from dbcsv.engine.setting import STORAGE_PATH
+from dbcsv.engine.relational.columnar import ColumnarReader
+from dbcsv.engine.relational.csvio import iter_rows, source_fingerprint
+from dbcsv.engine.relational.datatype import converter
+from dbcsv.engine.relational.index import ColumnIndex, index_path
+from dbcsv.engine.relational.zonemap import Block, ZoneMap, merge_runs, zone_map_path
+from dbcsv.engine.relational.readahead import open_read_ahead
+from dbcsv.engine.setting import (
+    READ_AHEAD_BUFFER_BYTES,
+    READ_AHEAD_DEPTH,
+    STORAGE_PATH,
+    ZONE_MAP_BLOCK_ROWS,
+)
+
+if TYPE_CHECKING:
+    from dbcsv.engine.query.stats import QueryStats
+
+logger = logging.getLogger(__name__)
 
 MODE = Literal["r", "w", "a"]
+STORAGE = Literal["csv", "columnar"]
+STORAGE_FORMATS = frozenset({"csv", "columnar"})
 
 
 class Table:
@@ -17,13 +37,35 @@ class Table:
     _table_path: Path
     _column_names: List[str]
     _column_types: List[str]
+    _storage: STORAGE
+    _indexed_columns: List[str]
 
     def __init__(
-        self, table_name: str, column_names: List[str], column_types: List[str]
+        self,
+        table_name: str,
+        column_names: List[str],
+        column_types: List[str],
+        storage: STORAGE = "csv",
+        indexed_columns: List[str] | None = None,
+        table_path: Path | None = None,
     ):
         self._table_name = table_name
+        self._table_path = table_path
         self._column_names = column_names
         self._column_types = column_types
+        # Cell converter of each column, by position
+        self._converters = tuple(converter(dtype) for dtype in column_types)
+        self._storage = storage
+        self._indexed_columns = indexed_columns or []
+        self._zone_map: ZoneMap | None = None
+        self._indexes: Dict[str, ColumnIndex] = {}
+        # Background rebuilds of derived files, keyed by kind
+        self._build_lock = threading.Lock()
+        self._building: set[str] = set()
+        self._build_failed: Dict[str, Dict[str, int]] = {}
+        # Derived files found missing or stale, keyed by kind, with the
+        # versions of the CSV and of the file they were checked at
+        self._unusable: Dict[str, List[Dict[str, int] | None]] = {}
 
     @property
     def table_name(self) -> str:
@@ -37,32 +79,429 @@ class Table:
     def column_types(self) -> List[str]:
         return self._column_types
 
+    @property
+    def converters(self) -> Tuple[Callable[[str], Any], ...]:
+        return self._converters
+
+    @property
+    def table_path(self) -> Path:
+        return self._table_path
+
+    @property
+    def storage(self) -> STORAGE:
+        return self._storage
+
+    @property
+    def indexed_columns(self) -> List[str]:
+        return self._indexed_columns
+
     @classmethod
     def load(
-        cls, schema_name: str, table_name: str, columns: List[Dict[str, Any]]
+        cls,
+        schema_name: str,
+        table_name: str,
+        columns: List[Dict[str, Any]],
+        storage: STORAGE = "csv",
     ) -> "Table":
         column_names = [column["column_name"] for column in columns]
         column_types = [column["column_type"] for column in columns]
+        indexed_columns = [
+            column["column_name"] for column in columns if column.get("index")
+        ]
 
         table_path = STORAGE_PATH.joinpath(f"{schema_name}/{table_name}.csv")
 
         if (not table_path.exists()) or (table_path is None):
             raise DatabaseException(f"Table: {table_name} not exists")
 
-        table = cls(table_name, column_names, column_types)
-        table._table_path = table_path
+        if storage not in STORAGE_FORMATS:
+            raise DatabaseException(
+                f"Table: {table_name} has unknown storage {storage}"
+            )
 
-        return table
+        return cls(
+            table_name, column_names, column_types, storage, indexed_columns, table_path
+        )
 
-    def load_data_gen(self) -> Generator[Dict[str, Any], None, None]:
-        with self._table_path.open("r") as file:
-            reader = csv.DictReader(file)
+    def load_data_gen(
+        self,
+        columns: List[int] | None = None,
+        blocks: List[Block] | None = None,
+        storage: STORAGE | None = None,
+        byte_ranges: List[Tuple[int, int]] | None = None,
+        stats: "QueryStats | None" = None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        # Yields tuples holding only the `columns` positions (default: all),
+        # converted to their column types; rows that fail conversion are
+        # skipped. blocks restricts the scan to zone map blocks, byte_ranges
+        # to the CSV rows starting inside the given [start, stop) ranges.
+        # Reading and conversion time and row counts are added to stats.
+        if columns is None:
+            columns = list(range(len(self.column_names)))
+        runs = None if blocks is None else merge_runs(blocks)
 
-            for row in reader:
-                row = DBTypeObject.convert_rowtype(
-                    row=row, column_types=self.column_types
-                )
+        if byte_ranges is None and (storage or self.storage) == "columnar":
+            # A missing or stale columnar copy falls back to the CSV
+            reader = ColumnarReader.open_fresh(self)
+            if reader is not None:
+                ranges = None
+                if runs is not None:
+                    ranges = [(row_start, row_stop) for _, row_start, row_stop in runs]
+                rows = reader.rows(ranges, columns)
+                yield from rows if stats is None else self._timed_rows(rows, stats)
+                return
+
+        convert_row = self._row_converter(columns)
+        if stats is None:
+            with self._open_scan() as file:
+                for fields in self._iter_fields(file, runs, byte_ranges):
+                    row = convert_row(fields)
+                    if row is not None:
+                        yield row
+            return
+
+        # Timed around each step rather than across the yield, which hands
+        # control to the consumer
+        read_time = convert_time = 0.0
+        rows_read = rows_invalid = 0
+        try:
+            with self._open_scan() as file:
+                start = perf_counter()
+                for fields in self._iter_fields(file, runs, byte_ranges):
+                    read = perf_counter()
+                    row = convert_row(fields)
+                    read_time += read - start
+                    convert_time += perf_counter() - read
+                    rows_read += 1
+                    if row is None:
+                        rows_invalid += 1
+                    else:
+                        yield row
+                    start = perf_counter()
+        finally:
+            stats.add_time("read", read_time)
+            stats.add_time("convert", convert_time)
+            stats.rows_read += rows_read
+            stats.rows_invalid += rows_invalid
+
+    @staticmethod
+    def _timed_rows(
+        rows: Generator[Tuple[Any, ...], None, None], stats: "QueryStats"
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        # Columnar rows are read already converted
+        read_time = 0.0
+        rows_read = 0
+        try:
+            start = perf_counter()
+            for row in rows:
+                read_time += perf_counter() - start
+                rows_read += 1
                 yield row
+                start = perf_counter()
+        finally:
+            rows.close()
+            stats.add_time("read", read_time)
+            stats.rows_read += rows_read
+
+    def load_raw_batches(
+        self,
+        columns: List[int],
+        blocks: List[Block] | None = None,
+        batch_rows: int = 65536,
+        stats: "QueryStats | None" = None,
+    ) -> Generator[List[List[str]], None, None]:
+        # Unconverted CSV cells of the `columns` positions, column-major, in
+        # batches of up to batch_rows rows. Rows with the wrong number of
+        # fields are dropped, as in load_data_gen.
+        width = len(self.column_types)
+        runs = None if blocks is None else merge_runs(blocks)
+        read_time = 0.0
+        rows_read = rows_invalid = 0
+        try:
+            with self._open_scan() as file:
+                start = perf_counter()
+                batch: List[List[str]] = []
+                for fields in self._iter_fields(file, runs):
+                    rows_read += 1
+                    if len(fields) != width:
+                        rows_invalid += 1
+                        continue
+                    batch.append(fields)
+                    if len(batch) == batch_rows:
+                        cells = [[row[i] for row in batch] for i in columns]
+                        read_time += perf_counter() - start
+                        yield cells
+                        start = perf_counter()
+                        batch = []
+                if batch:
+                    cells = [[row[i] for row in batch] for i in columns]
+                    read_time += perf_counter() - start
+                    yield cells
+        finally:
+            if stats is not None:
+                stats.add_time("read", read_time)
+                stats.rows_read += rows_read
+                stats.rows_invalid += rows_invalid
+
+    def _open_scan(self) -> BinaryIO:
+        # Sequential reads overlap with parsing through the read-ahead thread
+        if READ_AHEAD_BUFFER_BYTES > 0:
+            return open_read_ahead(
+                self._table_path, READ_AHEAD_BUFFER_BYTES, READ_AHEAD_DEPTH
+            )
+        return self._table_path.open("rb")
+
+    @staticmethod
+    def _iter_fields(
+        file: BinaryIO,
+        runs: List[Tuple[int, int, int]] | None,
+        byte_ranges: List[Tuple[int, int]] | None = None,
+    ) -> Generator[List[str], None, None]:
+        if byte_ranges is not None:
+            # Range starts are row boundaries past the header
+            for start, stop in byte_ranges:
+                file.seek(start)
+                for offset, fields in iter_rows(file):
+                    if offset >= stop:
+                        break
+                    yield fields
+            return
+
+        rows = iter_rows(file)
+        if next(rows, None) is None:  # header
+            return
+
+        if runs is None:
+            for _, fields in rows:
+                yield fields
+            return
+
+        for offset, row_start, row_stop in runs:
+            file.seek(offset)
+            for _, fields in islice(iter_rows(file), row_stop - row_start):
+                yield fields
+
+    def data_start(self) -> int:
+        # Byte offset of the first row after the header
+        with self._table_path.open("rb") as file:
+            rows = iter_rows(file)
+            next(rows, None)  # header
+            row = next(rows, None)
+            return file.tell() if row is None else row[0]
+
+    def fetch_rows(
+        self,
+        offsets: List[int],
+        columns: List[int] | None = None,
+        stats: "QueryStats | None" = None,
+    ) -> Generator[Tuple[Any, ...], None, None]:
+        # Reads the CSV rows starting at the given byte offsets, in that order
+        if columns is None:
+            columns = list(range(len(self.column_names)))
+
+        convert_row = self._row_converter(columns)
+        read_time = 0.0
+        rows_read = rows_invalid = 0
+        try:
+            with self._table_path.open("rb") as file:
+                for offset in offsets:
+                    start = perf_counter()
+                    file.seek(offset)
+                    fields = next(iter_rows(file), None)
+                    row = None if fields is None else convert_row(fields[1])
+                    read_time += perf_counter() - start
+                    if fields is None:
+                        continue
+                    rows_read += 1
+                    if row is None:
+                        rows_invalid += 1
+                    else:
+                        yield row
+        finally:
+            if stats is not None:
+                stats.add_time("read", read_time)
+                stats.rows_read += rows_read
+                stats.rows_invalid += rows_invalid
+
+    def load_positioned_rows(
+        self,
+        columns: List[int],
+        after: int,
+        byte_ranges: List[Tuple[int, int]] | None = None,
+        offsets: List[int] | None = None,
+        stats: "QueryStats | None" = None,
+    ) -> Generator[Tuple[int, Tuple[Any, ...]], None, None]:
+        # (byte offset, row) of the CSV rows starting past byte offset
+        # `after`: the rows at the sorted `offsets`, or those starting inside
+        # the sorted [start, stop) byte_ranges. Each scan seeks straight to
+        # where the previous one stopped.
+        convert_row = self._row_converter(columns)
+        read_time = 0.0
+        rows_read = rows_invalid = 0
+
+        def positioned_fields(
+            file: BinaryIO,
+        ) -> Generator[Tuple[int, List[str]], None, None]:
+            if offsets is not None:
+                for offset in offsets:
+                    if offset > after:
+                        file.seek(offset)
+                        row = next(iter_rows(file), None)
+                        if row is not None:
+                            yield row
+                return
+            for start, stop in byte_ranges:
+                if stop <= after:
+                    continue
+                file.seek(max(start, after))
+                for offset, fields in iter_rows(file):
+                    if offset >= stop:
+                        break
+                    if offset > after:
+                        yield offset, fields
+
+        try:
+            # Pages stop after a few rows, before read-ahead would pay off
+            with self._table_path.open("rb") as file:
+                start = perf_counter()
+                for offset, fields in positioned_fields(file):
+                    row = convert_row(fields)
+                    read_time += perf_counter() - start
+                    rows_read += 1
+                    if row is None:
+                        rows_invalid += 1
+                    else:
+                        yield offset, row
+                    start = perf_counter()
+        finally:
+            if stats is not None:
+                stats.add_time("read", read_time)
+                stats.rows_read += rows_read
+                stats.rows_invalid += rows_invalid
+
+    def _row_converter(
+        self, columns: List[int]
+    ) -> Callable[[List[str]], Tuple[Any, ...] | None]:
+        # Only the requested positions are type-converted; None marks a row
+        # with the wrong number of fields or a cell that does not convert
+        width = len(self.column_types)
+        targets = [(i, self._converters[i]) for i in columns]
+
+        def convert_row(fields: List[str]) -> Tuple[Any, ...] | None:
+            if len(fields) != width:
+                return None
+            try:
+                return tuple([convert(fields[i]) for i, convert in targets])
+            except ValueError:
+                return None
+
+        return convert_row
+
+    def zone_map(self) -> ZoneMap | None:
+        # The persisted zone map if it matches the CSV. Otherwise None is
+        # returned and a rebuild is started in the background.
+        if ZONE_MAP_BLOCK_ROWS <= 0:
+            return None
+
+        zone_map = self._zone_map
+        if zone_map is not None and zone_map.is_fresh(self.table_path):
+            return zone_map
+
+        zone_map = self._load_derived(
+            "zonemap",
+            zone_map_path(self.table_path),
+            lambda: ZoneMap.load(self, ZONE_MAP_BLOCK_ROWS),
+        )
+        self._zone_map = zone_map
+        if zone_map is None:
+            self._build_in_background("zonemap", self.build_zone_map)
+        return zone_map
+
+    def build_zone_map(self) -> ZoneMap:
+        zone_map = ZoneMap.build(self, ZONE_MAP_BLOCK_ROWS)
+        zone_map.save(self.table_path)
+        self._zone_map = zone_map
+        return zone_map
+
+    def indexes(self) -> Dict[str, ColumnIndex]:
+        # The declared indexes that match the CSV. Stale or missing ones are
+        # left out, which makes queries bypass them, and rebuilt in the
+        # background.
+        indexes = {}
+        missing = False
+        for name in self._indexed_columns:
+            index = self._indexes.get(name)
+            if index is None or not index.is_fresh(self.table_path):
+                index = self._load_derived(
+                    f"index:{name}",
+                    index_path(self.table_path, name),
+                    lambda: ColumnIndex.load(self, name),
+                )
+            if index is None:
+                missing = True
+                self._indexes.pop(name, None)
+            else:
+                indexes[name] = self._indexes[name] = index
+
+        if missing:
+            self._build_in_background("index", self.build_indexes)
+        return indexes
+
+    def build_indexes(self) -> Dict[str, ColumnIndex]:
+        indexes = ColumnIndex.build_all(self, self._indexed_columns)
+        for index in indexes.values():
+            index.save(self.table_path)
+        self._indexes = dict(indexes)
+        return indexes
+
+    def _load_derived(
+        self, kind: str, path: Path, load: Callable[[], Any | None]
+    ) -> Any | None:
+        # Runs load() unless the file was already found missing or stale with
+        # the CSV and the file as they are now. A rebuild that failed leaves
+        # the file stale, and parsing it again on every query would cost more
+        # than the scan it saves.
+        def version(path: Path) -> Dict[str, int] | None:
+            try:
+                return source_fingerprint(path)
+            except OSError:
+                return None
+
+        versions = [version(self.table_path), version(path)]
+        if self._unusable.get(kind) == versions:
+            return None
+        loaded = load()
+        if loaded is None:
+            self._unusable[kind] = versions
+        else:
+            self._unusable.pop(kind, None)
+        return loaded
+
+    def _build_in_background(self, kind: str, build: Callable[[], Any]) -> None:
+        try:
+            source = source_fingerprint(self.table_path)
+        except OSError:
+            return
+
+        with self._build_lock:
+            if kind in self._building or self._build_failed.get(kind) == source:
+                return
+            self._building.add(kind)
+
+        def run() -> None:
+            try:
+                build()
+            except Exception:
+                # Do not retry until the file changes again
+                self._build_failed[kind] = source
+                logger.exception("Building %s failed for %s", kind, self.table_path)
+            finally:
+                with self._build_lock:
+                    self._building.discard(kind)
+
+        threading.Thread(
+            target=run, name=f"{kind}-{self.table_name}", daemon=True
+        ).start()
 
     def has_column(self, column: str) -> bool:
         return column in self.column_names
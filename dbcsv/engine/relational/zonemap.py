@@ -0,0 +1,187 @@
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from dbcsv.engine.relational.csvio import iter_rows, source_fingerprint
+from dbcsv.engine.relational.datatype import (
+    encode_value,
+    value_decoder,
+)
+
+if TYPE_CHECKING:
+    from dbcsv.engine.relational.table import Table
+
+FORMAT_VERSION = 1
+
+# Per-column statistics: [min, max, null_count], or None when unusable
+ColumnStats = List[Any] | None
+
+
+class Block:
+    __slots__ = ("row_start", "row_stop", "offset", "columns")
+
+    def __init__(
+        self, row_start: int, row_stop: int, offset: int, columns: List[ColumnStats]
+    ) -> None:
+        self.row_start = row_start
+        self.row_stop = row_stop
+        self.offset = offset
+        self.columns = columns
+
+    @property
+    def row_count(self) -> int:
+        return self.row_stop - self.row_start
+
+
+def zone_map_path(table_path: Path) -> Path:
+    return table_path.with_suffix(".zonemap.json")
+
+
+def merge_runs(blocks: List[Block]) -> List[Tuple[int, int, int]]:
+    # Coalesce adjacent blocks into (byte offset, row_start, row_stop) runs
+    runs: List[Tuple[int, int, int]] = []
+    for block in blocks:
+        if runs and runs[-1][2] == block.row_start:
+            offset, row_start, _ = runs[-1]
+            runs[-1] = (offset, row_start, block.row_stop)
+        else:
+            runs.append((block.offset, block.row_start, block.row_stop))
+    return runs
+
+
+class ZoneMap:
+    _source: Dict[str, int]
+    _block_rows: int
+    _blocks: List[Block]
+
+    def __init__(
+        self, source: Dict[str, int], block_rows: int, blocks: List[Block]
+    ) -> None:
+        self._source = source
+        self._block_rows = block_rows
+        self._blocks = blocks
+
+    @property
+    def block_rows(self) -> int:
+        return self._block_rows
+
+    @property
+    def blocks(self) -> List[Block]:
+        return self._blocks
+
+    def byte_ranges(self, blocks: List[Block], size: int) -> List[Tuple[int, int]]:
+        # [start, stop) byte range of each of the blocks, in a file of `size`
+        # bytes
+        following = {
+            block.offset: after.offset
+            for block, after in zip(self._blocks, self._blocks[1:])
+        }
+        return [(block.offset, following.get(block.offset, size)) for block in blocks]
+
+    def is_fresh(self, table_path: Path) -> bool:
+        try:
+            return source_fingerprint(table_path) == self._source
+        except OSError:
+            return False
+
+    @classmethod
+    def build(cls, table: "Table", block_rows: int) -> "ZoneMap":
+        converters = table.converters
+        width = len(converters)
+        source = source_fingerprint(table.table_path)
+        blocks: List[Block] = []
+
+        with table.table_path.open("rb") as file:
+            rows = iter_rows(file)
+            if next(rows, None) is None:  # header
+                return cls(source, block_rows, blocks)
+
+            block = None
+            for row_number, (offset, fields) in enumerate(rows):
+                if block is None or block.row_count == block_rows:
+                    columns = [[None, None, 0] for _ in range(width)]
+                    block = Block(row_number, row_number, offset, columns)
+                    blocks.append(block)
+
+                # Scans drop rows of the wrong length, and rows whose cell
+                # does not convert in a column they read, so neither bounds a
+                # block. The row still counts: runs are read by row count.
+                block.row_stop += 1
+                if len(fields) != width:
+                    continue
+                for i, (data, convert) in enumerate(zip(fields, converters)):
+                    stats = block.columns[i]
+                    if stats is None:
+                        continue
+                    try:
+                        value = convert(data)
+                    except ValueError:
+                        continue
+                    if value is None:
+                        stats[2] += 1
+                        continue
+                    if value != value:  # NaN is unordered: no usable bounds
+                        block.columns[i] = None
+                        continue
+                    try:
+                        if stats[0] is None or value < stats[0]:
+                            stats[0] = value
+                        if stats[1] is None or value > stats[1]:
+                            stats[1] = value
+                    except TypeError:  # mixed types: no usable bounds
+                        block.columns[i] = None
+
+        return cls(source, block_rows, blocks)
+
+    @classmethod
+    def load(cls, table: "Table", block_rows: int) -> "ZoneMap | None":
+        # None when no zone map was persisted or it no longer matches the CSV
+        try:
+            with open(zone_map_path(table.table_path), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get("version") != FORMAT_VERSION:
+            return None
+        if data.get("block_rows") != block_rows:
+            return None
+
+        decoders = [value_decoder(dtype) for dtype in table.column_types]
+        blocks = []
+        for row_start, row_stop, offset, columns in data["blocks"]:
+            if len(columns) != len(decoders):
+                return None
+            for stats, decode in zip(columns, decoders):
+                if stats is not None and decode is not None:
+                    stats[0] = decode(stats[0]) if stats[0] is not None else None
+                    stats[1] = decode(stats[1]) if stats[1] is not None else None
+            blocks.append(Block(row_start, row_stop, offset, columns))
+
+        zone_map = cls(data["source"], block_rows, blocks)
+        return zone_map if zone_map.is_fresh(table.table_path) else None
+
+    def save(self, table_path: Path) -> None:
+        data = {
+            "version": FORMAT_VERSION,
+            "source": self._source,
+            "block_rows": self._block_rows,
+            "blocks": [
+                [
+                    block.row_start,
+                    block.row_stop,
+                    block.offset,
+                    [
+                        None if stats is None else [encode_value(v) for v in stats]
+                        for stats in block.columns
+                    ],
+                ]
+                for block in self._blocks
+            ],
+        }
+        path = zone_map_path(table_path)
+        staging = path.with_name(path.name + ".tmp")
+        with open(staging, "w") as f:
+            json.dump(data, f)
+        os.replace(staging, path)
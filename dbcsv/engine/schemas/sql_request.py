@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal
+
+from pydantic import BaseModel, Field, model_validator
 
 
 class SQLRequest(BaseModel):
@@ -6,3 +8,39 @@ class SQLRequest(BaseModel):
         max_length=255, description="User's request is a sql statement."
     )
     schema: str = Field(max_length=255, description="Schema name.")
+    result_format: Literal["json", "binary"] = Field(
+        default="json",
+        description="Result encoding: newline-delimited JSON or binary column batches.",
+    )
+    use_cache: bool = Field(
+        default=True, description="Whether a cached result may be returned."
+    )
+    page_rows: int | None = Field(
+        default=None,
+        ge=1,
+        le=1_000_000,
+        description="Return at most this many rows and a token for the rest.",
+    )
+    continuation: str | None = Field(
+        default=None,
+        description="Token of the previous page, to fetch the next one.",
+    )
+
+    @model_validator(mode="after")
+    def check_paging(self) -> "SQLRequest":
+        if self.continuation is not None and self.page_rows is None:
+            raise ValueError("continuation requires page_rows")
+        return self
+
+
+class BatchSQLRequest(BaseModel):
+    sql_statements: List[Annotated[str, Field(max_length=255)]] = Field(
+        min_length=1,
+        max_length=64,
+        description="SELECT statements; each gets its own result set.",
+    )
+    schema: str = Field(max_length=255, description="Schema name.")
+    result_format: Literal["json", "binary"] = Field(
+        default="json",
+        description="Result encoding: newline-delimited JSON or binary column batches.",
+    )
@@ -1,6 +1,11 @@
 import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Any, Dict
+from typing import Annotated, Any, Dict, Tuple
 
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -9,26 +14,112 @@ from fastapi.security import OAuth2PasswordBearer
 from dbcsv.engine.schemas.auth import Token, TokenData, User, UserInDB
 from dbcsv.engine.setting import (
     ACCESS_TOKEN_EXPIRE_MINUTES,
+    ACCOUNTS_RELOAD_SECONDS,
     ALGORITHM,
+    AUTH_TOKEN_CACHE_SIZE,
     SECRET_KEY,
     STORAGE_PATH,
 )
 
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    # Usernames of access tokens whose signature was verified, kept until
+    # the tokens expire. Past max_entries the least recently used token is
+    # dropped; 0 disables the cache.
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[0]
+
+    def put(self, token: str, username: str, expires: float) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (username, expires)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
 
 class AuthManager:
     __accounts_json: Dict[str, Any]
+    __users: Dict[str, UserInDB]
     __secret_key: str
     __algorithm: str
     __access_token_expire_minutes: int
 
     def __init__(
-        self, secret_key: str, algorithm: str, access_token_expire_minutes: int
+        self,
+        secret_key: str,
+        algorithm: str,
+        access_token_expire_minutes: int,
+        token_cache_size: int = AUTH_TOKEN_CACHE_SIZE,
     ) -> None:
         self.__secret_key = secret_key
         self.__algorithm = algorithm
         self.__access_token_expire_minutes = access_token_expire_minutes
-        with open(STORAGE_PATH.joinpath("accounts.json"), "r") as file:
-            self.__accounts_json = json.load(file)
+        self.__tokens = TokenCache(token_cache_size)
+        self.__accounts_path = STORAGE_PATH.joinpath("accounts.json")
+        self.__reload_lock = threading.Lock()
+        self.__next_check = time.monotonic() + ACCOUNTS_RELOAD_SECONDS
+        self.__accounts_version = self._accounts_version()
+        self._load_accounts()
+
+    def _accounts_version(self) -> Tuple[int, int] | None:
+        try:
+            stat = os.stat(self.__accounts_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_accounts(self) -> None:
+        # The users are built once per version of accounts.json, not per
+        # request
+        with open(self.__accounts_path, "r") as file:
+            accounts_json = json.load(file)
+        self.__users = {
+            username: UserInDB(**user_dict)
+            for username, user_dict in accounts_json.items()
+            if user_dict
+        }
+        self.__accounts_json = accounts_json
+
+    def _reload_accounts(self) -> None:
+        # Picks up edits of accounts.json, looking at the file at most every
+        # ACCOUNTS_RELOAD_SECONDS. A file that does not parse, e.g. one
+        # caught mid-write, leaves the loaded accounts in place.
+        if time.monotonic() < self.__next_check:
+            return
+        with self.__reload_lock:
+            if time.monotonic() < self.__next_check:
+                return
+            self.__next_check = time.monotonic() + ACCOUNTS_RELOAD_SECONDS
+            version = self._accounts_version()
+            if version is None or version == self.__accounts_version:
+                return
+            # Not retried until the file changes again
+            self.__accounts_version = version
+            try:
+                self._load_accounts()
+            except (OSError, ValueError):
+                logger.warning(
+                    "Could not reload %s; keeping the loaded accounts",
+                    self.__accounts_path,
+                    exc_info=True,
+                )
 
     @property
     def accounts_json(self) -> Dict[str, Any]:
@@ -82,24 +173,37 @@ class AuthManager:
         return jwt.encode(to_encode, self.__secret_key, algorithm=self.__algorithm)
 
     def get_user(self, username: str) -> UserInDB | None:
-        user_dict = self.__accounts_json.get(username)
-        if user_dict:
-            return UserInDB(**user_dict)
-        return None
+        self._reload_accounts()
+        return self.__users.get(username)
 
     def get_current_user(
         self,
         token: Annotated[str, Depends(OAuth2PasswordBearer(tokenUrl="auth/connect"))],
     ) -> User:
-        try:
-            payload: Dict[str, Any] = jwt.decode(
-                token, self.__secret_key, algorithms=[self.__algorithm]
+        # Tokens seen before skip the signature check until they expire; the
+        # user is still looked up, so account changes apply right away
+        username = self.__tokens.get(token)
+        if username is None:
+            try:
+                payload: Dict[str, Any] = jwt.decode(
+                    token, self.__secret_key, algorithms=[self.__algorithm]
+                )
+                username = payload.get("username")
+                token_data = TokenData(username=username)
+            except jwt.InvalidTokenError:
+                raise HTTPException(status_code=403, detail="Token verification failed")
+            username = token_data.username
+            if username is None:
+                raise HTTPException(status_code=403, detail="Token verification failed")
+            if "exp" in payload:
+                self.__tokens.put(token, username, payload["exp"])
+        user = self.get_user(username)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Unknown user",
+                headers={"WWW-Authenticate": "Bearer"},
             )
-            username: str = payload.get("username")
-            token_data = TokenData(username=username)
-        except jwt.InvalidTokenError:
-            raise HTTPException(status_code=403, detail="Token verification failed")
-        user = self.get_user(token_data.username)
         return user
 
 
@@ -1,11 +1,119 @@
 import os
 from pathlib import Path
+from typing import List
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
-STORAGE_PATH: Path = Path("dbcsv/engine/storage/")
+STORAGE_PATH: Path = Path(os.getenv("STORAGE_PATH", "dbcsv/engine/storage/"))
 SECRET_KEY: str = os.getenv("SECRET_KEY")
 ALGORITHM: str = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+
+# Verified access tokens are remembered with their user until they expire,
+# so repeated requests skip the signature check (0 disables). accounts.json
+# is checked for changes at most every ACCOUNTS_RELOAD_SECONDS.
+AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+ACCOUNTS_RELOAD_SECONDS: float = float(os.getenv("ACCOUNTS_RELOAD_SECONDS", "1.0"))
+
+# Continuation tokens of paged queries are valid this long after their page
+CONTINUATION_TOKEN_EXPIRE_MINUTES: int = int(
+    os.getenv("CONTINUATION_TOKEN_EXPIRE_MINUTES", "60")
+)
+
+# Rows per zone map block; 0 disables zone maps
+ZONE_MAP_BLOCK_ROWS: int = int(os.getenv("ZONE_MAP_BLOCK_ROWS", "8192"))
+
+# Use a secondary index only when it selects at most this fraction of rows;
+# above it a sequential scan is cheaper than seeking to every row
+INDEX_SCAN_MAX_FRACTION: float = float(os.getenv("INDEX_SCAN_MAX_FRACTION", "0.2"))
+
+# "row" (tuple at a time) or "vectorized" (NumPy batches, needs numpy)
+EXECUTION_MODE: str = os.getenv("EXECUTION_MODE", "row")
+VECTOR_BATCH_ROWS: int = int(os.getenv("VECTOR_BATCH_ROWS", "65536"))
+
+# Parallel CSV scans of filtered queries without LIMIT: number of worker
+# processes (1 disables them) and the smallest and largest byte range handed
+# to a worker; tables under two splits are scanned in-process. The largest
+# split bounds the result rows a worker buffers. "ordered" keeps file order,
+# "as_ready" streams splits as they finish.
+PARALLEL_SCAN_WORKERS: int = int(
+    os.getenv("PARALLEL_SCAN_WORKERS", str(os.cpu_count() or 1))
+)
+PARALLEL_SCAN_MIN_SPLIT_BYTES: int = int(
+    os.getenv("PARALLEL_SCAN_MIN_SPLIT_BYTES", str(32 * 1024 * 1024))
+)
+PARALLEL_SCAN_MAX_SPLIT_BYTES: int = int(
+    os.getenv("PARALLEL_SCAN_MAX_SPLIT_BYTES", str(64 * 1024 * 1024))
+)
+PARALLEL_SCAN_ORDER: str = os.getenv("PARALLEL_SCAN_ORDER", "ordered")
+
+# Sequential table scans read this many bytes ahead on a background thread,
+# in `depth` chunks (2 double-buffers); 0 reads the file directly
+READ_AHEAD_BUFFER_BYTES: int = int(
+    os.getenv("READ_AHEAD_BUFFER_BYTES", str(1024 * 1024))
+)
+READ_AHEAD_DEPTH: int = int(os.getenv("READ_AHEAD_DEPTH", "2"))
+
+# Result rows are sent as newline-delimited JSON, packed into writes of
+# about this many bytes, or as binary batches of this many rows
+RESULT_BATCH_BYTES: int = int(os.getenv("RESULT_BATCH_BYTES", str(64 * 1024)))
+RESULT_BATCH_ROWS: int = int(os.getenv("RESULT_BATCH_ROWS", "4096"))
+
+# Results are compressed with the first of these encodings the client
+# accepts (empty disables), once they reach RESULT_COMPRESSION_MIN_BYTES
+RESULT_COMPRESSION_ENCODINGS: List[str] = [
+    encoding.strip()
+    for encoding in os.getenv("RESULT_COMPRESSION_ENCODINGS", "gzip,deflate").split(",")
+    if encoding.strip()
+]
+RESULT_COMPRESSION_LEVEL: int = int(os.getenv("RESULT_COMPRESSION_LEVEL", "6"))
+RESULT_COMPRESSION_MIN_BYTES: int = int(
+    os.getenv("RESULT_COMPRESSION_MIN_BYTES", "1024")
+)
+
+# Result streams are produced on a pool of QUERY_THREADS threads and handed
+# to the event loop in batches of RESULT_QUEUE_DEPTH chunks; 0 streams the
+# generator through Starlette's threadpool instead. Scans hold the GIL
+# while parsing, so more threads than this only slow the event loop down.
+QUERY_THREADS: int = int(
+    os.getenv("QUERY_THREADS", str(min(32, 4 * (os.cpu_count() or 1))))
+)
+RESULT_QUEUE_DEPTH: int = int(os.getenv("RESULT_QUEUE_DEPTH", "8"))
+
+# Encoded results of recent queries kept in memory (0 disables the cache);
+# results larger than RESULT_CACHE_MAX_ENTRY_BYTES are not cached
+RESULT_CACHE_MAX_BYTES: int = int(
+    os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+RESULT_CACHE_MAX_ENTRY_BYTES: int = int(
+    os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024))
+)
+
+# ORDER BY sorts in memory up to SORT_MEMORY_BYTES of rows, then spills
+# sorted runs to temporary files and merges them. With LIMIT, a heap of
+# OFFSET + LIMIT rows is kept instead when those fit in the same budget.
+SORT_MEMORY_BYTES: int = int(os.getenv("SORT_MEMORY_BYTES", str(64 * 1024 * 1024)))
+
+# Hash joins whose build side exceeds JOIN_MEMORY_BYTES hash partition both
+# sides into JOIN_PARTITIONS pairs of temporary files
+JOIN_MEMORY_BYTES: int = int(os.getenv("JOIN_MEMORY_BYTES", str(64 * 1024 * 1024)))
+JOIN_PARTITIONS: int = int(os.getenv("JOIN_PARTITIONS", "16"))
+
+# Directory of sort runs and join partitions (default: the system temp dir)
+SPILL_TEMP_DIR: str | None = os.getenv("SPILL_TEMP_DIR") or None
+
+# Full CSV scans are shared: a query attaches to a scan of the same table
+# already in progress, reads the segments it missed itself, and then gets
+# its rows from the shared pass. Scans advance SHARED_SCAN_SEGMENT_BYTES at
+# a time, cut at zone map blocks; a table without a zone map is a single
+# segment (0 disables attaching; batches still scan each table once). Rows
+# waiting for a query are queued in memory up to SHARED_SCAN_QUEUE_BYTES,
+# then spilled.
+SHARED_SCAN_SEGMENT_BYTES: int = int(
+    os.getenv("SHARED_SCAN_SEGMENT_BYTES", str(4 * 1024 * 1024))
+)
+SHARED_SCAN_QUEUE_BYTES: int = int(
+    os.getenv("SHARED_SCAN_QUEUE_BYTES", str(16 * 1024 * 1024))
+)